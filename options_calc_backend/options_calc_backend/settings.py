@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'put_calculator.instrumentation.TimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -77,6 +78,18 @@ TEMPLATES = [
     },
 ]
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'put_calculator.serialization.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'put_calculator.serialization.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
@@ -87,6 +100,51 @@ CORS_ALLOWED_ORIGINS = [
 #     }
 # }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+OPTION_CHAIN_CACHE_TTL = int(os.getenv('OPTION_CHAIN_CACHE_TTL', '60'))
+OPTION_QUOTE_CACHE_TTL = int(os.getenv('OPTION_QUOTE_CACHE_TTL', '15'))
+OPTION_CHAIN_CACHE_MAX_BYTES = int(os.getenv('OPTION_CHAIN_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Local snapshot store (put_calculator.snapshots): how old a stored chain or
+# quote set may be and still be served on a cold start (a process's first
+# load of a symbol, e.g. after a restart) instead of re-fetching, and
+# whether/how often streamed ticks are written to it
+SNAPSHOT_CHAIN_MAX_AGE = int(os.getenv('SNAPSHOT_CHAIN_MAX_AGE', str(6 * 60 * 60)))
+SNAPSHOT_QUOTE_MAX_AGE = int(os.getenv('SNAPSHOT_QUOTE_MAX_AGE', '15'))
+SNAPSHOT_RECORD_TICKS = os.getenv('SNAPSHOT_RECORD_TICKS', 'True').lower() in ('true', '1')
+SNAPSHOT_TICK_FLUSH_INTERVAL = float(os.getenv('SNAPSHOT_TICK_FLUSH_INTERVAL', '5'))
+# Seconds of chain, quote and tick history kept; older rows are pruned as new
+# ones are written (0 keeps everything)
+SNAPSHOT_RETENTION = int(os.getenv('SNAPSHOT_RETENTION', str(7 * 24 * 60 * 60)))
+
+# Background cache warming (put_calculator.prefetch) for a comma-separated
+# watchlist, e.g. PREFETCH_WATCHLIST=SPY,AAPL,TSLA; empty disables it.
+# Market-hours intervals should stay below the cache TTLs above; 0 for the
+# closed interval pauses prefetching until the market opens.
+PREFETCH_WATCHLIST = [s for s in os.getenv('PREFETCH_WATCHLIST', '').split(',') if s.strip()]
+PREFETCH_CHAIN_INTERVAL = float(os.getenv('PREFETCH_CHAIN_INTERVAL', '45'))
+PREFETCH_QUOTE_INTERVAL = float(os.getenv('PREFETCH_QUOTE_INTERVAL', '10'))
+PREFETCH_CLOSED_INTERVAL = float(os.getenv('PREFETCH_CLOSED_INTERVAL', '900'))
+PREFETCH_CONCURRENCY = int(os.getenv('PREFETCH_CONCURRENCY', '4'))
+# Refreshes started per second, to stay inside upstream rate limits
+PREFETCH_MAX_PER_SECOND = float(os.getenv('PREFETCH_MAX_PER_SECOND', '2'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'option_chains': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'option-chains',
+        'TIMEOUT': OPTION_CHAIN_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -147,4 +205,105 @@ POLYGON_API_KEY = os.getenv('POLYGON_API_KEY')
 ALPACA_API_KEY = os.getenv('ALPACA_API_KEY')
 ALPACA_SECRET_KEY = os.getenv('ALPACA_SECRET_KEY')
 ALPACA_BASE_URL = "https://paper-api.alpaca.markets"
-ALPACA_WS_URL = "wss://stream.data.alpaca.markets/v1beta1/options"
\ No newline at end of file
+ALPACA_DATA_URL = "https://data.alpaca.markets"
+# "indicative" is free; "opra" needs an Alpaca options data subscription
+ALPACA_OPTIONS_FEED = os.getenv('ALPACA_OPTIONS_FEED', 'indicative')
+ALPACA_WS_URL = "wss://stream.data.alpaca.markets/v1beta1/options"
+ALPACA_STOCK_WS_URL = os.getenv('ALPACA_STOCK_WS_URL', "wss://stream.data.alpaca.markets/v2/iex")
+
+# Messages buffered per streaming client before the oldest are dropped
+STREAM_CLIENT_QUEUE_SIZE = int(os.getenv('STREAM_CLIENT_QUEUE_SIZE', '256'))
+# Seconds streaming clients collect messages before sending one batched frame (0 = no wait)
+STREAM_FLUSH_INTERVAL = float(os.getenv('STREAM_FLUSH_INTERVAL', '0.25'))
+# Minimum seconds between live metrics recomputations per symbol (see put_calculator.live_metrics)
+LIVE_METRICS_INTERVAL = float(os.getenv('LIVE_METRICS_INTERVAL', '0.5'))
+# Positions one streaming client may register for live metrics
+LIVE_METRICS_MAX_POSITIONS = int(os.getenv('LIVE_METRICS_MAX_POSITIONS', '100'))
+
+# Upstream HTTP clients are pooled per provider (see put_calculator.providers).
+# UPSTREAM_PROVIDERS overrides any of the UPSTREAM_* settings below per provider
+# (pool_size, connect_timeout, read_timeout, rate_limit, burst, queue_timeout,
+# retries, backoff, max_backoff, failure_threshold, reset_timeout).
+UPSTREAM_POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', '10'))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '5'))
+UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', '10'))
+# Requests per second per provider and how many may go out back to back (see put_calculator.resilience);
+# the rate halves on every 429 and climbs back as calls succeed
+UPSTREAM_RATE_LIMIT = float(os.getenv('UPSTREAM_RATE_LIMIT', '10'))
+UPSTREAM_BURST = int(os.getenv('UPSTREAM_BURST', '20'))
+# Longest a call waits for the rate limiter before failing fast
+UPSTREAM_QUEUE_TIMEOUT = float(os.getenv('UPSTREAM_QUEUE_TIMEOUT', '3'))
+# Retries for connection errors, timeouts, 429 and 5xx, with jittered exponential backoff from
+# UPSTREAM_BACKOFF seconds, capped (with any Retry-After) at UPSTREAM_MAX_BACKOFF
+UPSTREAM_RETRIES = int(os.getenv('UPSTREAM_RETRIES', '2'))
+UPSTREAM_BACKOFF = float(os.getenv('UPSTREAM_BACKOFF', '0.25'))
+UPSTREAM_MAX_BACKOFF = float(os.getenv('UPSTREAM_MAX_BACKOFF', '2'))
+# Failed calls in a row that open a provider's circuit, and seconds it stays open before a trial call
+UPSTREAM_FAILURE_THRESHOLD = int(os.getenv('UPSTREAM_FAILURE_THRESHOLD', '5'))
+UPSTREAM_RESET_TIMEOUT = float(os.getenv('UPSTREAM_RESET_TIMEOUT', '30'))
+UPSTREAM_PROVIDERS = {
+    # Free-tier limits (200/min, 60/min); raise them on paid plans
+    'alpaca': {'rate_limit': 3, 'burst': 10},
+    'finnhub': {'rate_limit': 1, 'burst': 5},
+    'polygon': {},
+}
+# Seconds the last Alpaca stock price may stand in for it while Alpaca is unavailable
+UPSTREAM_LAST_PRICE_MAX_AGE = int(os.getenv('UPSTREAM_LAST_PRICE_MAX_AGE', '300'))
+
+# Annualized risk-free rate used for Black-Scholes pricing when a request doesn't supply one
+RISK_FREE_RATE = float(os.getenv('RISK_FREE_RATE', '0.045'))
+
+# Per-provider latency budgets (seconds) for the concurrent /api/quote/ fan-out
+QUOTE_DEFAULT_LATENCY_BUDGET = float(os.getenv('QUOTE_DEFAULT_LATENCY_BUDGET', '1.5'))
+QUOTE_LATENCY_BUDGETS = {
+    'finnhub': 1.0,
+    'polygon': 1.5,
+    'alpaca': 1.0,
+}
+
+# Multi-symbol endpoints: symbols per upstream request, parallel upstream requests and symbols per call
+BULK_BATCH_SIZES = {
+    'alpaca': 100,
+    'polygon': 250,
+}
+BULK_MAX_CONCURRENCY = int(os.getenv('BULK_MAX_CONCURRENCY', '8'))
+BULK_MAX_SYMBOLS = int(os.getenv('BULK_MAX_SYMBOLS', '500'))
+
+# Payoff curves: default and maximum prices evaluated per request, and how
+# long rendered curves stay cached (they depend only on the position)
+PAYOFF_DEFAULT_POINTS = int(os.getenv('PAYOFF_DEFAULT_POINTS', '2000'))
+PAYOFF_MAX_POINTS = int(os.getenv('PAYOFF_MAX_POINTS', '100000'))
+PAYOFF_CACHE_TTL = int(os.getenv('PAYOFF_CACHE_TTL', '3600'))
+
+# Chain endpoint bodies at least this large are gzip- or brotli-compressed (see put_calculator.conditional)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+
+# Monte Carlo simulation: worker processes, paths x steps above which runs
+# use the process pool, and per-request limits
+SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS', str(os.cpu_count() or 1)))
+SIMULATION_PARALLEL_THRESHOLD = int(os.getenv('SIMULATION_PARALLEL_THRESHOLD', '500000'))
+SIMULATION_DEFAULT_PATHS = int(os.getenv('SIMULATION_DEFAULT_PATHS', '100000'))
+SIMULATION_MAX_PATHS = int(os.getenv('SIMULATION_MAX_PATHS', '10000000'))
+SIMULATION_MAX_STEPS = int(os.getenv('SIMULATION_MAX_STEPS', '1000'))
+SIMULATION_MAX_SECONDS = float(os.getenv('SIMULATION_MAX_SECONDS', '10'))
+
+# Add a Server-Timing header (total, upstream providers, caches) to every response
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'True').lower() in ('true', '1')
+
+# put_calculator logs to the console; LOG_LEVEL=DEBUG shows request details,
+# LOG_LEVEL=CRITICAL turns it off
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'put_calculator': {
+            'handlers': ['console'],
+            'level': os.getenv('LOG_LEVEL', 'INFO').upper(),
+        },
+    },
+}
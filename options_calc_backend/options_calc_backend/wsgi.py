@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'options_calc_backend.settings')
 
 application = get_wsgi_application()
+
+# Only server processes load this module: warm their caches (put_calculator.prefetch)
+from put_calculator.prefetch import start_prefetching
+
+start_prefetching()
@@ -1,3 +1,16 @@
 from django.contrib import admin
+from .models import ChainSnapshot, QuoteSnapshot, TickBatch
 
-# Register your models here.
+
+@admin.register(ChainSnapshot, QuoteSnapshot)
+class SnapshotAdmin(admin.ModelAdmin):
+    list_display = ('underlying', 'fetched_at', 'contract_count')
+    list_filter = ('underlying',)
+    exclude = ('data',)
+
+
+@admin.register(TickBatch)
+class TickBatchAdmin(admin.ModelAdmin):
+    list_display = ('symbol', 'kind', 'first_at', 'last_at', 'count')
+    list_filter = ('symbol', 'kind')
+    exclude = ('data',)
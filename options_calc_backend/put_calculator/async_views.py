@@ -0,0 +1,250 @@
+# put_calculator/async_views.py
+import asyncio
+import logging
+from dataclasses import asdict
+from datetime import datetime
+import requests
+from django.conf import settings
+from django.views.decorators.http import require_GET
+from .chain_cache import chain_cache
+from .chains import load_put_chain_index
+from .conditional import conditional_json, content_etag, parse_fields
+from .providers import providers
+from .quotes import BULK_QUOTE_PROVIDERS, alpaca_price, bulk_prices, configured_providers, consensus_price, first_price
+from .resilience import ProviderUnavailable
+from .serialization import dumps_bytes, json_response
+from .views import CONTRACT_WINDOW_FIELDS, iv_surface
+
+logger = logging.getLogger(__name__)
+
+# Async views don't go through DRF (api_view has no async support), so they
+# build JSON responses directly with the fast codec. The provider SDKs are blocking and run via
+# asyncio.to_thread on the shared, pooled clients.
+
+
+def _provider_unavailable(error):
+    """503 for an upstream call refused locally (circuit open, rate limit queue full), with Retry-After"""
+    response = json_response({"error": f"Upstream provider unavailable: {error}"}, status=503)
+    response['Retry-After'] = error.retry_after_header()
+    return response
+
+
+def _symbol_list(request, param):
+    """Upper-cased, de-duplicated symbols from a comma-separated query param"""
+    symbols = [symbol.strip().upper() for symbol in request.GET.get(param, '').split(',')]
+    return list(dict.fromkeys(symbol for symbol in symbols if symbol))
+
+
+@require_GET
+async def get_finnhub_quote(request):
+    symbol = request.GET.get('symbol', 'AAPL')  # Get 'symbol' from query params, default to AAPL
+
+    if not settings.FINNHUB_API_KEY:
+        return json_response({"error": "FINNHUB_API_KEY is not set in settings."}, status=500)
+
+    try:
+        quote_data = await asyncio.to_thread(providers.finnhub().quote, symbol)
+        return json_response({"quote": quote_data})
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
+    except Exception as e:
+        return json_response({"error": f"Error fetching quote from Finnhub: {str(e)}"}, status=500)
+
+
+@require_GET
+async def get_last_quote_polygon(request):
+    ticker_symbol = request.GET.get('underlying_symbols', 'SPY')  # Default to SPY
+
+    if not ticker_symbol:
+        return json_response({"error": "underlying_symbols parameter is required."}, status=400)
+
+    if not settings.POLYGON_API_KEY:
+        return json_response({"error": "POLYGON_API_KEY is not set in settings."}, status=500)
+
+    try:
+        last_quote = await asyncio.to_thread(providers.polygon().get_last_quote, ticker_symbol)
+        if last_quote:
+            return json_response({"last_quote": asdict(last_quote)})
+        return json_response({"error": f"Could not retrieve last quote for {ticker_symbol}."}, status=404)
+
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
+    except Exception as e:
+        return json_response({"error": f"Error fetching last quote: {str(e)}"}, status=500)
+
+
+@require_GET
+async def get_option_contracts_alpaca(request):
+    """
+    ATM strike, nearest strikes and next expirations for a symbol (plus the
+    IV surface with include_iv). fields limits the response to some of
+    CONTRACT_WINDOW_FIELDS. The ETag hashes the chain version and the
+    selected strikes and expirations (plus the IV inputs when the surface
+    is included), so clients keep getting 304s while the stock price moves
+    within the same window. The latest trade (and, with Alpaca unavailable,
+    the other providers' consensus) is awaited rather than blocking a
+    worker thread.
+    """
+    ticker_symbol = request.GET.get('underlying_symbols', None)
+
+    if not ticker_symbol:
+        return json_response({"error": "underlying_symbols parameter is required."}, status=400)
+
+    include_iv = request.GET.get('include_iv', '').lower() in ('true', '1')
+    try:
+        fields = parse_fields(request, CONTRACT_WINDOW_FIELDS, CONTRACT_WINDOW_FIELDS[:4 if include_iv else 3])
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+
+    try:
+        current_stock_price = await alpaca_price(ticker_symbol)
+        if current_stock_price is None:
+            return json_response({"error": f"Could not retrieve latest stock trade price for {ticker_symbol}."}, status=404)
+
+        put_chain = await asyncio.to_thread(chain_cache.get_or_fetch, ticker_symbol, load_put_chain_index)
+
+        if not len(put_chain):
+            return json_response({"error": f"No put options found for {ticker_symbol}."}, status=404)
+
+        atm_strike, closest_strikes, next_expiration_dates = put_chain.window(current_stock_price)
+
+        def render():
+            results = {
+                "at_the_money_strike_price": atm_strike,
+                "closest_strike_prices": closest_strikes,
+                "next_expiration_dates": next_expiration_dates,
+            }
+            if "implied_volatility" in fields:
+                results["implied_volatility"] = iv_surface(put_chain, current_stock_price, closest_strikes, next_expiration_dates)
+            return dumps_bytes({name: results[name] for name in fields})
+
+        # Only what the body is built from: the chain and the window selected
+        # from it, plus the stock price, rate and date (time to expiration)
+        # that the IV surface is solved with
+        iv_inputs = (current_stock_price, settings.RISK_FREE_RATE, datetime.now().date()) if "implied_volatility" in fields else ()
+        etag = content_etag('contracts', ticker_symbol, put_chain.version, atm_strike, closest_strikes,
+                            next_expiration_dates, *iv_inputs, *fields)
+        return conditional_json(request, etag, render)
+
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
+    except requests.exceptions.RequestException as e:
+        logger.warning("Alpaca request failed for %s: %s", ticker_symbol, e)
+        return json_response({"error": f"Error fetching data from Alpaca: {str(e)}"}, status=500)
+    except Exception as e:
+        logger.exception("Unexpected error building option contracts for %s", ticker_symbol)
+        return json_response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+
+@require_GET
+async def get_quote(request):
+    """
+    Price for one symbol from Finnhub, Polygon and Alpaca queried concurrently.
+
+    mode=first (default) returns as soon as any provider gives a valid price;
+    mode=consensus waits for every provider (each bounded by its latency
+    budget) and returns the median. providers=finnhub,alpaca restricts the
+    fan-out.
+    """
+    symbol = request.GET.get('symbol')
+    if not symbol:
+        return json_response({"error": "symbol parameter is required."}, status=400)
+
+    mode = request.GET.get('mode', 'first')
+    if mode not in ('first', 'consensus'):
+        return json_response({"error": "mode must be 'first' or 'consensus'."}, status=400)
+
+    provider_names = configured_providers()
+    if request.GET.get('providers'):
+        requested = request.GET['providers'].split(',')
+        provider_names = [provider for provider in provider_names if provider in requested]
+    if not provider_names:
+        return json_response({"error": "No quote providers are configured."}, status=500)
+
+    if mode == 'first':
+        winner, results = await first_price(symbol, provider_names)
+        price = winner['price'] if winner else None
+        response = {"symbol": symbol, "mode": mode, "price": price,
+                    "provider": winner['provider'] if winner else None, "providers": results}
+    else:
+        price, results = await consensus_price(symbol, provider_names)
+        response = {"symbol": symbol, "mode": mode, "price": price, "providers": results}
+
+    if price is None:
+        response["error"] = f"No provider returned a price for {symbol}."
+        return json_response(response, status=502)
+    return json_response(response)
+
+
+@require_GET
+async def get_bulk_quotes(request):
+    """
+    Prices for a comma-separated list of symbols in one call.
+
+    Symbols are batched into multi-symbol Alpaca requests (falling back to
+    Polygon snapshots for anything Alpaca doesn't price), and the batches
+    run in parallel.
+    """
+    symbols = _symbol_list(request, 'symbols')
+    if not symbols:
+        return json_response({"error": "symbols parameter is required."}, status=400)
+    if len(symbols) > settings.BULK_MAX_SYMBOLS:
+        return json_response({"error": f"At most {settings.BULK_MAX_SYMBOLS} symbols per request."}, status=400)
+
+    provider_names = [provider for provider in BULK_QUOTE_PROVIDERS if provider in configured_providers()]
+    if not provider_names:
+        return json_response({"error": "No bulk quote providers are configured."}, status=500)
+
+    prices, sources, errors = await bulk_prices(symbols, provider_names)
+    return json_response({
+        "count": len(prices),
+        "prices": prices,
+        "sources": sources,
+        "missing": [symbol for symbol in symbols if symbol not in prices],
+        "errors": errors,
+    })
+
+
+@require_GET
+async def get_bulk_option_contracts(request):
+    """
+    get_option_contracts_alpaca for a comma-separated list of underlyings.
+
+    Stock prices come from batched quote requests; chains come from the chain
+    cache, with misses loaded in parallel (at most BULK_MAX_CONCURRENCY at once).
+    """
+    symbols = _symbol_list(request, 'underlying_symbols')
+    if not symbols:
+        return json_response({"error": "underlying_symbols parameter is required."}, status=400)
+    if len(symbols) > settings.BULK_MAX_SYMBOLS:
+        return json_response({"error": f"At most {settings.BULK_MAX_SYMBOLS} symbols per request."}, status=400)
+
+    provider_names = [provider for provider in BULK_QUOTE_PROVIDERS if provider in configured_providers()]
+    prices, _, _ = await bulk_prices(symbols, provider_names)
+
+    semaphore = asyncio.Semaphore(settings.BULK_MAX_CONCURRENCY)
+
+    async def load_chain(symbol):
+        async with semaphore:
+            return await asyncio.to_thread(chain_cache.get_or_fetch, symbol, load_put_chain_index)
+
+    priced = [symbol for symbol in symbols if symbol in prices]
+    chains = await asyncio.gather(*(load_chain(symbol) for symbol in priced), return_exceptions=True)
+
+    results = {}
+    errors = {symbol: "Could not retrieve latest stock price." for symbol in symbols if symbol not in prices}
+    for symbol, put_chain in zip(priced, chains):
+        if isinstance(put_chain, Exception):
+            errors[symbol] = f"Error fetching data from Alpaca: {str(put_chain)}"
+        elif not len(put_chain):
+            errors[symbol] = "No put options found."
+        else:
+            atm_strike, closest_strikes, next_expiration_dates = put_chain.window(prices[symbol])
+            results[symbol] = {
+                "stock_price": prices[symbol],
+                "at_the_money_strike_price": atm_strike,
+                "closest_strike_prices": closest_strikes,
+                "next_expiration_dates": next_expiration_dates,
+            }
+
+    return json_response({"count": len(results), "results": results, "errors": errors})
@@ -0,0 +1,546 @@
+# put_calculator/benchmarks.py
+import asyncio
+import itertools
+import json
+import os
+import pickle
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import requests as http
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+from . import serialization
+from .chain_cache import chain_cache
+from .chain_index import ChainIndex
+from .chains import OptionContract
+from .fakes import SENTINEL_TIMESTAMP, FakeProvider, ReplayServer
+from .metrics import STRATEGIES
+from .pricing import black_scholes
+from .providers import PooledSession, guards
+from .resilience import ProviderUnavailable
+from .simulation import pool_context, simulate_short_put
+from .snapshots import TICK_FIELDS
+
+# Sample Alpaca IEX stream frames (trades and quotes for a handful of
+# symbols) in the exact wire format; replace with a real capture to
+# benchmark against live traffic.
+RECORDED_FRAMES = Path(__file__).resolve().parent / 'benchmark_data' / 'alpaca_iex_frames.jsonl'
+
+
+def best_of(fn, repeat=5):
+    """Best wall time of repeat calls to fn, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_black_scholes(n=1_000_000):
+    """Put prices + all Greeks for n random strike/expiry pairs in one call"""
+    rng = np.random.default_rng(0)
+    strikes = rng.uniform(50, 150, n)
+    years = rng.uniform(1 / 365, 2, n)
+    seconds = best_of(lambda: black_scholes('put', 100.0, strikes, years, 0.25, 0.045))
+    return {'seconds': seconds, 'rate': n / seconds, 'unit': 'options/s', 'target': 1_000_000}
+
+
+def bench_strategy_metrics(n=1_000_000):
+    """Every strategy's metrics for n random strike/premium/expiry rows; rate is the slowest strategy"""
+    rng = np.random.default_rng(0)
+    strikes = rng.uniform(50, 150, n)
+    premiums = rng.uniform(0.05, 10, n)
+    days = rng.integers(0, 730, n)
+    timings = {
+        strategy: best_of(lambda: strategy_metrics(100.0, strikes, premiums, days, 1))
+        for strategy, (_, strategy_metrics) in STRATEGIES.items()
+    }
+    seconds = max(timings.values())
+    return {
+        'seconds': seconds,
+        'rate': n / seconds,
+        'unit': 'rows/s',
+        'details': {strategy: f"{n / t:,.0f} rows/s" for strategy, t in timings.items()},
+    }
+
+
+def bench_simulation_scaling(paths=4_000_000):
+    """
+    Monte Carlo short-put simulation of paths terminal prices on a process
+    pool of 1, 2, 4, ... up to every core. Rate is at the full core count.
+    """
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores} | {cores})
+    details = {}
+    rates = {}
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as executor:
+            run = lambda: simulate_short_put(100.0, 95.0, 1.5, 30 / 365, 0.3, 0.045, paths=paths, executor=executor)
+            run()  # start the workers
+            seconds = best_of(run, repeat=3)
+        rates[workers] = paths / seconds
+        details[f"{workers} workers"] = f"{rates[workers]:,.0f} paths/s, {rates[workers] / rates[1]:.2f}x"
+    details['inline (no pool)'] = f"{paths / best_of(lambda: simulate_short_put(100.0, 95.0, 1.5, 30 / 365, 0.3, 0.045, paths=paths), repeat=3):,.0f} paths/s"
+    return {'seconds': paths / rates[cores], 'rate': rates[cores], 'unit': 'paths/s', 'details': details}
+
+
+def load_recorded_frames(path=RECORDED_FRAMES):
+    """Raw upstream frames, one JSON array per line"""
+    with open(path) as frames:
+        return [line.rstrip('\n') for line in frames if line.strip()]
+
+
+def _tick_event(item):
+    return {
+        "symbol": item.get('S'),
+        "price": item.get('p', item.get('bp')),
+        "size": item.get('s', item.get('bs')),
+        "timestamp": item.get('t'),
+    }
+
+
+def bench_json_codec(frames=None):
+    """Decode each recorded frame and encode one outgoing event per tick, for each available JSON backend"""
+    frames = frames or load_recorded_frames()
+    ticks = sum(len(json.loads(frame)) for frame in frames)
+
+    def run(loads, dumps):
+        for frame in frames:
+            for item in loads(frame):
+                dumps(_tick_event(item))
+
+    backends = {'json': (json.loads, json.dumps)}
+    if serialization.orjson is not None:
+        backends['orjson'] = (serialization.orjson.loads, serialization.orjson.dumps)
+
+    timings = {name: best_of(lambda: run(*codec)) for name, codec in backends.items()}
+    seconds = timings[serialization.BACKEND]
+    return {
+        'seconds': seconds,
+        'rate': ticks / seconds,
+        'unit': 'ticks/s',
+        'details': {name: f"{t / ticks * 1e6:.2f} us/tick" for name, t in timings.items()},
+    }
+
+
+async def _stream_round(frames, subscribers):
+    from channels.routing import URLRouter
+    from channels.testing import WebsocketCommunicator
+    from .routing import websocket_urlpatterns
+    from .stream_hub import stream_hub
+
+    application = URLRouter(websocket_urlpatterns)
+    async with ReplayServer(frames) as server:
+        symbols = server.symbols
+        # Tick recording writes to the database off the event loop; leave it out of the measurement
+        with override_settings(ALPACA_STOCK_WS_URL=server.url, SNAPSHOT_RECORD_TICKS=False):
+            # Memory: what the connected, subscribed clients add (consumer,
+            # communicator, hub subscription and queue), before any data flows.
+            # Includes the hub's one upstream connection, amortised over clients.
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            clients = []
+            for i in range(subscribers):
+                symbol = symbols[i % len(symbols)]
+                communicator = WebsocketCommunicator(application, f"/ws/options/{symbol}/")
+                connected, _ = await communicator.connect()
+                if not connected:
+                    raise RuntimeError(f"Client for {symbol} was not accepted")
+                await communicator.receive_json_from()  # "connecting"
+                status = await communicator.receive_json_from()
+                if status.get('status') != 'connected':
+                    raise RuntimeError(f"Client for {symbol} failed to subscribe: {status.get('message')}")
+                clients.append(communicator)
+            memory_per_client = (tracemalloc.get_traced_memory()[0] - baseline) / subscribers
+            tracemalloc.stop()
+
+            await server.wait_for_subscribers({symbols[i % len(symbols)] for i in range(subscribers)})
+
+            latencies = []
+            delivered = 0
+
+            async def drain(communicator):
+                nonlocal delivered
+                while True:
+                    frame = await communicator.receive_json_from(timeout=60)
+                    received = time.perf_counter()
+                    for tick in frame.get('trades', []) + frame.get('quotes', []):
+                        if tick['timestamp'] == SENTINEL_TIMESTAMP:
+                            return
+                        latencies.append(received - server.sent_at[tick['timestamp']])
+                        delivered += 1
+
+            start = time.perf_counter()
+            drains = [asyncio.create_task(drain(communicator)) for communicator in clients]
+            await server.replay()
+            await asyncio.gather(*drains)
+            seconds = time.perf_counter() - start
+
+            dropped = stream_hub.stats()['dropped']
+            for communicator in clients:
+                await communicator.disconnect()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'seconds': seconds,
+        'ticks': server.tick_count,
+        'delivered': delivered,
+        'dropped': dropped,
+        'p50_ms': float(np.percentile(latencies, 50)) if latencies.size else float('nan'),
+        'p99_ms': float(np.percentile(latencies, 99)) if latencies.size else float('nan'),
+        'memory_per_client': memory_per_client,
+    }
+
+
+def bench_stream(frames=None, subscriber_counts=(1, 100, 1000)):
+    """
+    Replay the recorded frames through a local fake upstream, the shared
+    StreamHub and OptionPriceConsumer into in-process Channels clients
+    (spread across the recorded symbols), once per subscriber count.
+    Latency runs from the fake upstream sending a tick to a client
+    receiving the batch it is in, so it includes STREAM_FLUSH_INTERVAL.
+    """
+    frames = frames or load_recorded_frames()
+    details = {'flush interval': f"{settings.STREAM_FLUSH_INTERVAL * 1000:g} ms"}
+    result = None
+    for subscribers in subscriber_counts:
+        result = asyncio.run(_stream_round(frames, subscribers))
+        details[f"{subscribers} subscribers"] = (
+            f"{result['ticks'] / result['seconds']:,.0f} upstream ticks/s, "
+            f"{result['delivered'] / result['seconds']:,.0f} msgs/s delivered, "
+            f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+            f"{result['memory_per_client'] / 1024:.1f} KiB/client, {result['dropped']} dropped"
+        )
+    # Headline figure: delivered messages per second at the largest subscriber count
+    return {
+        'seconds': result['seconds'],
+        'rate': result['delivered'] / result['seconds'],
+        'unit': 'msgs/s',
+        'details': details,
+    }
+
+
+def synthetic_put_chain(contract_count, stock_price=100.0, expiration_count=50, seed=0):
+    """
+    A put chain shaped like a real one: weekly expirations from tomorrow on,
+    and strikes every 0.5 from 20% to 250% of stock_price, sampled so there
+    are contract_count contracts in total.
+    """
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    expirations = [(today + timedelta(days=1 + 7 * i)).isoformat() for i in range(expiration_count)]
+    strike_grid = np.arange(stock_price * 0.2, stock_price * 2.5, 0.5).round(2)
+    per_expiration = min(len(strike_grid), -(-contract_count // expiration_count))
+    contracts = []
+    for expiration in expirations:
+        for strike in np.sort(rng.choice(strike_grid, per_expiration, replace=False)):
+            if len(contracts) == contract_count:
+                break
+            contracts.append(OptionContract(
+                symbol=f"SYN{expiration.replace('-', '')[2:]}P{int(strike * 1000):08d}",
+                type='put',
+                strike_price=float(strike),
+                expiration_date=expiration,
+                close_price=round(float(max(strike - stock_price, 0) + rng.uniform(0.05, 5)), 2),
+            ))
+    return contracts
+
+
+def _alpaca_contract(contract):
+    """An OptionContract as the /v2/options/contracts dict it was parsed from"""
+    return {
+        "id": f"{abs(hash(contract.symbol)):032x}"[:32], "symbol": contract.symbol,
+        "name": f"SYN {contract.expiration_date} {contract.strike_price:.2f} Put",
+        "status": "active", "tradable": True, "expiration_date": contract.expiration_date,
+        "root_symbol": "SYN", "underlying_symbol": "SYN", "underlying_asset_id": "0" * 32,
+        "type": contract.type, "style": "american", "strike_price": f"{contract.strike_price:g}",
+        "multiplier": "100", "size": "100", "open_interest": "0", "open_interest_date": contract.expiration_date,
+        "close_price": f"{contract.close_price:g}", "close_price_date": contract.expiration_date,
+    }
+
+
+def _unpickled_bytes(blob):
+    """Memory held by the objects pickle.loads(blob) creates, as a cache hit would"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    value = pickle.loads(blob)
+    size = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def bench_chain_memory(contract_counts=(1_000, 5_000, 50_000)):
+    """
+    Memory per put chain as raw Alpaca contract dicts, as a list of
+    OptionContract records and as the columnar ChainIndex the chain cache
+    holds, plus the ChainIndex's pickled size and unpickle time (the cost
+    of a chain cache hit). Also bytes per buffered stream tick as a parsed
+    message vs a tick record. Rate is contracts per MiB of ChainIndex for
+    the largest chain.
+    """
+    details = {}
+    for contract_count in contract_counts:
+        contracts = synthetic_put_chain(contract_count)
+        chain = ChainIndex(contracts)
+        chain_blob = pickle.dumps(chain, pickle.HIGHEST_PROTOCOL)
+        unpickle_seconds = best_of(lambda: pickle.loads(chain_blob))
+        api_bytes = _unpickled_bytes(pickle.dumps([_alpaca_contract(c) for c in contracts], pickle.HIGHEST_PROTOCOL))
+        record_bytes = _unpickled_bytes(pickle.dumps(contracts, pickle.HIGHEST_PROTOCOL))
+        chain_bytes = _unpickled_bytes(chain_blob)
+        details[f"{contract_count:,} contracts"] = (
+            f"{api_bytes / 1024:,.0f} KiB as API dicts, {record_bytes / 1024:,.0f} KiB as records, "
+            f"{chain_bytes / 1024:,.0f} KiB as ChainIndex ({len(chain_blob) / 1024:,.0f} KiB pickled, "
+            f"{unpickle_seconds * 1000:.2f} ms to unpickle)"
+        )
+
+    items = [item for frame in load_recorded_frames() for item in serialization.loads(frame) if item.get('T') in TICK_FIELDS]
+    ticks = [TICK_FIELDS[item['T']][1](item['t'], *(item.get(key) for key in TICK_FIELDS[item['T']][2])) for item in items]
+    details['buffered tick'] = (
+        f"{_unpickled_bytes(pickle.dumps(items)) / len(items):.0f} bytes as a parsed message, "
+        f"{_unpickled_bytes(pickle.dumps(ticks)) / len(ticks):.0f} bytes as a tick record"
+    )
+    return {
+        'seconds': unpickle_seconds,
+        'rate': contract_count / (chain_bytes / 2 ** 20),
+        'unit': 'contracts/MiB',
+        'details': details,
+    }
+
+
+def _requests_per_second(send, requests=200):
+    """Time requests calls to send (after one warm-up call), best of 3 runs"""
+    send()
+    seconds = best_of(lambda: [send() for _ in range(requests)], repeat=3)
+    return {'seconds': seconds, 'rate': requests / seconds, 'unit': 'requests/s'}
+
+
+def _check(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.request['PATH_INFO']} returned {response.status_code}: {response.content[:200]!r}")
+    return response
+
+
+def bench_put_metrics_endpoint(requests=500):
+    """POST /api/options/puts/calculate/ with and without Greeks"""
+    client = Client(HTTP_HOST='localhost')
+    url = reverse('calculate_put_metrics')
+    payload = {
+        'ticker_symbol': 'SYN', 'stock_price': 100, 'strike_price': 95, 'option_premium': 1.25,
+        'number_of_contracts': 2, 'expiration_date_str': (date.today() + timedelta(days=30)).isoformat(),
+    }
+    with_greeks = dict(payload, volatility=0.3)
+
+    result = _requests_per_second(lambda: _check(client.post(url, payload, content_type='application/json')), requests)
+    greeks = _requests_per_second(lambda: _check(client.post(url, with_greeks, content_type='application/json')), requests)
+    result['details'] = {'with volatility (Greeks)': f"{greeks['rate']:,.0f} requests/s"}
+    return result
+
+
+def _bench_contracts_endpoint(contract_count, requests=50):
+    """
+    GET /api/options/contracts/alpaca/ against a synthetic chain: the stock
+    price and chain loader are stubbed and the chain is cached, so this
+    times the cache read, strike/expiration selection and rendering. The
+    price moves a strike (0.5) per request, so every request selects a new
+    window and misses the rendered-body cache.
+    """
+    contracts = synthetic_put_chain(contract_count)
+    index_seconds = best_of(lambda: ChainIndex(contracts), repeat=3)
+    put_chain = ChainIndex(contracts)
+
+    client = Client(HTTP_HOST='localhost')
+    url = reverse('get_option_contracts_alpaca')
+    symbol = f"SYN{contract_count}"
+    # From 50 up: warm-up plus 3 runs stay within the chain's 20-250 strikes
+    prices = (50.0 + 0.5 * i for i in itertools.count())
+    chain_cache.delete(symbol)
+    with mock.patch('put_calculator.async_views.alpaca_price', side_effect=lambda symbol: next(prices)), \
+            mock.patch('put_calculator.async_views.load_put_chain_index', return_value=put_chain):
+        result = _requests_per_second(lambda: _check(client.get(url, {'underlying_symbols': symbol})), requests)
+    chain_cache.delete(symbol)
+
+    result['details'] = {'index build': f"{index_seconds * 1000:.2f} ms"}
+    return result
+
+
+def bench_contracts_endpoint_5k():
+    return _bench_contracts_endpoint(5_000)
+
+
+def bench_contracts_endpoint_50k():
+    return _bench_contracts_endpoint(50_000)
+
+
+def bench_chain_payload(contract_count=20_000, requests=50):
+    """
+    GET /api/options/puts/ for a synthetic chain (loader stubbed, chain
+    cached): response size and requests/s for the first render, repeats
+    served from the rendered-body cache (identity and gzip), 304s for a
+    matching If-None-Match, and a two-field projection. Rate is the 304s.
+    """
+    put_chain = ChainIndex(synthetic_put_chain(contract_count))
+    client = Client(HTTP_HOST='localhost')
+    url = reverse('get_put_options_data')
+    symbol = f"SYN{contract_count}"
+    params = {'ticker': symbol}
+    projected = {'ticker': symbol, 'fields': 'strike_price,expiration_date'}
+    details = {}
+    chain_cache.delete(symbol)
+    with mock.patch('put_calculator.views.load_put_chain_index', return_value=put_chain):
+        start = time.perf_counter()
+        full = _check(client.get(url, params))
+        details['first render'] = f"{(time.perf_counter() - start) * 1000:,.1f} ms, {len(full.content) / 1024:,.0f} KiB"
+
+        for label, query, headers in (('cached', params, {}),
+                                      ('cached, gzip', params, {'HTTP_ACCEPT_ENCODING': 'gzip'}),
+                                      ('fields=strike_price,expiration_date, gzip', projected, {'HTTP_ACCEPT_ENCODING': 'gzip'})):
+            size = len(_check(client.get(url, query, **headers)).content)
+            rate = _requests_per_second(lambda: _check(client.get(url, query, **headers)), requests)['rate']
+            details[label] = f"{rate:,.0f} requests/s, {size / 1024:,.0f} KiB"
+
+        def not_modified():
+            response = client.get(url, params, HTTP_IF_NONE_MATCH=full['ETag'])
+            if response.status_code != 304:
+                raise RuntimeError(f"expected 304, got {response.status_code}")
+        result = _requests_per_second(not_modified, requests * 10)
+    chain_cache.delete(symbol)
+
+    result['details'] = details
+    return result
+
+
+def _stub_price(symbol):
+    return 100.0
+
+
+def _stub_prices(symbols):
+    return {symbol: 100.0 for symbol in symbols}
+
+
+def bench_quote_endpoints(requests=200):
+    """
+    The async quote views with every provider stubbed to answer instantly:
+    the cost of the fan-out, thread hand-off and response building.
+    """
+    client = Client(HTTP_HOST='localhost')
+    bulk_symbols = ','.join(f"SYM{i}" for i in range(settings.BULK_MAX_SYMBOLS))
+    stubbed = override_settings(FINNHUB_API_KEY='stub', POLYGON_API_KEY='stub',
+                                ALPACA_API_KEY='stub', ALPACA_SECRET_KEY='stub')
+    with stubbed, \
+            mock.patch.dict('put_calculator.quotes.QUOTE_PROVIDERS', {name: _stub_price for name in ('finnhub', 'polygon', 'alpaca')}), \
+            mock.patch.dict('put_calculator.quotes.BULK_QUOTE_PROVIDERS', {name: _stub_prices for name in ('alpaca', 'polygon')}):
+        first = _requests_per_second(lambda: _check(client.get(reverse('get_quote'), {'symbol': 'SYN'})), requests)
+        consensus = _requests_per_second(
+            lambda: _check(client.get(reverse('get_quote'), {'symbol': 'SYN', 'mode': 'consensus'})), requests)
+        bulk = _requests_per_second(lambda: _check(client.get(reverse('get_bulk_quotes'), {'symbols': bulk_symbols})), 20)
+
+    first['details'] = {
+        'mode=consensus': f"{consensus['rate']:,.0f} requests/s",
+        f"bulk ({settings.BULK_MAX_SYMBOLS} symbols)": f"{bulk['rate']:,.0f} requests/s",
+    }
+    return first
+
+
+def _hammer(send, threads, seconds):
+    """Call send() from threads threads for seconds; returns (latencies of successes, failures)"""
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        latencies, failures = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = send().status_code == 200
+            except http.RequestException:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                failures += 1
+        return latencies, failures
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: worker(), range(threads)))
+    return [latency for latencies, _ in results for latency in latencies], sum(failures for _, failures in results)
+
+
+def bench_upstream_rate_limit(upstream_rate=20, threads=16, seconds=3.0):
+    """
+    threads threads calling a local FakeProvider that allows upstream_rate
+    requests/s and answers 429 beyond that: first with a plain session,
+    then through a PooledSession whose guard is configured at twice the
+    upstream rate, so it has to adapt. Then the provider fails every
+    request until the circuit opens, and calls are timed failing fast.
+    Rate is successful guarded calls per second.
+    """
+    config = {'rate_limit': upstream_rate * 2, 'burst': upstream_rate // 2, 'queue_timeout': 5, 'retries': 2,
+              'backoff': 0.05, 'max_backoff': 1, 'failure_threshold': 5, 'reset_timeout': 60}
+    details = {}
+    with FakeProvider(rate_limit=upstream_rate) as upstream, \
+            override_settings(UPSTREAM_PROVIDERS=dict(settings.UPSTREAM_PROVIDERS, fake=config)):
+        plain = http.Session()
+        latencies, failures = _hammer(lambda: plain.get(upstream.url, timeout=5), threads, seconds)
+        details['unguarded'] = (
+            f"{len(latencies) / seconds:,.0f} ok/s, {failures:,} failed, {upstream.throttled:,} 429s upstream"
+        )
+
+        guards.reset()
+        session = PooledSession('fake', pool_size=threads, connect_timeout=5, read_timeout=5)
+        upstream.throttled = 0
+        time.sleep(1)  # a fresh rate limit window
+        latencies, failures = _hammer(lambda: session.get(upstream.url), threads, seconds)
+        guard = guards.get('fake').stats()
+        details['guarded'] = (
+            f"{len(latencies) / seconds:,.0f} ok/s, {failures:,} failed, {upstream.throttled:,} 429s upstream, "
+            f"p50 {np.percentile(latencies, 50) * 1000:,.0f} ms, p99 {np.percentile(latencies, 99) * 1000:,.0f} ms, "
+            f"rate limit settled at {guard['rate_limit']:g}/s"
+        )
+        ok_rate = len(latencies) / seconds
+
+        upstream.fail_status = 503
+        upstream.rate_limit = None
+        while guards.get('fake').breaker.state != 'open':
+            try:
+                session.get(upstream.url)
+            except http.RequestException:
+                pass
+
+        def fail_fast():
+            try:
+                session.get(upstream.url)
+            except ProviderUnavailable:
+                pass
+        calls = 1_000
+        open_seconds = best_of(lambda: [fail_fast() for _ in range(calls)], repeat=3)
+        details['circuit open'] = (
+            f"{open_seconds / calls * 1e6:.1f} µs per rejected call, "
+            f"{upstream.failed} requests reached the failing provider"
+        )
+        session.close()
+        guards.reset()
+
+    return {'seconds': seconds, 'rate': ok_rate, 'unit': 'ok calls/s', 'details': details}
+
+
+BENCHMARKS = {
+    'black_scholes': bench_black_scholes,
+    'strategy_metrics': bench_strategy_metrics,
+    'simulation_scaling': bench_simulation_scaling,
+    'json_codec': bench_json_codec,
+    'stream': bench_stream,
+    'put_metrics_endpoint': bench_put_metrics_endpoint,
+    'contracts_endpoint_5k': bench_contracts_endpoint_5k,
+    'contracts_endpoint_50k': bench_contracts_endpoint_50k,
+    'quote_endpoints': bench_quote_endpoints,
+    'chain_memory': bench_chain_memory,
+    'chain_payload': bench_chain_payload,
+    'upstream_rate_limit': bench_upstream_rate_limit,
+}
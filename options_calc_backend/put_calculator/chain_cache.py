@@ -0,0 +1,152 @@
+# put_calculator/chain_cache.py
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from .instrumentation import record_cache, span
+
+
+class _Flight:
+    """One in-progress upstream fetch that concurrent callers wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ChainCache:
+    """
+    Option chains keyed by underlying symbol, stored in a Django cache.
+
+    Entries expire after OPTION_CHAIN_CACHE_TTL seconds. On top of the
+    backend's own culling, the cache keeps an LRU index of entry sizes and
+    evicts the least recently used chains once OPTION_CHAIN_CACHE_MAX_BYTES
+    is exceeded. Concurrent misses for the same symbol share one call to
+    the loader (single-flight). The LRU index and counters are per process.
+    ttl_setting names the setting that holds the TTL.
+    """
+
+    def __init__(self, alias='option_chains', key_prefix='chain', ttl_setting='OPTION_CHAIN_CACHE_TTL'):
+        self.alias = alias
+        self.key_prefix = key_prefix
+        self.ttl_setting = ttl_setting
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()  # key -> (size in bytes, expires at)
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def ttl(self):
+        return getattr(settings, self.ttl_setting)
+
+    @property
+    def max_bytes(self):
+        return settings.OPTION_CHAIN_CACHE_MAX_BYTES
+
+    def make_key(self, symbol):
+        return f"{self.key_prefix}:{symbol.upper()}"
+
+    def get(self, symbol):
+        key = self.make_key(symbol)
+        with span(self.key_prefix):
+            chain = self.backend.get(key)
+        record_cache(self.key_prefix, chain is not None)
+        with self._lock:
+            if chain is None:
+                self.misses += 1
+                self._lru.pop(key, None)
+            else:
+                self.hits += 1
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+        return chain
+
+    def set(self, symbol, chain):
+        key = self.make_key(symbol)
+        size = len(pickle.dumps(chain, pickle.HIGHEST_PROTOCOL))
+        self.backend.set(key, chain, timeout=self.ttl)
+        with self._lock:
+            self._lru[key] = (size, time.monotonic() + self.ttl)
+            self._lru.move_to_end(key)
+            self._evict()
+
+    def delete(self, symbol):
+        key = self.make_key(symbol)
+        self.backend.delete(key)
+        with self._lock:
+            self._lru.pop(key, None)
+
+    def get_or_fetch(self, symbol, loader):
+        """Return the cached chain for symbol, calling loader(symbol) once on a miss"""
+        chain = self.get(symbol)
+        if chain is not None:
+            return chain
+        return self.refresh(symbol, loader)
+
+    def refresh(self, symbol, loader):
+        """Call loader(symbol) and cache the result, joining a fetch for symbol already in flight"""
+        key = self.make_key(symbol)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = loader(symbol)
+            self.set(symbol, flight.result)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _evict(self):
+        # Caller holds self._lock
+        now = time.monotonic()
+        for key in [k for k, (_, expires_at) in self._lru.items() if expires_at <= now]:
+            del self._lru[key]
+
+        total = sum(size for size, _ in self._lru.values())
+        while total > self.max_bytes and len(self._lru) > 1:
+            key, (size, _) = self._lru.popitem(last=False)
+            self.backend.delete(key)
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "entries": len(self._lru),
+                "bytes": sum(size for size, _ in self._lru.values()),
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+
+chain_cache = ChainCache()
+# Option bid/ask snapshots go stale much faster than the chain itself
+quote_cache = ChainCache(key_prefix='quotes', ttl_setting='OPTION_QUOTE_CACHE_TTL')
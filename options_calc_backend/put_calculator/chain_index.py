@@ -0,0 +1,223 @@
+# put_calculator/chain_index.py
+import hashlib
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime, timezone
+import numpy as np
+
+# Single-contract records, for code that walks contracts one at a time; with
+# prices parsed once. Whole chains and quote sets are kept as columns below.
+OptionContract = namedtuple('OptionContract', ['symbol', 'type', 'strike_price', 'expiration_date', 'close_price'])
+OptionQuote = namedtuple('OptionQuote', ['bid_price', 'ask_price'])
+
+
+def _days(dates):
+    """ISO dates (or datetime64) as int32 days since 1970-01-01"""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int32)
+
+
+def _symbols(symbols):
+    # OCC symbols are ASCII; bytes take a quarter of numpy's unicode width
+    return np.asarray(symbols, dtype='S')
+
+
+class ChainIndex:
+    """
+    One underlying's option contracts as a struct of arrays, sorted by
+    expiration then strike.
+
+    Columns: symbol (ASCII bytes), strike_price, close_price (float64),
+    expiration (int32 days since 1970-01-01) and is_call. A chain is a few
+    arrays rather than one object per contract, so it stays small in memory
+    and pickles in and out of the chain cache as a handful of buffers. Each
+    expiration's contracts are one contiguous slice with sorted strikes, so
+    exact lookups are a binary search and ATM/k-nearest strike queries are
+    a bisect plus a walk outwards: O(log n + k).
+
+    version is a hash of the columns, the same for identical chains however
+    they were loaded, and fetched_at (UTC) is when the data came from
+    upstream; responses built from the chain use them for ETag and
+    Last-Modified.
+    """
+
+    def __init__(self, contracts=(), fetched_at=None):
+        columns = ([], [], [], [], [])
+        for contract in contracts:
+            columns[0].append(contract.symbol)
+            columns[1].append(contract.strike_price)
+            columns[2].append(contract.expiration_date)
+            columns[3].append(contract.type == 'call')
+            columns[4].append(contract.close_price)
+        self._set_columns(*columns, fetched_at=fetched_at)
+
+    @classmethod
+    def from_columns(cls, symbol, strike_price, expiration_date, close_price, is_call=False, fetched_at=None):
+        """A chain straight from column arrays (expiration_date as ISO strings or datetime64)"""
+        chain = cls.__new__(cls)
+        chain._set_columns(symbol, strike_price, expiration_date, np.broadcast_to(is_call, len(strike_price)), close_price,
+                           fetched_at=fetched_at)
+        return chain
+
+    def _set_columns(self, symbol, strike_price, expiration_date, is_call, close_price, fetched_at=None):
+        strike_price = np.asarray(strike_price, dtype=np.float64)
+        expiration = _days(expiration_date)
+        order = np.lexsort((strike_price, expiration))
+
+        self.symbol = _symbols(symbol)[order]
+        self.strike_price = strike_price[order]
+        self.expiration = expiration[order]
+        self.is_call = np.asarray(is_call, dtype=bool)[order]
+        self.close_price = np.asarray(close_price, dtype=np.float64)[order]
+
+        # Row range of each expiration: rows _offsets[i]:_offsets[i + 1]
+        self._expiration_days, starts = np.unique(self.expiration, return_index=True)
+        self._offsets = np.append(starts, len(order))
+        # ISO dates sort chronologically as strings
+        self.expirations = np.datetime_as_string(self._expiration_days.astype('datetime64[D]')).tolist()
+        self.strikes = np.unique(self.strike_price).tolist()
+
+        digest = hashlib.blake2b(digest_size=16)
+        for column in (self.symbol, self.strike_price, self.expiration, self.is_call, self.close_price):
+            digest.update(np.ascontiguousarray(column).data)
+        self.version = digest.hexdigest()
+        self.fetched_at = fetched_at or datetime.now(timezone.utc)
+
+    def __len__(self):
+        return len(self.strike_price)
+
+    def _rows_for(self, expiration):
+        """Row slice for one ISO expiration (empty if the chain has none)"""
+        i = np.searchsorted(self._expiration_days, _days(expiration))
+        if i < len(self._expiration_days) and self._expiration_days[i] == _days(expiration):
+            return slice(self._offsets[i], self._offsets[i + 1])
+        return slice(0, 0)
+
+    def record(self, row):
+        """The contract at a row as an OptionContract"""
+        return OptionContract(
+            self.symbol[row].decode('ascii'),
+            'call' if self.is_call[row] else 'put',
+            float(self.strike_price[row]),
+            str(self.expiration[row].astype('datetime64[D]')),
+            float(self.close_price[row]),
+        )
+
+    def strikes_for(self, expiration=None):
+        """Sorted strikes for one expiration, or unique strikes across the chain"""
+        if expiration is None:
+            return self.strikes
+        return self.strike_price[self._rows_for(expiration)].tolist()
+
+    def contracts_for(self, expiration):
+        """Contracts for one expiration, sorted by strike"""
+        rows = self._rows_for(expiration)
+        return [self.record(row) for row in range(rows.start, rows.stop)]
+
+    def rows(self, expirations, strikes):
+        """len(expirations) x len(strikes) array of row numbers, -1 where there's no contract"""
+        strikes = np.asarray(strikes, dtype=np.float64)
+        rows = np.full((len(expirations), len(strikes)), -1, dtype=np.int64)
+        for i, expiration in enumerate(expirations):
+            span = self._rows_for(expiration)
+            expiration_strikes = self.strike_price[span]
+            found = np.searchsorted(expiration_strikes, strikes)
+            exact = found < len(expiration_strikes)
+            exact[exact] = expiration_strikes[found[exact]] == strikes[exact]
+            rows[i, exact] = span.start + found[exact]
+        return rows
+
+    def contract(self, expiration, strike_price):
+        """The contract at an exact expiration/strike, or None"""
+        row = self.rows([expiration], [strike_price])[0, 0]
+        return self.record(row) if row >= 0 else None
+
+    def price_grid(self, expirations, strikes, field='close_price'):
+        """len(expirations) x len(strikes) array of a contract price column, NaN where there's no contract"""
+        rows = self.rows(expirations, strikes)
+        grid = np.full(rows.shape, np.nan)
+        grid[rows >= 0] = getattr(self, field)[rows[rows >= 0]]
+        return grid
+
+    def nearest_strikes(self, price, k, expiration=None, lower_bound=None, upper_bound=None):
+        """
+        Up to k strikes closest to price, nearest first, optionally limited to
+        one expiration and to [lower_bound, upper_bound].
+        """
+        strikes = self.strikes_for(expiration)
+        lo = bisect_left(strikes, lower_bound) if lower_bound is not None else 0
+        hi = bisect_right(strikes, upper_bound) if upper_bound is not None else len(strikes)
+
+        right = bisect_left(strikes, price, lo, hi)
+        left = right - 1
+        nearest = []
+        while len(nearest) < k and (left >= lo or right < hi):
+            if right >= hi or (left >= lo and price - strikes[left] <= strikes[right] - price):
+                nearest.append(strikes[left])
+                left -= 1
+            else:
+                nearest.append(strikes[right])
+                right += 1
+        return nearest
+
+    def atm_strike(self, price, expiration=None):
+        """Strike closest to price, or None for an empty chain"""
+        nearest = self.nearest_strikes(price, 1, expiration)
+        return nearest[0] if nearest else None
+
+    def window(self, stock_price, strike_count=21, expiration_count=8, from_date=None):
+        """
+        The strike/expiration window the calculator works with: the ATM
+        strike, the strike_count strikes nearest stock_price within 50% of
+        ATM (sorted) and the next expiration_count expirations.
+        """
+        atm_strike = self.atm_strike(stock_price)
+        lower_bound = atm_strike - (10 * abs(atm_strike * 0.05))
+        upper_bound = atm_strike + (10 * abs(atm_strike * 0.05))
+
+        closest_strikes = self.nearest_strikes(
+            stock_price, strike_count, lower_bound=lower_bound, upper_bound=upper_bound
+        )
+
+        from_date = from_date or datetime.now().date().isoformat()
+        return atm_strike, sorted(closest_strikes), self.next_expirations(from_date, expiration_count)
+
+    def next_expirations(self, from_date, n):
+        """The first n expirations on or after from_date (YYYY-MM-DD)"""
+        i = bisect_left(self.expirations, from_date)
+        return self.expirations[i:i + n]
+
+
+class OptionQuotes:
+    """
+    Bid/ask per contract symbol as sorted columns (symbol as ASCII bytes),
+    looked up by binary search; NaN where a side wasn't quoted.
+    """
+
+    def __init__(self, symbol, bid_price, ask_price):
+        symbol = _symbols(symbol)
+        order = np.argsort(symbol, kind='stable')
+        self.symbol = symbol[order]
+        self.bid_price = np.asarray(bid_price, dtype=np.float64)[order]
+        self.ask_price = np.asarray(ask_price, dtype=np.float64)[order]
+
+    def __len__(self):
+        return len(self.symbol)
+
+    def lookup(self, symbols):
+        """(bids, asks) arrays for contract symbols, NaN for symbols without a quote"""
+        symbols = _symbols(symbols)
+        bids = np.full(symbols.shape, np.nan)
+        asks = np.full(symbols.shape, np.nan)
+        if len(self.symbol):
+            i = np.minimum(np.searchsorted(self.symbol, symbols), len(self.symbol) - 1)
+            found = self.symbol[i] == symbols
+            bids[found] = self.bid_price[i[found]]
+            asks[found] = self.ask_price[i[found]]
+        return bids, asks
+
+    def get(self, symbol, default=None):
+        """OptionQuote for one contract symbol, or default"""
+        i = np.searchsorted(self.symbol, symbol.encode('ascii'))
+        if i < len(self.symbol) and self.symbol[i] == symbol.encode('ascii'):
+            return OptionQuote(float(self.bid_price[i]), float(self.ask_price[i]))
+        return default
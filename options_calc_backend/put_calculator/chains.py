@@ -0,0 +1,136 @@
+# put_calculator/chains.py
+from django.conf import settings
+from .chain_index import ChainIndex, OptionContract, OptionQuote, OptionQuotes
+from .providers import providers
+
+OPTIONS_CONTRACTS_ENDPOINT = "/v2/options/contracts"
+OPTIONS_SNAPSHOTS_ENDPOINT = "/v1beta1/options/snapshots/{underlying_symbol}"
+PAGE_LIMIT = 1000  # Alpaca's maximum page size
+
+
+def alpaca_headers():
+    return {
+        "accept": "application/json",
+        "APCA-API-KEY-ID": settings.ALPACA_API_KEY,
+        "APCA-API-SECRET-KEY": settings.ALPACA_SECRET_KEY
+    }
+
+
+def iter_contract_pages(underlying_symbol, contract_type=None, session=None, page_limit=PAGE_LIMIT):
+    """
+    Yield each page of raw contract dicts from Alpaca's /v2/options/contracts,
+    following next_page_token until the chain is exhausted.
+    """
+    params = {
+        "underlying_symbols": underlying_symbol,
+        "limit": page_limit
+    }
+    if contract_type:
+        params["type"] = contract_type
+
+    if session is None:
+        session = providers.session('alpaca')
+
+    url = f"{settings.ALPACA_BASE_URL}{OPTIONS_CONTRACTS_ENDPOINT}"
+    while True:
+        response = session.get(url, params=params, headers=alpaca_headers())
+        response.raise_for_status()
+        page = response.json()
+
+        yield page.get("option_contracts") or []
+
+        next_page_token = page.get("next_page_token")
+        if not next_page_token:
+            break
+        params["page_token"] = next_page_token
+
+
+def iter_option_contracts(underlying_symbol, contract_type=None, session=None, page_limit=PAGE_LIMIT):
+    """Stream OptionContract records for a whole chain, one page in memory at a time"""
+    for page in iter_contract_pages(underlying_symbol, contract_type, session, page_limit):
+        for contract in page:
+            if contract_type and contract.get("type") != contract_type:
+                continue
+            yield OptionContract(
+                contract.get("symbol"),
+                contract.get("type"),
+                float(contract.get("strike_price", 0)),
+                contract.get("expiration_date"),
+                float(contract.get("close_price") or "nan"),
+            )
+
+
+def iter_snapshot_pages(underlying_symbol, contract_type=None, session=None, page_limit=PAGE_LIMIT):
+    """
+    Yield each page of option snapshots ({contract symbol: snapshot}) from
+    Alpaca's market data API, following next_page_token.
+    """
+    params = {
+        "feed": settings.ALPACA_OPTIONS_FEED,
+        "limit": page_limit
+    }
+    if contract_type:
+        params["type"] = contract_type
+
+    if session is None:
+        session = providers.session('alpaca')
+
+    url = f"{settings.ALPACA_DATA_URL}{OPTIONS_SNAPSHOTS_ENDPOINT.format(underlying_symbol=underlying_symbol)}"
+    while True:
+        response = session.get(url, params=params, headers=alpaca_headers())
+        response.raise_for_status()
+        page = response.json()
+
+        yield page.get("snapshots") or {}
+
+        next_page_token = page.get("next_page_token")
+        if not next_page_token:
+            break
+        params["page_token"] = next_page_token
+
+
+def fetch_put_quotes(underlying_symbol):
+    """Latest bid/ask for every put on underlying_symbol from Alpaca, as OptionQuotes"""
+    symbols, bids, asks = [], [], []
+    for page in iter_snapshot_pages(underlying_symbol, contract_type="put"):
+        for symbol, snapshot in page.items():
+            latest_quote = (snapshot or {}).get("latestQuote") or {}
+            # A zero bid is a real quote (nobody buying), unlike a missing one
+            symbols.append(symbol)
+            bids.append(float(latest_quote["bp"]) if latest_quote.get("bp") is not None else float("nan"))
+            asks.append(float(latest_quote["ap"]) if latest_quote.get("ap") is not None else float("nan"))
+    return OptionQuotes(symbols, bids, asks)
+
+
+def load_put_chain(underlying_symbol):
+    """All put contracts for underlying_symbol, across every page, as a ChainIndex"""
+    return ChainIndex(iter_option_contracts(underlying_symbol, contract_type="put"))
+
+
+def load_put_chain_index(underlying_symbol, max_age=None):
+    """
+    Indexed put chain for underlying_symbol, as stored in the chain cache:
+    fetched from Alpaca and snapshotted. On a cold start a stored chain
+    newer than max_age seconds (default SNAPSHOT_CHAIN_MAX_AGE) is served
+    instead, and if Alpaca fails the newest stored chain is.
+    """
+    from .snapshots import latest_chain, save_chain, warm_or_fetch  # snapshots imports the containers above
+    return warm_or_fetch(
+        underlying_symbol, latest_chain, load_put_chain, save_chain,
+        settings.SNAPSHOT_CHAIN_MAX_AGE if max_age is None else max_age
+    )
+
+
+def load_put_quotes(underlying_symbol, max_age=None):
+    """
+    Put quotes for underlying_symbol, as stored in the quote cache: fetched
+    and snapshotted (which also builds up quote history). On a cold start
+    stored quotes newer than max_age seconds (default
+    SNAPSHOT_QUOTE_MAX_AGE) are served instead, and if Alpaca fails the
+    newest stored quotes are.
+    """
+    from .snapshots import latest_quotes, save_quotes, warm_or_fetch
+    return warm_or_fetch(
+        underlying_symbol, latest_quotes, fetch_put_quotes, save_quotes,
+        settings.SNAPSHOT_QUOTE_MAX_AGE if max_age is None else max_age
+    )
@@ -0,0 +1,116 @@
+# put_calculator/conditional.py
+import gzip
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_etags
+
+# brotli is optional: smaller than gzip for JSON at similar cost. Without it
+# only gzip is offered.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def content_etag(*parts):
+    """ETag for a body built only from parts (anything with a stable str())"""
+    return hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+
+def parse_fields(request, allowed, default):
+    """The ?fields=a,b projection as a list of allowed names (default when absent); ValueError on unknown names"""
+    # DRF requests and plain (async view) HttpRequests
+    fields = getattr(request, 'query_params', request.GET).get('fields')
+    if not fields:
+        return list(default)
+    fields = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"fields must be a comma-separated list of: {', '.join(allowed)}.")
+    return fields
+
+
+def accepted_encoding(request):
+    """The preferred content coding in ENCODINGS the client accepts, or None for identity"""
+    accepted = {}
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        accepted[coding.strip().lower()] = quality
+    for coding in ENCODINGS:
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+    return body
+
+
+def _weakly_matches(request, etag):
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    tags = {tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))}
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+
+def conditional_json(request, etag, render, last_modified=None, timeout=None, read_only=False):
+    """
+    A JSON response validated by etag (and last_modified, a datetime, when
+    the body depends on nothing newer): 304 when the client's copy matches,
+    otherwise render() (JSON bytes), compressed for bodies of at least
+    RESPONSE_COMPRESSION_MIN_BYTES. Rendered bodies are kept in the default
+    cache per etag and coding for timeout seconds (default
+    OPTION_CHAIN_CACHE_TTL), so repeat requests skip both serializing and
+    compressing. read_only marks a POST that only carries a query: a
+    matching If-None-Match then gets a 304 as on GET, not a 412.
+    """
+    # Weak: one validator for every content coding of the same JSON
+    etag = f'W/"{etag}"'
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        # HTTP dates have whole seconds
+        last_modified = int(last_modified.timestamp())
+        headers['Last-Modified'] = http_date(last_modified)
+
+    if read_only and request.method not in ('GET', 'HEAD') and _weakly_matches(request, etag):
+        not_modified = HttpResponseNotModified()
+    else:
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        for name, value in headers.items():
+            not_modified[name] = value
+        patch_vary_headers(not_modified, ('Accept-Encoding',))
+        return not_modified
+
+    encoding = accepted_encoding(request)
+    cache_key = f"response:{etag}:{encoding or 'identity'}"
+    cached = cache.get(cache_key)
+    if cached is None:
+        body = render()
+        if encoding is None or len(body) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+            encoding = None
+        cached = (compress(body, encoding), encoding)
+        cache.set(cache_key, cached, timeout=settings.OPTION_CHAIN_CACHE_TTL if timeout is None else timeout)
+    body, encoding = cached
+
+    response = HttpResponse(body, content_type='application/json')
+    for name, value in headers.items():
+        response[name] = value
+    if encoding is not None:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
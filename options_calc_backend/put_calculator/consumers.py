@@ -1,160 +1,188 @@
-import json
 import asyncio
-import websockets
 import pytz
-from datetime import datetime, time
+from datetime import datetime
+from urllib.parse import parse_qs
+from websockets.exceptions import WebSocketException
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.conf import settings
+from .live_metrics import live_metrics
+from .market import market_status
+from .positions import PositionError
+from .serialization import dumps, loads
+from .stream_hub import stream_hub
 ## For Testing
 from alpaca.data.live import StockDataStream
 
 
 class OptionPriceConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.symbol = self.scope['url_route']['kwargs']['symbol']
-        if not self.symbol.startswith('T.'):
-            self.symbol = f"T.{self.symbol}"
-            
+        # Alpaca's stock stream uses plain tickers; accept the old "T." form too
+        self.symbol = self.scope['url_route']['kwargs']['symbol'].removeprefix('T.').upper()
+        self.subscription = None
+        self.forward_task = None
+        # "metrics" clients only get live metrics for their registered positions, not raw trades and quotes
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        self.mode = query.get('mode', ['quotes'])[0]
+
         await self.accept()
         market_status = self.get_market_status()
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=dumps({
             "status": "connecting",
             "symbol": self.symbol,
             "market_status": market_status,
             "server_time": str(datetime.now(pytz.timezone('America/New_York')))
         }))
         
-        try:
-            # 1. Connect to Alpaca's WebSocket
-            self.alpaca_ws = await websockets.connect(
-                "wss://stream.data.alpaca.markets/v2/iex",
-                extra_headers={
-                    "APCA-API-KEY-ID": settings.ALPACA_API_KEY,
-                    "APCA-API-SECRET-KEY": settings.ALPACA_SECRET_KEY
-                },
-                ping_interval=20,
-                ping_timeout=30,
-                max_queue=1024  # Increased buffer size
-            )
-            
-            # 2. Authenticate
-            await self.alpaca_ws.send(json.dumps({
-                "action": "auth",
-                "key": settings.ALPACA_API_KEY,
-                "secret": settings.ALPACA_SECRET_KEY
-            }))
-            
-            # 3. Verify authentication
-            auth_response = await self.alpaca_ws.recv()
-            if not self._is_success_response(auth_response):
-                raise ConnectionError("Authentication failed")
-            
-            # 4. Subscribe to options data
-            await self.alpaca_ws.send(json.dumps({
-                "action": "subscribe",
-                "trades": [self.symbol],
-                "quotes": [self.symbol]
+        if self.mode == 'metrics':
+            await self.send(text_data=dumps({
+                "status": "connected",
+                "message": "Register positions to receive live metrics",
+                "market_status": self.get_market_status(),
+                "server_time": str(datetime.now(pytz.timezone('America/New_York')))
             }))
+            return
+
+        try:
+            # Share the process-wide upstream connection instead of opening our own
+            self.subscription = await stream_hub.subscribe(self.symbol)
             
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=dumps({
                 "status": "connected",
                 "message": "Streaming active - waiting for data",
                 "market_status": self.get_market_status(),
                 "server_time": str(datetime.now(pytz.timezone('America/New_York')))
             }))
-            
-            # 5. Process messages with timeout
-            while True:
-                try:
-                    message = await asyncio.wait_for(
-                        self.alpaca_ws.recv(),
-                        timeout=30.0  # Timeout if no data for 30s
-                    )
-                    await self.handle_market_data(message)
-                except asyncio.TimeoutError:
-                    await self.send(text_data=json.dumps({
-                        "status": "keepalive",
-                        "message": "Waiting for data...",
-                        "server_time": str(datetime.now(pytz.timezone('America/New_York')))
-                    }))
+
+            self.forward_task = asyncio.create_task(self.forward_market_data())
                     
         except Exception as e:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=dumps({
                 "status": "error",
                 "message": str(e),
                 "server_time": str(datetime.now(pytz.timezone('America/New_York'))),
                 "solution": "1) Try a different symbol 2) Check Alpaca status page"
             }))
-            if hasattr(self, 'alpaca_ws'):
-                await self.alpaca_ws.close()
+            await self.close()
 
-    async def handle_market_data(self, message):
-        """Process and forward market data"""
+    async def receive(self, text_data=None, bytes_data=None):
+        """
+        Client requests: {"action": "register", "positions": [...]} to get live
+        metrics for short puts on this symbol (see positions.parse_positions),
+        {"action": "unregister", "ids": [...]} to drop some (all without ids).
+        """
         try:
-            data = json.loads(message)
-            if isinstance(data, list):
-                data = data[0]  # Take first item if array
-            
-            if not isinstance(data, dict):
-                return
-                
+            request = loads(text_data or bytes_data)
+            action = request.get('action')
+        except (ValueError, AttributeError):
+            await self.send(text_data=dumps({"status": "error", "message": "Messages must be JSON objects."}))
+            return
+
+        try:
+            if action == 'register':
+                ids = await live_metrics.register(self, self.symbol, request.get('positions'))
+                await self.send(text_data=dumps({"status": "registered", "positions": ids}))
+            elif action == 'unregister':
+                ids = await live_metrics.unregister(self, self.symbol, request.get('ids'))
+                await self.send(text_data=dumps({"status": "unregistered", "positions": ids}))
+            else:
+                await self.send(text_data=dumps({
+                    "status": "error", "message": "action must be 'register' or 'unregister'."
+                }))
+        except PositionError as e:
+            await self.send(text_data=dumps({"status": "error", "message": str(e)}))
+        except (OSError, TimeoutError, WebSocketException) as e:
+            # The hub couldn't reach upstream; the client may register again later
+            await self.send(text_data=dumps({
+                "status": "error",
+                "message": f"Market data stream unavailable: {e}",
+                "server_time": str(datetime.now(pytz.timezone('America/New_York'))),
+            }))
+
+    async def send_metrics(self, frame):
+        """Called by live_metrics with this client's changed position values"""
+        await self.send(text_data=dumps(frame))
+
+    async def forward_market_data(self):
+        """
+        Relay hub messages for our symbol in batches: after the first message
+        arrives, wait STREAM_FLUSH_INTERVAL seconds, drain everything queued
+        meanwhile and send it as one frame. Keepalive after 30s of silence.
+        """
+        while True:
+            try:
+                first = await asyncio.wait_for(self.subscription.get(), timeout=30.0)
+            except asyncio.TimeoutError:
+                await self.send(text_data=dumps({
+                    "status": "keepalive",
+                    "message": "Waiting for data...",
+                    "server_time": str(datetime.now(pytz.timezone('America/New_York')))
+                }))
+                continue
+
+            if settings.STREAM_FLUSH_INTERVAL > 0:
+                await asyncio.sleep(settings.STREAM_FLUSH_INTERVAL)
+            messages = [first]
+            while True:
+                try:
+                    messages.append(self.subscription.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            await self.handle_market_data(messages)
+
+    async def handle_market_data(self, messages):
+        """
+        Forward a batch of parsed market data messages as one "batch" frame.
+        Every trade is kept; quotes are conflated to the latest per symbol.
+        """
+        trades = []
+        quotes = {}
+        quote_count = 0
+        for data in messages:
             message_type = data.get('T')
             if message_type == 't':  # Trade
-                await self.send(text_data=json.dumps({
-                    "event": "trade",
+                trades.append({
                     "symbol": data.get('S'),
                     "price": float(data.get('p', 0)),
                     "size": int(data.get('s', 0)),
                     "timestamp": data.get('t'),
                     "conditions": data.get('c', [])
-                }))
-            elif message_type == 'q':  # Quote
-                await self.send(text_data=json.dumps({
-                    "event": "quote",
+                })
+            elif message_type == 'q':  # Quote - latest wins
+                quote_count += 1
+                quotes[data.get('S')] = {
                     "symbol": data.get('S'),
-                    "bid_price": float(data.get('b', 0)),
+                    "bid_price": float(data.get('bp', 0)),
                     "bid_size": int(data.get('bs', 0)),
-                    "ask_price": float(data.get('a', 0)),
+                    "ask_price": float(data.get('ap', 0)),
                     "ask_size": int(data.get('as', 0)),
                     "timestamp": data.get('t')
-                }))
-                
-        except json.JSONDecodeError:
-            pass
+                }
+
+        if not trades and not quotes:
+            return
+        await self.send(text_data=dumps({
+            "event": "batch",
+            "trades": trades,
+            "quotes": list(quotes.values()),
+            "conflated_quotes": quote_count - len(quotes),
+        }))
 
     def get_market_status(self):
         """Accurate market hours check in Eastern Time"""
-        eastern = pytz.timezone('America/New_York')
-        now = datetime.now(eastern)
-        market_open = time(9, 30)
-        market_close = time(16, 0)
-        
-        # Check if weekday (Monday=0, Sunday=6)
-        if now.weekday() >= 5:  # Saturday or Sunday
-            return "closed (weekend)"
-            
-        current_time = now.time()
-        if market_open <= current_time <= market_close:
-            return "open"
-        return "closed"
-
-    def _is_success_response(self, message):
-        try:
-            data = json.loads(message)
-            if isinstance(data, list):
-                data = data[0]
-            return data.get('T') == 'success'
-        except:
-            return False
+        return market_status()
 
     async def disconnect(self, close_code):
-        if hasattr(self, 'alpaca_ws'):
-            await self.alpaca_ws.close()
+        if getattr(self, 'forward_task', None):
+            self.forward_task.cancel()
+        if getattr(self, 'subscription', None):
+            await stream_hub.unsubscribe(self.subscription)
+        if getattr(self, 'symbol', None):
+            await live_metrics.unregister(self, self.symbol)
 
 class InvalidPathConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         await self.accept()
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=dumps({
             "error": "Invalid WebSocket endpoint",
             "valid_endpoints": [
                 "/ws/options/{symbol}/"
@@ -166,11 +194,11 @@ class InvalidPathConsumer(AsyncWebsocketConsumer):
 # class OptionPriceConsumer(AsyncWebsocketConsumer):
 #     async def connect(self):
 #         await self.accept()
-#         await self.send(text_data=json.dumps({"status": "Connected successfully!"}))
+#         await self.send(text_data=dumps({"status": "Connected successfully!"}))
 
 #     async def receive(self, text_data):
 #         # Echo back received messages for testing
-#         await self.send(text_data=json.dumps({"echo": text_data}))
+#         await self.send(text_data=dumps({"echo": text_data}))
 
 
 # class OptionPriceConsumer(AsyncWebsocketConsumer):
@@ -202,4 +230,4 @@ class InvalidPathConsumer(AsyncWebsocketConsumer):
 
 #     # Alpaca will call this automatically
 #     async def on_options_data(self, data):
-#         await self.send(text_data=json.dumps(data))
\ No newline at end of file
+#         await self.send(text_data=dumps(data))
\ No newline at end of file
@@ -0,0 +1,239 @@
+# put_calculator/fakes.py
+# Local stand-ins for the upstream APIs, shared by the tests and manage.py benchmark
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import websockets
+from .serialization import dumps, loads
+
+# Timestamp of the end-of-replay trade sent for every symbol
+SENTINEL_TIMESTAMP = "replay-end"
+
+
+def wire_timestamp(ns):
+    """RFC 3339 timestamp with nanoseconds, as Alpaca sends them"""
+    seconds, nanos = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + f".{nanos:09d}Z"
+
+
+class ReplayServer:
+    """
+    Local stand-in for Alpaca's market data WebSocket that plays back
+    recorded frames.
+
+    Speaks enough of the protocol for StreamHub: "connected" on open,
+    "authenticated" after auth, and subscribe/unsubscribe actions. replay()
+    sends frames to every connection, filtered to its subscribed symbols.
+    Every item is re-stamped with the time it is sent (kept in sent_at, by
+    timestamp) so receivers can measure end-to-end latency, and a sentinel
+    trade per symbol marks the end of the replay.
+    """
+
+    def __init__(self, frames, host='127.0.0.1', port=0):
+        self.frames = [loads(frame) if isinstance(frame, (str, bytes)) else frame for frame in frames]
+        self.host = host
+        self.port = port
+        self.sent_at = {}
+        self._connections = {}
+        self._server = None
+        self._last_ns = 0
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    @property
+    def symbols(self):
+        return sorted({item['S'] for frame in self.frames for item in frame if 'S' in item})
+
+    @property
+    def tick_count(self):
+        return sum(len(frame) for frame in self.frames)
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def wait_for_subscribers(self, symbols, timeout=10):
+        """Wait until every symbol is subscribed on some connection"""
+        deadline = time.monotonic() + timeout
+        while not set(symbols) <= set().union(*self._connections.values()):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Upstream subscriptions not seen for: {', '.join(sorted(symbols))}")
+            await asyncio.sleep(0.01)
+
+    @property
+    def connection_count(self):
+        return len(self._connections)
+
+    async def drop_connections(self):
+        """Close every client connection, as an upstream outage would"""
+        for ws in list(self._connections):
+            await ws.close()
+
+    async def replay(self, rate=None):
+        """
+        Send every recorded frame, then the sentinels. rate limits frames per
+        second; by default frames go out as fast as the connections take them.
+        """
+        interval = 1 / rate if rate else 0
+        for frame in self.frames:
+            await self._send(frame)
+            await asyncio.sleep(interval)
+        await self._send([{"T": "t", "S": symbol, "p": 0, "s": 0, "t": SENTINEL_TIMESTAMP} for symbol in self.symbols])
+
+    async def _send(self, frame):
+        for ws, symbols in list(self._connections.items()):
+            items = [dict(item, t=self._stamp(item)) for item in frame if item.get('S') in symbols]
+            if items:
+                await ws.send(dumps(items))
+
+    def _stamp(self, item):
+        if item.get('t') == SENTINEL_TIMESTAMP:
+            return SENTINEL_TIMESTAMP
+        # Strictly increasing, so every timestamp identifies one sent item
+        ns = self._last_ns = max(time.time_ns(), self._last_ns + 1)
+        timestamp = wire_timestamp(ns)
+        self.sent_at[timestamp] = time.perf_counter()
+        return timestamp
+
+    async def _handler(self, ws, path=None):
+        symbols = self._connections[ws] = set()
+        try:
+            await ws.send(dumps([{"T": "success", "msg": "connected"}]))
+            async for message in ws:
+                request = loads(message)
+                action = request.get('action')
+                if action == 'auth':
+                    await ws.send(dumps([{"T": "success", "msg": "authenticated"}]))
+                elif action in ('subscribe', 'unsubscribe'):
+                    requested = set(request.get('trades', [])) | set(request.get('quotes', []))
+                    if action == 'subscribe':
+                        symbols |= requested
+                    else:
+                        symbols -= requested
+                    await ws.send(dumps([{"T": "subscription", "trades": sorted(symbols), "quotes": sorted(symbols)}]))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            del self._connections[ws]
+
+
+class FakeProvider:
+    """
+    Local stand-in for a rate-limited upstream REST API, for exercising the
+    rate limiter, retries and circuit breaker (put_calculator.resilience).
+
+    Every GET is answered with body (JSON bytes), or body(path, query) for
+    a callable, query being parse_qs() of the query string. Past rate_limit
+    requests in a one-second window it answers 429 with Retry-After, like
+    Alpaca, Polygon and Finnhub do; set fail_status (e.g. 503) to fail every
+    request, and latency to delay every answer. Counts what it answered in
+    requests, throttled and failed, and records the client address of each
+    TCP connection in clients (so len(clients) is the connection count).
+    """
+
+    def __init__(self, rate_limit=None, body=b'{}', retry_after=1, host='127.0.0.1', port=0):
+        self.rate_limit = rate_limit
+        self.body = body
+        self.retry_after = retry_after
+        self.fail_status = None
+        self.latency = 0.0
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+        self.clients = []
+        self._window = (0, 0)  # (second, requests in it)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _status(self):
+        with self._lock:
+            self.requests += 1
+            if self.fail_status is not None:
+                self.failed += 1
+                return self.fail_status
+            second, count = self._window
+            now = int(time.monotonic())
+            count = count + 1 if now == second else 1
+            self._window = (now, count)
+            if self.rate_limit is not None and count > self.rate_limit:
+                self.throttled += 1
+                return 429
+            return 200
+
+    def start(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with provider._lock:
+                    provider.clients.append(self.client_address)
+
+            def do_GET(self):
+                if provider.latency:
+                    time.sleep(provider.latency)
+                status = provider._status()
+                if status != 200:
+                    body = b'{"message": "too many requests"}'
+                elif callable(provider.body):
+                    url = urlsplit(self.path)
+                    body = provider.body(url.path, parse_qs(url.query))
+                else:
+                    body = provider.body
+                self.send_response(status)
+                if status == 429:
+                    self.send_header('Retry-After', str(provider.retry_after))
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-provider', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
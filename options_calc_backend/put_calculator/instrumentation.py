@@ -0,0 +1,254 @@
+# put_calculator/instrumentation.py
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class Metrics:
+    """
+    Process-wide counters behind /api/metrics/: request latency per
+    endpoint, upstream call latency per provider, cache hits and misses,
+    and request/response payload sizes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collectors = []
+        self.reset()
+
+    def add_collector(self, collect):
+        """
+        Render collect()'s metrics along with these. It returns [(name, help
+        text, 'counter' or 'gauge', [(labels, value), ...]), ...].
+        """
+        self._collectors.append(collect)
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)  # (endpoint, method, status) -> count
+            self.request_latency = defaultdict(_Histogram)  # endpoint -> histogram
+            self.payload_bytes = defaultdict(int)  # (endpoint, direction) -> bytes
+            self.upstream_latency = defaultdict(_Histogram)  # provider -> histogram
+            self.upstream_errors = defaultdict(int)  # provider -> count
+            self.upstream_bytes = defaultdict(int)  # provider -> bytes
+            self.cache_lookups = defaultdict(int)  # (cache, result) -> count
+
+    def observe_request(self, endpoint, method, status, seconds, request_bytes, response_bytes):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            self.request_latency[endpoint].observe(seconds)
+            self.payload_bytes[(endpoint, 'request')] += request_bytes
+            self.payload_bytes[(endpoint, 'response')] += response_bytes
+
+    def observe_upstream(self, provider, seconds, error=False, response_bytes=0):
+        with self._lock:
+            self.upstream_latency[provider].observe(seconds)
+            self.upstream_bytes[provider] += response_bytes
+            if error:
+                self.upstream_errors[provider] += 1
+
+    def observe_cache(self, cache, hit):
+        with self._lock:
+            self.cache_lookups[(cache, 'hit' if hit else 'miss')] += 1
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        with self._lock:
+            _counter(lines, 'options_calc_requests_total', "HTTP requests handled",
+                     (({'endpoint': e, 'method': m, 'status': s}, n) for (e, m, s), n in self.requests.items()))
+            _histogram(lines, 'options_calc_request_duration_seconds', "Wall time per request",
+                       'endpoint', self.request_latency)
+            _counter(lines, 'options_calc_payload_bytes_total', "Request and response body sizes",
+                     (({'endpoint': e, 'direction': d}, n) for (e, d), n in self.payload_bytes.items()))
+            _histogram(lines, 'options_calc_upstream_duration_seconds', "Wall time per upstream provider call",
+                       'provider', self.upstream_latency)
+            _counter(lines, 'options_calc_upstream_errors_total', "Upstream provider calls that failed",
+                     (({'provider': p}, n) for p, n in self.upstream_errors.items()))
+            _counter(lines, 'options_calc_upstream_response_bytes_total', "Upstream response body sizes",
+                     (({'provider': p}, n) for p, n in self.upstream_bytes.items()))
+            _counter(lines, 'options_calc_cache_lookups_total', "Cache lookups by result",
+                     (({'cache': c, 'result': r}, n) for (c, r), n in self.cache_lookups.items()))
+        for collect in self._collectors:
+            for name, help_text, kind, samples in collect():
+                _sample(lines, name, help_text, kind, samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+
+def _sample(lines, name, help_text, kind, samples):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_labels(labels)} {value}" for labels, value in samples]
+
+
+def _counter(lines, name, help_text, samples):
+    _sample(lines, name, help_text, 'counter', samples)
+
+
+def _histogram(lines, name, help_text, label, histograms):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, histogram in histograms.items():
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels({label: key, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_sum{_labels({label: key})} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels({label: key})} {histogram.count}")
+
+
+metrics = Metrics()
+
+
+class RequestTimings:
+    """Timings and cache results collected while handling one request, for the Server-Timing header"""
+
+    def __init__(self):
+        self.spans = defaultdict(lambda: [0.0, 0])  # name -> [seconds, calls]
+        self.cache = {}  # cache name -> "hit" / "miss" (last lookup wins)
+
+    def add(self, name, seconds):
+        span = self.spans[name]
+        span[0] += seconds
+        span[1] += 1
+
+    def server_timing(self, total_seconds):
+        entries = [f"total;dur={total_seconds * 1000:.1f}"]
+        for name, (seconds, calls) in self.spans.items():
+            description = [self.cache[name]] if name in self.cache else []
+            if calls > 1:
+                description.append(f"{calls} calls")
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            entries.append(entry + (f';desc="{", ".join(description)}"' if description else ''))
+        entries += [f'{name};desc="{result}"' for name, result in self.cache.items() if name not in self.spans]
+        return ', '.join(entries)
+
+
+# Set by TimingMiddleware for the duration of a request. asyncio.to_thread and
+# new tasks copy the context, so work a view hands off is still attributed.
+_current = ContextVar('request_timings', default=None)
+
+
+@contextmanager
+def upstream_call(provider):
+    """Time one call to an upstream provider; yields a dict that may receive 'bytes'"""
+    call = {'bytes': 0}
+    error = False
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        error = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.observe_upstream(provider, seconds, error, call['bytes'])
+        timings = _current.get()
+        if timings is not None:
+            timings.add(provider, seconds)
+
+
+@contextmanager
+def span(name):
+    """Time a block of work within the current request (Server-Timing only)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, time.perf_counter() - start)
+
+
+def record_cache(cache, hit):
+    metrics.observe_cache(cache, hit)
+    timings = _current.get()
+    if timings is not None:
+        timings.cache[cache] = 'hit' if hit else 'miss'
+
+
+def _endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+def _response_bytes(response):
+    if response.streaming:
+        return 0
+    return len(response.content)
+
+
+class TimingMiddleware:
+    """
+    Records wall time, status and payload sizes per endpoint, and adds a
+    Server-Timing header (total plus each upstream provider and cache used)
+    unless SERVER_TIMING_HEADER is off. Works for sync and async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    def _finish(self, request, response, timings, seconds):
+        metrics.observe_request(
+            _endpoint(request), request.method, response.status_code, seconds,
+            int(request.META.get('CONTENT_LENGTH') or 0), _response_bytes(response),
+        )
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = timings.server_timing(seconds)
+        return response
+
+
+def metrics_view(request):
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,259 @@
+# put_calculator/live_metrics.py
+import asyncio
+import logging
+import math
+import time
+import numpy as np
+from django.conf import settings
+from .metrics import days_to_expiration, put_metrics
+from .positions import PositionError, parse_positions
+from .pricing import DAYS_PER_YEAR, black_scholes
+from .quotes import alpaca_price
+from .stream_hub import stream_hub
+
+logger = logging.getLogger(__name__)
+
+# Pushed for every position; the Greek fields only for positions registered with a volatility
+METRIC_FIELDS = (
+    'drop_percentage', 'breakeven_price', 'breakeven_distance',
+    'return_at_expiration', 'premium_annualized', 'days_to_expiration',
+)
+GREEK_FIELDS = ('model_price', 'unrealized_pnl', 'delta', 'gamma', 'theta', 'vega', 'rho', 'itm_probability')
+FIELDS = METRIC_FIELDS + GREEK_FIELDS
+
+
+def position_metrics(stock_price, columns, rate):
+    """
+    put_metrics plus Black-Scholes Greeks for every position at once, as a
+    (positions x FIELDS) matrix. Greek columns are NaN where no volatility
+    was given.
+    """
+    days = days_to_expiration(columns['expiration_date'])
+    metrics = put_metrics(stock_price, columns['strike_price'], columns['option_premium'], days)
+    breakeven = columns['strike_price'] - columns['option_premium']
+    greeks = black_scholes(
+        'put', stock_price, columns['strike_price'], np.maximum(days, 0) / DAYS_PER_YEAR,
+        np.nan_to_num(columns['volatility'], nan=1.0), rate,
+    )
+    priced = ~np.isnan(columns['volatility'])
+
+    values = {
+        'drop_percentage': metrics['drop_percentage'],
+        'breakeven_price': metrics['breakeven_price'],
+        # How far (in percent) the stock can fall before the position loses money
+        'breakeven_distance': np.round((stock_price - breakeven) / stock_price * 100, 2),
+        'return_at_expiration': metrics['return_at_expiration'],
+        'premium_annualized': metrics['premium_annualized'],
+        'days_to_expiration': days,
+        'model_price': greeks['price'],
+        'unrealized_pnl': (columns['option_premium'] - greeks['price']) * columns['contracts'] * 100,
+        **{name: greeks[name] for name in ('delta', 'gamma', 'theta', 'vega', 'rho', 'itm_probability')},
+    }
+    for name in GREEK_FIELDS:
+        values[name] = np.where(priced, np.round(values[name], 2 if name == 'unrealized_pnl' else 4), np.nan)
+    return np.column_stack([np.asarray(values[name], dtype=np.float64) for name in FIELDS])
+
+
+class PositionBook:
+    """Every position registered on one symbol, kept as column arrays so one tick reprices them all"""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.owners = np.empty(0, dtype=object)
+        self.ids = np.empty(0, dtype=object)
+        self.columns = {
+            'strike_price': np.empty(0), 'option_premium': np.empty(0),
+            'expiration_date': np.empty(0, dtype='datetime64[D]'), 'volatility': np.empty(0), 'contracts': np.empty(0),
+        }
+        # Last values pushed per position (NaN = not sent yet)
+        self.sent = np.empty((0, len(FIELDS)))
+        self.stock_price = None
+        self.priced_at = None
+        self.subscription = None
+        self.task = None
+        self.started = None  # future for the hub subscription and repricing task
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, owner, ids, columns):
+        """Add positions for owner, replacing any it already has with the same ids"""
+        self.remove(owner, ids)
+        self.owners = np.concatenate([self.owners, np.full(len(ids), owner, dtype=object)])
+        self.ids = np.concatenate([self.ids, np.array(ids, dtype=object)])
+        self.columns = {name: np.concatenate([self.columns[name], columns[name]]) for name in self.columns}
+        self.sent = np.concatenate([self.sent, np.full((len(ids), len(FIELDS)), np.nan)])
+
+    def remove(self, owner, ids=None):
+        """Drop owner's positions (all of them without ids); returns the ids removed"""
+        mine = self.owners == owner
+        if ids is not None:
+            mine &= np.isin(self.ids, np.array(list(ids), dtype=object))
+        removed = self.ids[mine].tolist()
+        if removed:
+            keep = ~mine
+            self.owners, self.ids, self.sent = self.owners[keep], self.ids[keep], self.sent[keep]
+            self.columns = {name: values[keep] for name, values in self.columns.items()}
+        return removed
+
+    def deltas(self, stock_price, rate):
+        """
+        Reprice every position at stock_price and return {owner: {id: {field:
+        value}}} with only the fields that changed since they were last sent.
+        """
+        values = position_metrics(stock_price, self.columns, rate)
+        changed = ~((values == self.sent) | (np.isnan(values) & np.isnan(self.sent)))
+        rows = np.flatnonzero(changed.any(axis=1))
+        self.sent[rows] = values[rows]
+
+        # Python objects once for the whole batch; per-row numpy calls dominate otherwise
+        updates = {}
+        owners, ids = self.owners[rows].tolist(), self.ids[rows].tolist()
+        for owner, position_id, row, mask in zip(owners, ids, values[rows].tolist(), changed[rows].tolist()):
+            fields = {
+                name: None if math.isnan(value) else value
+                for name, value, send in zip(FIELDS, row, mask) if send
+            }
+            if 'days_to_expiration' in fields:
+                fields['days_to_expiration'] = int(fields['days_to_expiration'])
+            updates.setdefault(owner, {})[position_id] = fields
+        return updates
+
+
+def tick_price(item):
+    """Underlying price from a stream message: the trade price, or a quote's midpoint"""
+    if item.get('T') == 't' and item.get('p', 0) > 0:
+        return float(item['p'])
+    if item.get('T') == 'q' and item.get('bp', 0) > 0 and item.get('ap', 0) > 0:
+        return (float(item['bp']) + float(item['ap'])) / 2
+    return None
+
+
+class LiveMetrics:
+    """
+    Recomputes metrics and Greeks for client-registered short puts as the
+    underlying trades.
+
+    Each symbol with registered positions has one PositionBook and one hub
+    subscription, whatever the number of clients. At most every
+    LIVE_METRICS_INTERVAL seconds the latest price reprices every position
+    on the symbol in one vectorized pass, and each owner receives a
+    "metrics" frame with only the values that changed. Owners are consumers
+    with an async send_metrics(frame).
+    """
+
+    def __init__(self):
+        self._books = {}
+        self._loop = None
+
+    def _bind_loop(self):
+        # Books and their tasks belong to one event loop, like the hub's state
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._books = {}
+
+    async def register(self, owner, symbol, positions):
+        """Add positions for owner on symbol; returns their ids. Raises PositionError for bad input."""
+        self._bind_loop()
+        ids, columns = parse_positions(positions, settings.LIVE_METRICS_MAX_POSITIONS)
+        while True:
+            book = self._books.get(symbol)
+            if book is None:
+                # Every caller (and teardown) waits on the same start, so a
+                # book is never seen half set up
+                book = self._books[symbol] = PositionBook(symbol)
+                book.started = asyncio.ensure_future(self._start(book))
+            try:
+                await asyncio.shield(book.started)
+            except Exception:
+                if self._books.get(symbol) is book:
+                    del self._books[symbol]
+                raise
+            if self._books.get(symbol) is book:
+                break
+            # Torn down while we waited: start again with a fresh book
+
+        kept = np.count_nonzero((book.owners == owner) & ~np.isin(book.ids, np.array(ids, dtype=object)))
+        if kept + len(ids) > settings.LIVE_METRICS_MAX_POSITIONS:
+            if not len(book):
+                await self._close(book)
+            raise PositionError(f"At most {settings.LIVE_METRICS_MAX_POSITIONS} positions per client.")
+        book.add(owner, ids, columns)
+        if book.stock_price is not None:
+            await self._publish(book)
+        return ids
+
+    async def unregister(self, owner, symbol, ids=None):
+        """Remove owner's positions on symbol (all of them without ids); returns the ids removed"""
+        self._bind_loop()
+        if ids is not None and not isinstance(ids, list):
+            raise PositionError("ids must be a list.")
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+        removed = book.remove(owner, ids)
+        if removed and not len(book):
+            await self._close(book)
+        return removed
+
+    async def _start(self, book):
+        book.subscription = await stream_hub.subscribe(book.symbol)
+        book.task = asyncio.create_task(self._run(book))
+
+    async def _close(self, book):
+        """Drop an empty book: stop repricing and release its hub subscription once it has them"""
+        if self._books.get(book.symbol) is book:
+            del self._books[book.symbol]
+        try:
+            await asyncio.shield(book.started)
+        except Exception:
+            return  # never subscribed
+        if book.task is not None:
+            book.task.cancel()
+        await stream_hub.unsubscribe(book.subscription)
+
+    def stats(self):
+        return {symbol: len(book) for symbol, book in self._books.items()}
+
+    async def _run(self, book):
+        # Start from the last trade so positions get values before the first tick
+        try:
+            price = await alpaca_price(book.symbol)
+            if price and book.stock_price is None:
+                book.stock_price = float(price)
+                await self._publish(book)
+        except Exception as e:
+            logger.info("No starting price for %s live metrics: %s", book.symbol, e)
+
+        while True:
+            price = tick_price(await book.subscription.get())
+            # Throttle: reprice at most once per interval, on the latest price
+            wait = book.priced_at + settings.LIVE_METRICS_INTERVAL - time.monotonic() if book.priced_at else 0
+            if wait > 0:
+                await asyncio.sleep(wait)
+            while True:
+                try:
+                    price = tick_price(book.subscription.get_nowait()) or price
+                except asyncio.QueueEmpty:
+                    break
+            if price is not None and price != book.stock_price:
+                book.stock_price = price
+                await self._publish(book)
+
+    async def _publish(self, book):
+        book.priced_at = time.monotonic()
+        stock_price = book.stock_price
+        for owner, positions in book.deltas(stock_price, settings.RISK_FREE_RATE).items():
+            try:
+                await owner.send_metrics({
+                    "event": "metrics",
+                    "symbol": book.symbol,
+                    "stock_price": stock_price,
+                    "positions": positions,
+                })
+            except Exception as e:
+                logger.warning("Sending live metrics to a %s client failed: %s", book.symbol, e)
+
+
+live_metrics = LiveMetrics()
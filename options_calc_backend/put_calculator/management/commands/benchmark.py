@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from put_calculator.benchmarks import BENCHMARKS
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the put_calculator performance benchmarks. --save-baseline records "
+        "the results; --compare fails if any rate fell more than --tolerance "
+        "below the recorded baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Benchmarks to run (default: all). Choices: {', '.join(BENCHMARKS)}")
+        parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, type=Path, metavar='PATH',
+                            help=f"Write results to PATH (default: {DEFAULT_BASELINE.name}), merged with any saved there already")
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, type=Path, metavar='PATH',
+                            help=f"Compare against the baseline in PATH (default: {DEFAULT_BASELINE.name})")
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Allowed fractional slowdown before --compare fails (default: 0.2)")
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+        baseline = {}
+        if options['compare']:
+            try:
+                baseline = json.loads(options['compare'].read_text())
+            except FileNotFoundError:
+                raise CommandError(f"No baseline at {options['compare']}; record one with --save-baseline")
+
+        results = {}
+        regressions = []
+        for name in names:
+            result = results[name] = BENCHMARKS[name]()
+            line = f"{name}: {result['rate']:,.0f} {result['unit']} ({result['seconds'] * 1000:.2f} ms)"
+            target = result.get('target')
+            if target and result['rate'] < target:
+                self.stdout.write(self.style.WARNING(f"{line} - below target of {target:,} {result['unit']}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+            for key, value in result.get('details', {}).items():
+                self.stdout.write(f"    {key}: {value}")
+
+            if name in baseline:
+                change = result['rate'] / baseline[name]['rate'] - 1
+                comparison = f"    vs baseline {baseline[name]['rate']:,.0f} {result['unit']}: {change:+.1%}"
+                if change < -options['tolerance']:
+                    regressions.append(f"{name} ({change:+.1%})")
+                    self.stdout.write(self.style.ERROR(comparison))
+                else:
+                    self.stdout.write(comparison)
+
+        if options['save_baseline']:
+            path = options['save_baseline']
+            saved = json.loads(path.read_text()) if path.exists() else {}
+            saved.update({
+                name: {'rate': result['rate'], 'unit': result['unit'], 'seconds': result['seconds']}
+                for name, result in results.items()
+            })
+            path.write_text(json.dumps(saved, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f"Saved baseline for {', '.join(results)} to {path}")
+
+        if regressions:
+            raise CommandError(f"Performance regressions beyond {options['tolerance']:.0%}: {', '.join(regressions)}")
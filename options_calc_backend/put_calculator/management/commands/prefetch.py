@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from put_calculator.prefetch import Prefetcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh option chains and quotes for a watchlist on the prefetch schedule, "
+        "in the foreground. Warms this process's caches and the snapshot store; "
+        "with the default local-memory cache, servers only share the store."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbols', nargs='*', help="Symbols to prefetch (default: PREFETCH_WATCHLIST)")
+        parser.add_argument('--once', action='store_true', help="Refresh everything once and exit")
+
+    def handle(self, *args, **options):
+        prefetcher = Prefetcher(options['symbols'] or None)
+        if not prefetcher.watchlist:
+            raise CommandError("No symbols given and PREFETCH_WATCHLIST is empty.")
+
+        while True:
+            start = time.monotonic()
+            jobs = prefetcher.run_once()
+            if jobs:
+                stats = prefetcher.stats()
+                self.stdout.write(
+                    f"[{stats['market_status']}] refreshed {len(jobs)} in {time.monotonic() - start:.1f}s "
+                    f"({stats['refreshes']} ok, {stats['failures']} failed so far)"
+                )
+            if options['once']:
+                return
+            time.sleep(prefetcher.seconds_until_due())
@@ -0,0 +1,20 @@
+# put_calculator/market.py
+import pytz
+from datetime import datetime, time
+
+EASTERN = pytz.timezone('America/New_York')
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+
+def market_status(now=None):
+    """Accurate market hours check in Eastern Time: "open", "closed" or "closed (weekend)" """
+    now = now.astimezone(EASTERN) if now is not None else datetime.now(EASTERN)
+
+    # Check if weekday (Monday=0, Sunday=6)
+    if now.weekday() >= 5:  # Saturday or Sunday
+        return "closed (weekend)"
+
+    if MARKET_OPEN <= now.time() <= MARKET_CLOSE:
+        return "open"
+    return "closed"
@@ -0,0 +1,121 @@
+# put_calculator/metrics.py
+import numpy as np
+from datetime import datetime
+
+
+def days_to_expiration(expiration_dates, today=None):
+    """Days from today to each ISO (YYYY-MM-DD) expiration date, as an int array"""
+    expirations = np.asarray(expiration_dates, dtype='datetime64[D]')
+    if today is None:
+        today = datetime.now().date()
+    return (expirations - np.datetime64(today, 'D')).astype(np.int64)
+
+
+def _as_arrays(*values):
+    return [np.asarray(value, dtype=np.float64) for value in values]
+
+
+def _yields(gain, capital, days):
+    """Percent return of gain on capital and its 365-day annualization (0 where undefined)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = np.where(capital != 0, gain / capital * 100, 0.0)
+        annualized = np.where((days > 0) & (capital != 0), percent * 365 / days, 0.0)
+    return percent, annualized
+
+
+def _rounded(columns, *inputs):
+    shape = np.broadcast_shapes(*(value.shape for value in inputs))
+    return {name: np.round(np.broadcast_to(values, shape), 2) for name, values in columns.items()}
+
+
+def put_metrics(stock_price, strike_price, option_premium, days, number_of_contracts=1):
+    """
+    Cash-secured put metrics over whole arrays at once.
+
+    All inputs broadcast against each other, so a scalar stock price can be
+    combined with arrays of strikes, premiums and days. Results are rounded
+    to 2 places, 0 where a ratio is undefined; the single-row
+    calculate_put_metrics view is this on scalars.
+    """
+    stock_price, strike_price, option_premium, days = _as_arrays(stock_price, strike_price, option_premium, days)
+
+    # Capital at risk is the cash set aside to buy at the strike
+    return_at_expiration, premium_annualized = _yields(option_premium, strike_price, days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drop_percentage = np.where(stock_price != 0, (stock_price - strike_price) / stock_price * 100, 0.0)
+
+    return _rounded({
+        'drop_percentage': drop_percentage,
+        'breakeven_price': strike_price - option_premium,
+        'premium_collected': option_premium * number_of_contracts * 100,
+        'return_at_expiration': return_at_expiration,
+        'premium_annualized': premium_annualized,
+    }, stock_price, strike_price, option_premium, days)
+
+
+def covered_call_metrics(stock_price, strike_price, option_premium, days, number_of_contracts=1, cost_basis=None):
+    """
+    Covered call metrics over whole arrays, broadcasting like put_metrics.
+
+    cost_basis is what the shares cost (default: bought now at stock_price).
+    return_at_expiration/premium_annualized are the premium's return on the
+    shares if the call expires worthless; the *_if_assigned columns add the
+    gain or loss from selling the shares at the strike.
+    """
+    stock_price, strike_price, option_premium, days = _as_arrays(stock_price, strike_price, option_premium, days)
+    cost_basis = stock_price if cost_basis is None else np.asarray(cost_basis, dtype=np.float64)
+
+    gain_if_assigned = strike_price - cost_basis + option_premium
+    return_at_expiration, premium_annualized = _yields(option_premium, cost_basis, days)
+    return_if_assigned, return_if_assigned_annualized = _yields(gain_if_assigned, cost_basis, days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        upside_percentage = np.where(stock_price != 0, (strike_price - stock_price) / stock_price * 100, 0.0)
+
+    return _rounded({
+        'upside_percentage': upside_percentage,
+        'breakeven_price': cost_basis - option_premium,
+        'premium_collected': option_premium * number_of_contracts * 100,
+        'return_at_expiration': return_at_expiration,
+        'premium_annualized': premium_annualized,
+        'gain_if_assigned': gain_if_assigned * number_of_contracts * 100,
+        'return_if_assigned': return_if_assigned,
+        'return_if_assigned_annualized': return_if_assigned_annualized,
+    }, stock_price, strike_price, option_premium, days, cost_basis)
+
+
+# Option type each strategy sells, for the Black-Scholes Greek columns
+STRATEGIES = {
+    'put': ('put', put_metrics),
+    'covered_call': ('call', covered_call_metrics),
+}
+
+
+def select_rows(columns, bounds=None, sort_by=None, descending=True, limit=None, valid=None):
+    """
+    Filter, sort and truncate rows held as equal-length column arrays.
+
+    bounds maps column names to (min, max) pairs (either may be None) and
+    valid is an optional boolean mask of usable rows. Rows are ordered by
+    sort_by (NaNs last) and cut to the first limit. Returns (indices of the
+    selected rows, number of rows that passed the filters).
+    """
+    row_count = len(next(iter(columns.values())))
+    mask = np.ones(row_count, dtype=bool) if valid is None else np.array(valid, dtype=bool)
+    for name, (low, high) in (bounds or {}).items():
+        values = columns[name]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+
+    selected = np.flatnonzero(mask)
+    matched = len(selected)
+    if sort_by is not None:
+        keys = columns[sort_by][selected].astype(np.float64)
+        keys = -keys if descending else keys
+        if limit is not None and limit < matched:
+            # Top-N: partition first so only the kept rows are fully sorted
+            keep = np.argpartition(np.nan_to_num(keys, nan=np.inf), limit)[:limit]
+            selected, keys = selected[keep], keys[keep]
+        selected = selected[np.argsort(keys, kind='stable')]
+    return selected[:limit], matched
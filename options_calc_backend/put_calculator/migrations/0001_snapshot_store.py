@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('underlying', models.CharField(max_length=16)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('contract_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['underlying', '-fetched_at'], name='put_calcula_underly_a89e52_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='QuoteSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('underlying', models.CharField(max_length=16)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('contract_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['underlying', '-fetched_at'], name='put_calcula_underly_134a24_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TickBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=16)),
+                ('kind', models.CharField(choices=[('trade', 'Trade'), ('quote', 'Quote')], max_length=5)),
+                ('first_at', models.DateTimeField()),
+                ('last_at', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['symbol', 'kind', 'first_at'], name='put_calcula_symbol_7b0e4b_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,53 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+# Snapshots are stored column-wise: each row holds one whole chain, quote
+# set or tick batch as a compressed .npz of named NumPy arrays (see
+# put_calculator.snapshots), so reading one back is a single indexed row
+# fetch and a decompress, not thousands of ORM rows.
+
+
+class ChainSnapshot(models.Model):
+    """Every put contract listed for an underlying at fetched_at"""
+    underlying = models.CharField(max_length=16)
+    fetched_at = models.DateTimeField(default=timezone.now)
+    contract_count = models.PositiveIntegerField()
+    data = models.BinaryField()  # symbol, strike_price, expiration_date, close_price
+
+    class Meta:
+        indexes = [models.Index(fields=['underlying', '-fetched_at'])]
+
+    def __str__(self):
+        return f"{self.underlying} chain at {self.fetched_at:%Y-%m-%d %H:%M:%S} ({self.contract_count} contracts)"
+
+
+class QuoteSnapshot(models.Model):
+    """Latest bid/ask for every put on an underlying at fetched_at"""
+    underlying = models.CharField(max_length=16)
+    fetched_at = models.DateTimeField(default=timezone.now)
+    contract_count = models.PositiveIntegerField()
+    data = models.BinaryField()  # symbol, bid_price, ask_price
+
+    class Meta:
+        indexes = [models.Index(fields=['underlying', '-fetched_at'])]
+
+    def __str__(self):
+        return f"{self.underlying} quotes at {self.fetched_at:%Y-%m-%d %H:%M:%S} ({self.contract_count} contracts)"
+
+
+class TickBatch(models.Model):
+    """Consecutive streamed trades or quotes for one symbol"""
+    KIND_CHOICES = [('trade', 'Trade'), ('quote', 'Quote')]
+
+    symbol = models.CharField(max_length=16)
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES)
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    data = models.BinaryField()  # timestamp plus price/size (trades) or bid/ask price/size (quotes)
+
+    class Meta:
+        indexes = [models.Index(fields=['symbol', 'kind', 'first_at'])]
+
+    def __str__(self):
+        return f"{self.count} {self.symbol} {self.kind}s from {self.first_at:%Y-%m-%d %H:%M:%S}"
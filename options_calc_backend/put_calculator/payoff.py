@@ -0,0 +1,77 @@
+# put_calculator/payoff.py
+import numpy as np
+
+
+def payoff_at_expiration(legs, prices):
+    """Total P&L of the position at expiration for each underlying price (legs from parse_legs)"""
+    prices = np.asarray(prices, dtype=np.float64)[None, :]
+    strike = legs['strike'][:, None]
+    leg_type = legs['type'][:, None]
+    value = np.where(
+        leg_type == 'call', np.maximum(prices - strike, 0.0),
+        np.where(leg_type == 'put', np.maximum(strike - prices, 0.0), prices),
+    )
+    return ((value - legs['cost'][:, None]) * legs['quantity'][:, None]).sum(axis=0)
+
+
+def kinks(legs):
+    """Prices where the payoff changes slope (the option strikes)"""
+    return np.unique(legs['strike'][legs['type'] != 'stock'])
+
+
+def default_price_range(legs):
+    """50% below the lowest to 50% above the highest strike or stock entry price"""
+    reference = np.concatenate([kinks(legs), legs['cost'][legs['type'] == 'stock']])
+    return float(reference.min() * 0.5), float(reference.max() * 1.5)
+
+
+def upside_slope(legs):
+    """P&L change per $1 move once the price is above every strike"""
+    return float(legs['quantity'][legs['type'] != 'put'].sum())
+
+
+def price_grid(legs, price_min, price_max, points):
+    """About points prices over [price_min, price_max]: evenly spaced, plus every strike inside the range"""
+    breaks = kinks(legs)
+    breaks = breaks[(breaks > price_min) & (breaks < price_max)]
+    return np.union1d(np.linspace(price_min, price_max, max(points - len(breaks), 2)), breaks)
+
+
+def payoff_profile(legs, price_min, price_max, points, max_points=None):
+    """
+    The payoff curve over a price range plus its summary (max profit/loss
+    over every price the underlying can reach, None when unbounded above).
+
+    The payoff is evaluated at points prices. Between strikes it is linear,
+    so the breakevens (linear interpolation of sign changes) found on a
+    grid that includes the strikes are exact. Likewise the extremes are
+    taken at price 0 and at every strike, whether or not they are inside
+    the range; beyond the highest strike upside_slope decides. With
+    max_points the curve returned is re-evaluated on max_points prices
+    (strikes always included), so a chart that joins the points with
+    straight lines still draws the exact curve.
+    """
+    prices = price_grid(legs, price_min, price_max, points)
+    pnl = payoff_at_expiration(legs, prices)
+
+    crossing = np.flatnonzero(np.sign(pnl[:-1]) * np.sign(pnl[1:]) < 0)
+    breakevens = prices[crossing] - pnl[crossing] * (prices[crossing + 1] - prices[crossing]) / (pnl[crossing + 1] - pnl[crossing])
+    breakevens = np.concatenate([breakevens, prices[pnl == 0]])
+
+    slope = upside_slope(legs)
+    extremes = np.concatenate([pnl, payoff_at_expiration(legs, np.append(kinks(legs), 0.0))])
+    summary = {
+        'max_profit': None if slope > 0 else round(float(extremes.max()), 2),
+        'max_loss': None if slope < 0 else round(float(extremes.min()), 2),
+        'breakevens': np.round(np.unique(breakevens), 4).tolist(),
+        'upside_slope': slope,
+        'net_premium': round(float(-(legs['cost'] * legs['quantity'])[legs['type'] != 'stock'].sum()), 2),
+    }
+
+    if max_points is not None and max_points < len(prices):
+        prices = price_grid(legs, price_min, price_max, max_points)
+        pnl = payoff_at_expiration(legs, prices)
+
+    summary['prices'] = np.round(prices, 4).tolist()
+    summary['pnl'] = np.round(pnl, 2).tolist()
+    return summary
@@ -0,0 +1,114 @@
+# put_calculator/positions.py
+import math
+from datetime import datetime
+import numpy as np
+
+CONTRACT_MULTIPLIER = 100
+LEG_TYPES = ('call', 'put', 'stock')
+MAX_LEGS = 20
+
+
+class PositionError(ValueError):
+    """A position definition that can't be evaluated"""
+
+
+def parse_legs(legs):
+    """
+    Validate a position's legs and return them as column arrays.
+
+    Each leg is {"type": "call"|"put"|"stock", "side": "long"|"short",
+    "quantity": n} plus "strike" and "premium" (per share) for options, or
+    "price" (entry price) for stock. Option quantities are contracts, stock
+    quantities are shares.
+    """
+    if not isinstance(legs, list) or not legs:
+        raise PositionError("legs must be a non-empty list.")
+    if len(legs) > MAX_LEGS:
+        raise PositionError(f"At most {MAX_LEGS} legs per position.")
+
+    columns = {'type': [], 'strike': [], 'cost': [], 'quantity': []}
+    for i, leg in enumerate(legs):
+        if not isinstance(leg, dict):
+            raise PositionError(f"Leg {i} must be an object.")
+        leg_type = leg.get('type')
+        if leg_type not in LEG_TYPES:
+            raise PositionError(f"Leg {i}: type must be one of {', '.join(LEG_TYPES)}.")
+        side = leg.get('side', 'long')
+        if side not in ('long', 'short'):
+            raise PositionError(f"Leg {i}: side must be 'long' or 'short'.")
+        try:
+            quantity = float(leg.get('quantity', 1))
+            if leg_type == 'stock':
+                strike, cost = 0.0, float(leg['price'])
+                multiplier = 1
+            else:
+                strike, cost = float(leg['strike']), float(leg.get('premium', 0))
+                multiplier = CONTRACT_MULTIPLIER
+        except KeyError as e:
+            raise PositionError(f"Leg {i}: {e.args[0]} is required.")
+        except (TypeError, ValueError):
+            raise PositionError(f"Leg {i}: strike, premium, price and quantity must be numbers.")
+        if quantity <= 0 or strike < 0 or cost < 0:
+            raise PositionError(f"Leg {i}: quantity must be positive and prices non-negative.")
+
+        columns['type'].append(leg_type)
+        columns['strike'].append(strike)
+        columns['cost'].append(cost)
+        columns['quantity'].append(quantity * multiplier * (1 if side == 'long' else -1))
+
+    return {
+        'type': np.array(columns['type']),
+        'strike': np.array(columns['strike']),
+        'cost': np.array(columns['cost']),
+        'quantity': np.array(columns['quantity']),
+    }
+
+
+def parse_positions(positions, limit):
+    """
+    Validate registered short puts and return (ids, column arrays).
+
+    Each position is {"id", "strike_price", "option_premium",
+    "expiration_date_str"} plus optional "volatility" (enables the Greeks)
+    and "number_of_contracts", as in the calculate_put_metrics request.
+    """
+    if not isinstance(positions, list) or not positions:
+        raise PositionError("positions must be a non-empty list.")
+    if len(positions) > limit:
+        raise PositionError(f"At most {limit} positions per client.")
+
+    ids = []
+    columns = {'strike_price': [], 'option_premium': [], 'expiration_date': [], 'volatility': [], 'contracts': []}
+    for i, position in enumerate(positions):
+        if not isinstance(position, dict):
+            raise PositionError(f"Position {i} must be an object.")
+        try:
+            position_id = str(position['id'])
+            strike_price = float(position['strike_price'])
+            option_premium = float(position['option_premium'])
+            expiration_date = datetime.strptime(position['expiration_date_str'], '%Y-%m-%d').date()
+            volatility = float(position['volatility']) if position.get('volatility') is not None else math.nan
+            contracts = int(position.get('number_of_contracts', 1))
+        except KeyError as e:
+            raise PositionError(f"Position {i}: {e.args[0]} is required.")
+        except (TypeError, ValueError):
+            raise PositionError(f"Position {i}: invalid numeric or date field.")
+        if strike_price <= 0 or option_premium < 0 or contracts <= 0 or volatility <= 0:
+            raise PositionError(f"Position {i}: strike, contracts and volatility must be positive, premium non-negative.")
+        if position_id in ids:
+            raise PositionError(f"Position {i}: duplicate id {position_id!r}.")
+
+        ids.append(position_id)
+        columns['strike_price'].append(strike_price)
+        columns['option_premium'].append(option_premium)
+        columns['expiration_date'].append(expiration_date)
+        columns['volatility'].append(volatility)
+        columns['contracts'].append(contracts)
+
+    return ids, {
+        'strike_price': np.array(columns['strike_price'], dtype=np.float64),
+        'option_premium': np.array(columns['option_premium'], dtype=np.float64),
+        'expiration_date': np.array(columns['expiration_date'], dtype='datetime64[D]'),
+        'volatility': np.array(columns['volatility'], dtype=np.float64),
+        'contracts': np.array(columns['contracts'], dtype=np.float64),
+    }
@@ -0,0 +1,165 @@
+# put_calculator/prefetch.py
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from django.conf import settings
+from .chain_cache import chain_cache, quote_cache
+from .chains import load_put_chain_index, load_put_quotes
+from .market import market_status
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('chain', 'quotes')
+# Longest the scheduler sleeps without re-checking market status, so the open is noticed promptly
+STATUS_POLL_SECONDS = 30
+
+
+class _Pacer:
+    """Spaces calls to wait() at least 1/rate seconds apart across threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self, rate):
+        if not rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + 1 / rate
+        time.sleep(start - now)
+
+
+class Prefetcher:
+    """
+    Keeps the chain and quote caches warm for the PREFETCH_WATCHLIST symbols.
+
+    While the market is open (market_status(), as the stream reports it)
+    each symbol's chain is refreshed every PREFETCH_CHAIN_INTERVAL seconds
+    and its quotes every PREFETCH_QUOTE_INTERVAL; keep both below their
+    cache TTLs so entries never lapse. Outside market hours everything is
+    refreshed every PREFETCH_CLOSED_INTERVAL seconds, or not at all when
+    that is 0, and the whole watchlist is refreshed as soon as the market
+    opens. Refreshes run on at most PREFETCH_CONCURRENCY threads, start at
+    most PREFETCH_MAX_PER_SECOND times a second, and go through the
+    caches' single-flight, so they never duplicate a user request's fetch.
+    """
+
+    def __init__(self, watchlist=None):
+        self._watchlist = watchlist
+        self._due = {}  # (kind, symbol) -> monotonic time of its next refresh
+        self._status = None
+        self._pacer = _Pacer()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.rounds = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    @property
+    def watchlist(self):
+        symbols = self._watchlist if self._watchlist is not None else settings.PREFETCH_WATCHLIST
+        return list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+
+    def interval(self, kind, status):
+        """Seconds between refreshes of kind at a market status, None when paused"""
+        if status == 'open':
+            return settings.PREFETCH_CHAIN_INTERVAL if kind == 'chain' else settings.PREFETCH_QUOTE_INTERVAL
+        return settings.PREFETCH_CLOSED_INTERVAL or None
+
+    def run_once(self, now=None):
+        """Refresh whatever is due (everything on the first round and at the open); returns the jobs run"""
+        now = time.monotonic() if now is None else now
+        status = market_status()
+        if status != self._status:
+            if status == 'open' or self._status is None:
+                self._due.clear()
+            self._status = status
+
+        jobs = [(kind, symbol) for symbol in self.watchlist for kind in KINDS if self._due.get((kind, symbol), 0) <= now]
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(settings.PREFETCH_CONCURRENCY, len(jobs)),
+                                    thread_name_prefix='prefetch') as pool:
+                list(pool.map(self._refresh, jobs))
+        for kind, symbol in jobs:
+            interval = self.interval(kind, status)
+            self._due[(kind, symbol)] = now + interval if interval else math.inf
+        self.rounds += 1
+        return jobs
+
+    def _refresh(self, job):
+        kind, symbol = job
+        self._pacer.wait(settings.PREFETCH_MAX_PER_SECOND)
+        try:
+            # Straight from upstream, even on a cold start: the snapshot
+            # store's copy is at best as old as the last refresh
+            if kind == 'chain':
+                chain_cache.refresh(symbol, partial(load_put_chain_index, max_age=0))
+            else:
+                quote_cache.refresh(symbol, partial(load_put_quotes, max_age=0))
+        except Exception as e:
+            logger.warning("Prefetching %s %s failed: %s", symbol, kind, e)
+            with self._lock:
+                self.failures += 1
+        else:
+            with self._lock:
+                self.refreshes += 1
+
+    def seconds_until_due(self, now=None):
+        """Time to the next refresh, capped at STATUS_POLL_SECONDS"""
+        now = time.monotonic() if now is None else now
+        next_due = min(self._due.values(), default=0)
+        return min(max(next_due - now, 0), STATUS_POLL_SECONDS)
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Prefetch round failed")
+            self._stop.wait(self.seconds_until_due())
+
+    def start(self):
+        """Run the scheduler on a daemon thread (no-op if it is already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='chain-prefetch', daemon=True)
+        self._thread.start()
+        logger.info("Prefetching chains and quotes for %s", ', '.join(self.watchlist))
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "market_status": self._status,
+                "watchlist": self.watchlist,
+                "rounds": self.rounds,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+            }
+
+
+prefetcher = Prefetcher()
+
+
+def start_prefetching():
+    """
+    Start the shared prefetcher when PREFETCH_WATCHLIST is set. Called from
+    the server entry point (options_calc_backend.wsgi, which runserver also
+    loads) so only processes that serve requests warm their caches, never
+    tests, management commands or scripts that merely import the app.
+    """
+    if settings.PREFETCH_WATCHLIST:
+        prefetcher.start()
@@ -0,0 +1,210 @@
+# put_calculator/pricing.py
+import numpy as np
+
+DAYS_PER_YEAR = 365.0
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x):
+    """
+    Standard normal CDF, vectorized (Hart's double precision approximation,
+    as given by West, "Better approximations to cumulative normal functions").
+    Keeps numpy as the only dependency instead of pulling in scipy for erf.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    exponential = np.exp(-0.5 * z * z)
+
+    numerator = 3.52624965998911e-02 * z + 0.700383064443688
+    numerator = numerator * z + 6.37396220353165
+    numerator = numerator * z + 33.912866078383
+    numerator = numerator * z + 112.079291497871
+    numerator = numerator * z + 221.213596169931
+    numerator = numerator * z + 220.206867912376
+    denominator = 8.83883476483184e-02 * z + 1.75566716318264
+    denominator = denominator * z + 16.064177579207
+    denominator = denominator * z + 86.7807322029461
+    denominator = denominator * z + 296.564248779674
+    denominator = denominator * z + 637.333633378831
+    denominator = denominator * z + 793.826512519948
+    denominator = denominator * z + 440.413735824752
+    tail = exponential * numerator / denominator
+
+    # Continued fraction is more accurate far out in the tail
+    far = z >= 7.07106781186547
+    if far.any():
+        fraction = z + 0.65
+        fraction = z + 4 / fraction
+        fraction = z + 3 / fraction
+        fraction = z + 2 / fraction
+        fraction = z + 1 / fraction
+        tail = np.where(far, exponential / fraction / _SQRT_2PI, tail)
+
+    return np.where(x > 0, 1.0 - tail, tail)
+
+
+def _is_call(option_type):
+    return np.char.lower(np.asarray(option_type, dtype=str)) == 'call'
+
+
+def black_scholes(option_type, spot, strike, years, volatility, rate=0.0, dividend_yield=0.0):
+    """
+    Black-Scholes-Merton prices and Greeks for European puts and calls.
+
+    Every argument may be a scalar or an array; they broadcast together, so a
+    whole chain (strikes x expirations) is priced in one call. option_type is
+    'put' or 'call' (or an array of them). years is time to expiration in
+    years, volatility and rates are annualized decimals (0.25 = 25%).
+
+    Returns a dict of arrays: price, delta, gamma, theta (per calendar day),
+    vega (per 1 vol point), rho (per 1% rate) and itm_probability, the
+    risk-neutral probability of finishing in the money (i.e. of assignment
+    for a short option). Zero-volatility options are valued at the
+    discounted forward intrinsic value, max(±(S·e^(-qT) - K·e^(-rT)), 0),
+    with the delta, theta, rho and itm_probability of that certain payoff
+    and zero gamma and vega; expired options (years <= 0) at plain intrinsic
+    value.
+    """
+    is_call = _is_call(option_type)
+    spot = np.asarray(spot, dtype=np.float64)
+    strike = np.asarray(strike, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+    volatility = np.asarray(volatility, dtype=np.float64)
+    rate = np.asarray(rate, dtype=np.float64)
+    dividend_yield = np.asarray(dividend_yield, dtype=np.float64)
+
+    live = (years > 0) & (volatility > 0)
+    t = np.where(live, years, 1.0)
+    sigma = np.where(live, volatility, 1.0)
+
+    sqrt_t = np.sqrt(t)
+    sigma_sqrt_t = sigma * sqrt_t
+    with np.errstate(divide='ignore'):
+        d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * sigma * sigma) * t) / sigma_sqrt_t
+    d2 = d1 - sigma_sqrt_t
+
+    discount = np.exp(-rate * t)
+    carry = np.exp(-dividend_yield * t)
+    pdf_d1 = norm_pdf(d1)
+
+    # Put terms come from the reflected CDFs: N(-d1), N(-d2)
+    sign = np.where(is_call, 1.0, -1.0)
+    nd1 = norm_cdf(sign * d1)
+    nd2 = norm_cdf(sign * d2)
+
+    price = sign * (spot * carry * nd1 - strike * discount * nd2)
+    delta = sign * carry * nd1
+    gamma = carry * pdf_d1 / (spot * sigma_sqrt_t)
+    vega = spot * carry * pdf_d1 * sqrt_t / 100
+    theta = (
+        -spot * carry * pdf_d1 * sigma / (2 * sqrt_t)
+        - sign * rate * strike * discount * nd2
+        + sign * dividend_yield * spot * carry * nd1
+    ) / DAYS_PER_YEAR
+    rho = sign * strike * t * discount * nd2 / 100
+
+    # Without volatility the payoff is known now: the forward intrinsic value,
+    # discounted (undiscounted once expired, when years is 0)
+    remaining = np.maximum(years, 0.0)
+    forward_discount = np.exp(-rate * remaining)
+    forward_carry = np.exp(-dividend_yield * remaining)
+    intrinsic = np.maximum(sign * (spot * forward_carry - strike * forward_discount), 0.0)
+    itm = intrinsic > 0
+    carry_theta = itm & (years > 0)
+    zero = np.zeros_like(price)
+
+    return {
+        'price': np.where(live, price, intrinsic),
+        'delta': np.where(live, delta, np.where(itm, sign * forward_carry, 0.0)),
+        'gamma': np.where(live, gamma, zero),
+        'theta': np.where(live, theta, np.where(
+            carry_theta,
+            sign * (dividend_yield * spot * forward_carry - rate * strike * forward_discount) / DAYS_PER_YEAR,
+            0.0,
+        )),
+        'vega': np.where(live, vega, zero),
+        'rho': np.where(live, rho, np.where(itm, sign * strike * remaining * forward_discount / 100, 0.0)),
+        'itm_probability': np.where(live, nd2, itm.astype(np.float64)),
+    }
+
+
+def _price_and_vega(is_call, spot, strike, years, volatility, rate, dividend_yield):
+    """Black-Scholes price and raw vega (per 1.00 of vol) for live options only"""
+    sqrt_t = np.sqrt(years)
+    sigma_sqrt_t = volatility * sqrt_t
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * volatility * volatility) * years) / sigma_sqrt_t
+    d2 = d1 - sigma_sqrt_t
+    sign = np.where(is_call, 1.0, -1.0)
+    carry_spot = spot * np.exp(-dividend_yield * years)
+    price = sign * (carry_spot * norm_cdf(sign * d1) - strike * np.exp(-rate * years) * norm_cdf(sign * d2))
+    return price, carry_spot * norm_pdf(d1) * sqrt_t
+
+
+def implied_volatility(option_type, price, spot, strike, years, rate=0.0, dividend_yield=0.0,
+                       tol=1e-6, max_iter=100, min_vol=1e-4, max_vol=5.0):
+    """
+    Implied volatility for whole arrays of option prices at once.
+
+    Each element runs a safeguarded Newton iteration: Newton steps on vega,
+    falling back to bisection of a [min_vol, max_vol] bracket whenever a step
+    leaves the bracket. Elements drop out of the working set as soon as they
+    converge, so late iterations only touch the stragglers. Quotes outside the
+    no-arbitrage bounds, expired options and anything that doesn't converge
+    come back as NaN.
+    """
+    is_call, price, spot, strike, years, rate, dividend_yield = np.broadcast_arrays(
+        _is_call(option_type),
+        np.asarray(price, dtype=np.float64),
+        np.asarray(spot, dtype=np.float64),
+        np.asarray(strike, dtype=np.float64),
+        np.asarray(years, dtype=np.float64),
+        np.asarray(rate, dtype=np.float64),
+        np.asarray(dividend_yield, dtype=np.float64),
+    )
+    shape = price.shape
+    is_call, price, spot, strike, years, rate, dividend_yield = (
+        a.ravel() for a in (is_call, price, spot, strike, years, rate, dividend_yield)
+    )
+    result = np.full(price.shape, np.nan)
+
+    with np.errstate(invalid='ignore'):
+        discounted_spot = spot * np.exp(-dividend_yield * years)
+        discounted_strike = strike * np.exp(-rate * years)
+        lower = np.where(is_call, np.maximum(discounted_spot - discounted_strike, 0.0),
+                         np.maximum(discounted_strike - discounted_spot, 0.0))
+        upper = np.where(is_call, discounted_spot, discounted_strike)
+        solvable = (years > 0) & (spot > 0) & (strike > 0) & (price > lower) & (price < upper)
+
+    # Working set: indexes still being solved and their per-element state
+    idx = np.flatnonzero(solvable)
+    lo = np.full(idx.shape, min_vol)
+    hi = np.full(idx.shape, max_vol)
+    # Brenner-Subrahmanyam starting point
+    sigma = np.clip(np.sqrt(2 * np.pi / years[idx]) * price[idx] / spot[idx], min_vol * 10, max_vol / 2)
+
+    for _ in range(max_iter):
+        if not idx.size:
+            break
+        model, vega = _price_and_vega(is_call[idx], spot[idx], strike[idx], years[idx], sigma, rate[idx], dividend_yield[idx])
+        diff = model - price[idx]
+
+        converged = (np.abs(diff) < tol) | (hi - lo < tol * 1e-3)
+        result[idx[converged]] = sigma[converged]
+
+        # Price is increasing in vol, so the sign of diff tightens the bracket
+        hi = np.where(diff > 0, sigma, hi)
+        lo = np.where(diff > 0, lo, sigma)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            step = sigma - diff / vega
+        sigma = np.where((step > lo) & (step < hi), step, 0.5 * (lo + hi))
+
+        keep = ~converged
+        idx, lo, hi, sigma = idx[keep], lo[keep], hi[keep], sigma[keep]
+
+    # A root pinned to the bracket edge means the quote needs a vol outside it
+    result[(result <= min_vol * (1 + 1e-6)) | (result >= max_vol * (1 - 1e-6))] = np.nan
+    return result.reshape(shape)
@@ -0,0 +1,174 @@
+# put_calculator/providers.py
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from alpaca.data.historical.stock import StockHistoricalDataClient
+from polygon import RESTClient
+import finnhub
+from .instrumentation import metrics, upstream_call
+from .resilience import GuardRegistry
+
+# provider_config() keys that configure the HTTP client; the rest configure its ProviderGuard
+CLIENT_OPTIONS = ('pool_size', 'connect_timeout', 'read_timeout')
+
+
+def provider_config(provider):
+    """
+    Pool size, timeouts, rate limit, retry and circuit breaker settings for a
+    provider: UPSTREAM_* defaults, overridden per provider by UPSTREAM_PROVIDERS
+    """
+    config = {
+        'pool_size': settings.UPSTREAM_POOL_SIZE,
+        'connect_timeout': settings.UPSTREAM_CONNECT_TIMEOUT,
+        'read_timeout': settings.UPSTREAM_READ_TIMEOUT,
+        'rate_limit': settings.UPSTREAM_RATE_LIMIT,
+        'burst': settings.UPSTREAM_BURST,
+        'queue_timeout': settings.UPSTREAM_QUEUE_TIMEOUT,
+        'retries': settings.UPSTREAM_RETRIES,
+        'backoff': settings.UPSTREAM_BACKOFF,
+        'max_backoff': settings.UPSTREAM_MAX_BACKOFF,
+        'failure_threshold': settings.UPSTREAM_FAILURE_THRESHOLD,
+        'reset_timeout': settings.UPSTREAM_RESET_TIMEOUT,
+    }
+    config.update(settings.UPSTREAM_PROVIDERS.get(provider, {}))
+    return config
+
+
+def _client_config(provider):
+    config = provider_config(provider)
+    return {name: config[name] for name in CLIENT_OPTIONS}
+
+
+def _guard_config(provider):
+    config = provider_config(provider)
+    return {name: value for name, value in config.items() if name not in CLIENT_OPTIONS}
+
+
+guards = GuardRegistry(_guard_config)
+metrics.add_collector(guards.collect)
+
+
+class PooledSession(requests.Session):
+    """
+    Keep-alive session with a sized connection pool and a default (connect,
+    read) timeout. Every request goes through the provider's ProviderGuard
+    (rate limit, retries, circuit breaker) and each attempt is timed as an
+    upstream call to provider.
+    """
+
+    def __init__(self, provider, pool_size, connect_timeout, read_timeout):
+        super().__init__()
+        self.provider = provider
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.timeout = (connect_timeout, read_timeout)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+
+        def send():
+            with upstream_call(self.provider) as call:
+                response = super(PooledSession, self).request(method, url, **kwargs)
+                if not kwargs.get('stream'):
+                    call['bytes'] = len(response.content)
+            return response
+        return guards.get(self.provider).call(send)
+
+
+def _guarded_pool_request(provider, request):
+    """
+    Wrap a urllib3 pool's request method so each call goes through the
+    provider's ProviderGuard and each attempt is timed as an upstream call.
+    urllib3's own retries are turned off; the guard does the retrying.
+    """
+    def guarded_request(*args, **kwargs):
+        def send():
+            with upstream_call(provider) as call:
+                response = request(*args, **dict(kwargs, retries=False))
+                call['bytes'] = len(response.data or b'')
+            return response
+        return guards.get(provider).call(send)
+    return guarded_request
+
+
+class ProviderRegistry:
+    """
+    Process-wide, long-lived upstream clients, built on first use.
+
+    Each provider gets one keep-alive connection pool that every request
+    shares, instead of a new client (and TLS handshake) per view call. The
+    Finnhub and Alpaca SDK clients are given a PooledSession in place of the
+    plain session they create; Polygon's urllib3 pool is sized to match and
+    its requests guarded and timed the same way.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def _get(self, name, factory):
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = factory()
+        return client
+
+    def session(self, provider):
+        """Shared PooledSession for raw HTTP calls to provider"""
+        return self._get(f"session:{provider}", lambda: PooledSession(provider, **_client_config(provider)))
+
+    def finnhub(self):
+        def build():
+            client = finnhub.Client(api_key=settings.FINNHUB_API_KEY)
+            session = PooledSession('finnhub', **_client_config('finnhub'))
+            session.headers.update(client._session.headers)
+            session.params.update(client._session.params)
+            client._session.close()
+            client._session = session
+            # The SDK passes its own timeout on every call, which the session would otherwise keep
+            client.DEFAULT_TIMEOUT = session.timeout
+            return client
+        return self._get('finnhub', build)
+
+    def polygon(self):
+        def build():
+            config = provider_config('polygon')
+            client = RESTClient(
+                settings.POLYGON_API_KEY,
+                connect_timeout=config['connect_timeout'],
+                read_timeout=config['read_timeout'],
+            )
+            client.client.connection_pool_kw['maxsize'] = config['pool_size']
+            client.client.request = _guarded_pool_request('polygon', client.client.request)
+            return client
+        return self._get('polygon', build)
+
+    def alpaca_stock_data(self):
+        def build():
+            client = StockHistoricalDataClient(settings.ALPACA_API_KEY, settings.ALPACA_SECRET_KEY)
+            # The session's guard retries; the SDK's own 429 retry would sleep 3s per attempt on top
+            client._retry = 0
+            client._session.close()
+            client._session = self.session('alpaca')
+            return client
+        return self._get('alpaca_stock_data', build)
+
+    def close(self):
+        """Close every pooled connection; clients are rebuilt on next use"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            if isinstance(client, requests.Session):
+                client.close()
+            elif isinstance(client, finnhub.Client):
+                client.close()
+            elif isinstance(client, RESTClient):
+                client.client.clear()
+
+
+providers = ProviderRegistry()
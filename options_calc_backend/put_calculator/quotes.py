@@ -0,0 +1,194 @@
+# put_calculator/quotes.py
+import asyncio
+import logging
+import statistics
+import time
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from alpaca.common.exceptions import APIError
+from alpaca.data.requests import StockLatestTradeRequest
+from .providers import providers
+
+logger = logging.getLogger(__name__)
+
+
+def finnhub_price(symbol):
+    """Current price from Finnhub's quote endpoint, or None"""
+    quote = providers.finnhub().quote(symbol)
+    return quote.get('c') or None
+
+
+def polygon_price(symbol):
+    """NBBO midpoint from Polygon's last quote, or None"""
+    last_quote = providers.polygon().get_last_quote(symbol)
+    if last_quote and last_quote.bid_price and last_quote.ask_price:
+        return (last_quote.bid_price + last_quote.ask_price) / 2
+    return None
+
+
+def alpaca_prices(symbols):
+    """Latest Alpaca trade prices for many symbols in one request, as {symbol: price}"""
+    latest_trade_request = StockLatestTradeRequest(symbol_or_symbols=list(symbols))
+    latest_trade_data = providers.alpaca_stock_data().get_stock_latest_trade(request_params=latest_trade_request)
+    return {
+        symbol: latest_trade.price
+        for symbol, latest_trade in latest_trade_data.items()
+        if latest_trade and hasattr(latest_trade, 'price')
+    }
+
+
+def alpaca_trade_price(symbol):
+    """Latest Alpaca trade price, or None"""
+    return alpaca_prices([symbol]).get(symbol)
+
+
+def _unavailable(error):
+    # Alpaca down, throttling or refused by its guard, as opposed to a bad request
+    if isinstance(error, APIError):
+        return error.status_code is not None and (error.status_code == 429 or error.status_code >= 500)
+    return isinstance(error, requests.RequestException)
+
+
+async def alpaca_price(symbol):
+    """
+    Latest Alpaca trade price for pricing a chain, or None. If Alpaca is
+    unavailable (e.g. its circuit is open) the last price it gave within
+    UPSTREAM_LAST_PRICE_MAX_AGE seconds is used instead, then the median of
+    the other configured providers; the error is raised only if neither
+    has a price. Sync views call it through asgiref's async_to_sync.
+    """
+    key = f"last_price:{symbol.upper()}"
+    try:
+        price = await asyncio.to_thread(alpaca_trade_price, symbol)
+    except Exception as e:
+        if not _unavailable(e):
+            raise
+        price = cache.get(key)
+        if price is None:
+            others = [provider for provider in configured_providers() if provider != 'alpaca']
+            price = (await consensus_price(symbol, others))[0] if others else None
+        if price is None:
+            raise
+        logger.warning("Alpaca price for %s unavailable, using %s: %s", symbol, price, e)
+        return price
+    if price is not None:
+        cache.set(key, price, timeout=settings.UPSTREAM_LAST_PRICE_MAX_AGE)
+    return price
+
+
+def polygon_prices(symbols):
+    """Last trade prices (NBBO midpoint as a fallback) from one Polygon snapshot request, as {symbol: price}"""
+    prices = {}
+    for snapshot in providers.polygon().get_snapshot_all("stocks", tickers=list(symbols)):
+        if snapshot.last_trade and snapshot.last_trade.price:
+            prices[snapshot.ticker] = snapshot.last_trade.price
+        elif snapshot.last_quote and snapshot.last_quote.bid_price and snapshot.last_quote.ask_price:
+            prices[snapshot.ticker] = (snapshot.last_quote.bid_price + snapshot.last_quote.ask_price) / 2
+    return prices
+
+
+QUOTE_PROVIDERS = {
+    'finnhub': finnhub_price,
+    'polygon': polygon_price,
+    'alpaca': alpaca_trade_price,
+}
+
+
+# Providers whose APIs price many symbols per request, in fallback order
+BULK_QUOTE_PROVIDERS = {
+    'alpaca': alpaca_prices,
+    'polygon': polygon_prices,
+}
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def configured_providers():
+    """Quote providers that have API keys set"""
+    keys = {
+        'finnhub': settings.FINNHUB_API_KEY,
+        'polygon': settings.POLYGON_API_KEY,
+        'alpaca': settings.ALPACA_API_KEY and settings.ALPACA_SECRET_KEY,
+    }
+    return [provider for provider in QUOTE_PROVIDERS if keys[provider]]
+
+
+async def fetch_price(provider, symbol):
+    """
+    One provider's price for symbol within its latency budget
+    (QUOTE_LATENCY_BUDGETS). Never raises: failures and timeouts are
+    reported in the result's error field.
+    """
+    budget = settings.QUOTE_LATENCY_BUDGETS.get(provider, settings.QUOTE_DEFAULT_LATENCY_BUDGET)
+    start = time.perf_counter()
+    result = {'provider': provider, 'price': None, 'error': None}
+    try:
+        # The SDK clients are blocking; run them on the default thread pool
+        result['price'] = await asyncio.wait_for(asyncio.to_thread(QUOTE_PROVIDERS[provider], symbol), budget)
+        if result['price'] is None:
+            result['error'] = "no price returned"
+    except asyncio.TimeoutError:
+        result['error'] = f"exceeded {budget}s latency budget"
+    except Exception as e:
+        result['error'] = str(e)
+    result['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+async def first_price(symbol, provider_names):
+    """Ask every provider at once and return the first valid price, plus all results seen so far"""
+    tasks = [asyncio.create_task(fetch_price(provider, symbol)) for provider in provider_names]
+    results = []
+    try:
+        for finished in asyncio.as_completed(tasks):
+            result = await finished
+            results.append(result)
+            if result['price'] is not None:
+                return result, results
+        return None, results
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def consensus_price(symbol, provider_names):
+    """Median of every provider that answers within its budget, plus the per-provider results"""
+    results = await asyncio.gather(*(fetch_price(provider, symbol) for provider in provider_names))
+    prices = [result['price'] for result in results if result['price'] is not None]
+    return (statistics.median(prices) if prices else None), list(results)
+
+
+async def bulk_prices(symbols, provider_names):
+    """
+    Prices for many symbols. Each provider gets the symbols still missing,
+    split into BULK_BATCH_SIZES-sized requests that run concurrently (at most
+    BULK_MAX_CONCURRENCY at once). Returns ({symbol: price}, {symbol: provider},
+    {provider: error}).
+    """
+    prices, sources, errors = {}, {}, {}
+    semaphore = asyncio.Semaphore(settings.BULK_MAX_CONCURRENCY)
+
+    async def fetch_batch(provider, batch):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(BULK_QUOTE_PROVIDERS[provider], batch)
+            except Exception as e:
+                errors[provider] = str(e)
+                return {}
+
+    remaining = list(symbols)
+    for provider in provider_names:
+        if not remaining:
+            break
+        batches = chunked(remaining, settings.BULK_BATCH_SIZES.get(provider, 100))
+        for found in await asyncio.gather(*(fetch_batch(provider, batch) for batch in batches)):
+            for symbol, price in found.items():
+                if price is not None and symbol not in prices:
+                    prices[symbol] = price
+                    sources[symbol] = provider
+        remaining = [symbol for symbol in remaining if symbol not in prices]
+
+    return prices, sources, errors
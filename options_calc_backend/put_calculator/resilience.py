@@ -0,0 +1,294 @@
+# put_calculator/resilience.py
+import math
+import random
+import threading
+import time
+import requests
+import urllib3
+
+# Upstream statuses worth retrying: rate limited or a transient server-side failure
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, urllib3.exceptions.HTTPError)
+
+
+class ProviderUnavailable(requests.RequestException):
+    """
+    An upstream call refused locally: the provider's circuit is open or its
+    rate limit queue is full. retry_after is roughly how many seconds until
+    a call could get through.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def retry_after_header(self):
+        """retry_after as a Retry-After header value: whole seconds, at least 1"""
+        return str(max(math.ceil(self.retry_after or 0), 1))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that queues callers instead of refusing them.
+
+    acquire() reserves the next token and sleeps until it is due, so
+    waiting callers are served in arrival order. The rate adapts: throttle()
+    halves it (at most once a second) when the provider answers 429, and
+    each success wins back 1% of the configured rate (AIMD), up to
+    that rate.
+    """
+
+    def __init__(self, rate, burst):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.waiting = 0
+        self._updated = time.monotonic()
+        self._throttled_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # Caller holds self._lock
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout):
+        """Take a token, waiting up to timeout seconds for one; False if it wouldn't come in time"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(-(self.tokens - 1) / self.rate, 0.0)
+            if wait > timeout:
+                return False
+            self.tokens -= 1
+            self.waiting += 1
+        try:
+            time.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        return True
+
+    def throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            # Concurrent calls see the same burst of 429s: halve once per second, not once per response
+            if now - self._throttled_at < 1:
+                return
+            self._throttled_at = now
+            self._refill(now)
+            self.rate = max(self.rate / 2, self.max_rate / 100)
+
+    def recover(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.rate + self.max_rate / 100, self.max_rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failed calls and refuses calls
+    for reset_timeout seconds. Then one trial call is let through
+    (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opens = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def retry_in(self):
+        """Seconds until an open circuit lets a trial call through"""
+        with self._lock:
+            return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0) if self.state == 'open' else 0.0
+
+    def release(self):
+        """Give back a trial claimed by allow() for a call that never reached the provider"""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+                self.opens += 1
+
+
+def _status(response):
+    # requests responses have status_code, urllib3 responses status
+    return getattr(response, 'status_code', None) or getattr(response, 'status', None)
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class ProviderGuard:
+    """
+    Rate limiting, retries and a circuit breaker around one provider's calls.
+
+    call(send) runs send() (one HTTP attempt returning a response) once a
+    token is free, queueing up to queue_timeout seconds. Connection errors,
+    timeouts and RETRY_STATUSES responses are retried up to retries times
+    with full-jitter exponential backoff, honouring Retry-After, and a 429
+    also slows the bucket down. A call that still fails with an error or a
+    5xx counts against the breaker. While the breaker is open, calls fail at
+    once with ProviderUnavailable instead of waiting out upstream timeouts.
+    """
+
+    def __init__(self, provider, rate_limit, burst, queue_timeout, retries, backoff, max_backoff,
+                 failure_threshold, reset_timeout):
+        self.provider = provider
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.queue_timeout = queue_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.counts = {'calls': 0, 'retries': 0, 'throttled': 0, 'failures': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _delay(self, attempt, retry_after):
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.backoff * 2 ** attempt, self.max_backoff))
+
+    def _reject(self, message, retry_after):
+        self._count('rejected')
+        raise ProviderUnavailable(f"{self.provider}: {message}", retry_after=retry_after)
+
+    def call(self, send):
+        if not self.breaker.allow():
+            retry_in = self.breaker.retry_in()
+            self._reject(f"circuit open after repeated failures, retrying in {retry_in:.1f}s", retry_in)
+        self._count('calls')
+
+        attempt = 0
+        while True:
+            if not self.bucket.acquire(self.queue_timeout):
+                self.breaker.release()
+                self._reject(f"rate limit queue full ({self.bucket.rate:.2f} requests/s)", self.queue_timeout)
+
+            response, error = None, None
+            try:
+                response = send()
+            except TRANSIENT_ERRORS as e:
+                error = e
+            except BaseException:
+                # Not the provider's fault (e.g. bad arguments); don't hold a half-open trial
+                self.breaker.release()
+                raise
+            else:
+                if _status(response) not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    self.bucket.recover()
+                    return response
+                if _status(response) == 429:
+                    self._count('throttled')
+                    self.bucket.throttle()
+
+            if attempt >= self.retries:
+                self._count('failures')
+                if _status(response) == 429:
+                    # A throttling provider is up: the limiter, not the breaker, deals with it
+                    self.breaker.release()
+                else:
+                    self.breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            self._count('retries')
+            time.sleep(self._delay(attempt, _retry_after(response) if response is not None else None))
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            'state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'opens': self.breaker.opens,
+            'rate_limit': round(self.bucket.rate, 3),
+            'max_rate_limit': self.bucket.max_rate,
+            'tokens': round(max(self.bucket.tokens, 0.0), 2),
+            'queued': self.bucket.waiting,
+            **counts,
+        }
+
+
+class GuardRegistry:
+    """One ProviderGuard per provider, built on first use from config(provider) (ProviderGuard keyword arguments)"""
+
+    def __init__(self, config):
+        self._config = config
+        self._lock = threading.Lock()
+        self._guards = {}
+
+    def get(self, provider):
+        guard = self._guards.get(provider)
+        if guard is None:
+            with self._lock:
+                guard = self._guards.get(provider)
+                if guard is None:
+                    guard = self._guards[provider] = ProviderGuard(provider, **self._config(provider))
+        return guard
+
+    def reset(self):
+        """Forget all limiter and breaker state (e.g. after changing settings)"""
+        with self._lock:
+            self._guards = {}
+
+    def stats(self):
+        with self._lock:
+            guards = dict(self._guards)
+        return {provider: guard.stats() for provider, guard in guards.items()}
+
+    def collect(self):
+        """Prometheus samples for instrumentation.metrics"""
+        stats = self.stats()
+        states = ('closed', 'half_open', 'open')
+        return [
+            ('options_calc_upstream_circuit_state', "Circuit breaker state per provider (1 for the current state)", 'gauge',
+             [({'provider': p, 'state': state}, int(s['state'] == state)) for p, s in stats.items() for state in states]),
+            ('options_calc_upstream_rate_limit', "Current adaptive request rate limit per provider (requests/s)", 'gauge',
+             [({'provider': p}, s['rate_limit']) for p, s in stats.items()]),
+            ('options_calc_upstream_queued', "Calls waiting for a rate limit token", 'gauge',
+             [({'provider': p}, s['queued']) for p, s in stats.items()]),
+            ('options_calc_upstream_guard_events_total', "Guarded upstream calls, retries, 429s, failures and local rejections", 'counter',
+             [({'provider': p, 'event': event}, s[event]) for p, s in stats.items()
+              for event in ('calls', 'retries', 'throttled', 'failures', 'rejected')]),
+        ]
@@ -0,0 +1,70 @@
+# put_calculator/serialization.py
+import json
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+# orjson is optional: several times faster than the stdlib json module for
+# both directions, and it serializes numpy arrays natively. Without it
+# everything falls back to json.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_drf_encoder = encoders.JSONEncoder()
+
+if orjson is not None:
+    BACKEND = 'orjson'
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(data):
+        # DRF's encoder covers Decimal, lazy strings, querysets and the like
+        return orjson.dumps(data, default=_drf_encoder.default, option=_ORJSON_OPTIONS)
+
+    def dumps(data):
+        return dumps_bytes(data).decode()
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    BACKEND = 'json'
+
+    def dumps_bytes(data):
+        return dumps(data).encode()
+
+    def dumps(data):
+        return json.dumps(data, cls=encoders.JSONEncoder, separators=(',', ':'))
+
+    def loads(data):
+        return json.loads(data)
+
+
+def json_response(data, status=200):
+    """JsonResponse equivalent that goes through the fast codec"""
+    return HttpResponse(dumps_bytes(data), content_type='application/json', status=status)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that uses orjson when available (pretty-printed output still uses json)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps_bytes(data)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that uses orjson when available"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
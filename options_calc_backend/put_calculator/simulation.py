@@ -0,0 +1,150 @@
+# put_calculator/simulation.py
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+from django.conf import settings
+
+# Paths simulated per chunk: one chunk is one unit of work for a pool worker,
+# and memory per chunk stays at a few arrays of this length whatever the
+# step count
+CHUNK_PATHS = 100_000
+
+
+def _simulate_chunk(seed, paths, stock_price, strike_price, option_premium, years, volatility, drift, steps):
+    """
+    Simulate paths GBM price paths for one short put and return the sums
+    the caller combines: [paths, profitable, assigned, touched, pnl, pnl^2]
+    with P&L per share.
+    """
+    rng = np.random.default_rng(seed)
+    dt = years / steps
+    step_drift = (drift - 0.5 * volatility ** 2) * dt
+    step_vol = volatility * math.sqrt(dt)
+
+    if steps == 1:
+        log_return = step_drift + step_vol * rng.standard_normal(paths)
+        touched = 0
+    else:
+        # Walk the steps keeping only the running log price and its minimum
+        log_return = np.zeros(paths)
+        lowest = np.zeros(paths)
+        touch_level = math.log(strike_price / stock_price)
+        for _ in range(steps):
+            log_return += step_drift + step_vol * rng.standard_normal(paths)
+            np.minimum(lowest, log_return, out=lowest)
+        touched = int(np.count_nonzero(lowest <= touch_level))
+
+    final_price = stock_price * np.exp(log_return)
+    pnl = option_premium - np.maximum(strike_price - final_price, 0.0)
+    return np.array([
+        paths,
+        np.count_nonzero(pnl > 0),
+        np.count_nonzero(final_price < strike_price),
+        touched,
+        pnl.sum(),
+        np.square(pnl).sum(),
+    ], dtype=np.float64)
+
+
+def chunk_seeds(seed, paths):
+    """(child seed, path count) per chunk; the same seed and paths always give the same chunks"""
+    counts = [CHUNK_PATHS] * (paths // CHUNK_PATHS)
+    if paths % CHUNK_PATHS:
+        counts.append(paths % CHUNK_PATHS)
+    return list(zip(np.random.SeedSequence(seed).spawn(len(counts)), counts))
+
+
+def simulate_short_put(stock_price, strike_price, option_premium, years, volatility, drift=0.0,
+                       paths=100_000, seed=0, steps=1, number_of_contracts=1, time_budget=None, executor=None):
+    """
+    Monte Carlo outcome of selling a put, from geometric Brownian motion
+    paths of the underlying.
+
+    Paths are split into CHUNK_PATHS chunks, each seeded from
+    SeedSequence(seed), so results depend only on seed and paths, not on how
+    chunks are scheduled. With an executor the chunks run in parallel on it.
+    With a time_budget (seconds) no new chunks start once it is spent, and
+    the result covers the chunks that finished. steps > 1 simulates whole
+    paths and adds the probability of the price touching the strike before
+    expiration.
+    """
+    deadline = time.monotonic() + time_budget if time_budget else None
+    args = (stock_price, strike_price, option_premium, years, volatility, drift, steps)
+    chunks = chunk_seeds(seed, paths)
+    totals = np.zeros(6)
+    start = time.perf_counter()
+
+    if executor is None:
+        for chunk_seed, count in chunks:
+            if deadline is not None and time.monotonic() >= deadline and totals[0]:
+                break
+            totals += _simulate_chunk(chunk_seed, count, *args)
+    else:
+        # Keep at most two chunks per worker queued so an expired budget stops quickly
+        queue = iter(chunks)
+        window = 2 * getattr(executor, '_max_workers', os.cpu_count() or 1)
+        pending = {executor.submit(_simulate_chunk, chunk_seed, count, *args)
+                   for chunk_seed, count in _take(queue, window)}
+        while pending:
+            # Past the deadline with nothing finished: block for the first
+            # chunk rather than polling wait() with a zero timeout
+            remaining = None if deadline is None else deadline - time.monotonic()
+            timeout = remaining if remaining is not None and remaining > 0 else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                totals += future.result()
+            if deadline is not None and time.monotonic() >= deadline and totals[0]:
+                for future in pending:
+                    future.cancel()
+                break
+            pending |= {executor.submit(_simulate_chunk, chunk_seed, count, *args)
+                        for chunk_seed, count in _take(queue, len(done))}
+
+    simulated, profitable, assigned, touched, pnl_sum, pnl_squares = totals
+    mean = pnl_sum / simulated
+    variance = max(pnl_squares / simulated - mean ** 2, 0.0)
+    multiplier = 100 * number_of_contracts
+    result = {
+        'paths': int(simulated),
+        'requested_paths': paths,
+        'budget_exhausted': int(simulated) < paths,
+        'probability_of_profit': round(profitable / simulated, 4),
+        'probability_of_assignment': round(assigned / simulated, 4),
+        'expected_pnl': round(mean * multiplier, 2),
+        'expected_pnl_std_error': round(math.sqrt(variance / simulated) * multiplier, 2),
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+    if steps > 1:
+        result['probability_of_touch'] = round(touched / simulated, 4)
+    return result
+
+
+def _take(iterator, n):
+    return [item for _, item in zip(range(n), iterator)]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_context():
+    """
+    Start method for simulation workers: forkserver where available (else
+    spawn). Forking the server itself would copy its threads' held locks and
+    open sockets into every worker.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def simulation_pool():
+    """Process pool shared by simulation requests (SIMULATION_WORKERS processes), created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.SIMULATION_WORKERS, mp_context=pool_context())
+        return _pool
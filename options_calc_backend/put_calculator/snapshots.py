@@ -0,0 +1,259 @@
+# put_calculator/snapshots.py
+import io
+import logging
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+from .chain_index import ChainIndex, OptionQuotes
+from .models import ChainSnapshot, QuoteSnapshot, TickBatch
+
+logger = logging.getLogger(__name__)
+
+
+def pack(**columns):
+    """Named, equal-length arrays as one compressed .npz blob"""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **columns)
+    return buffer.getvalue()
+
+
+def unpack(blob):
+    """{name: array} from a pack() blob"""
+    with np.load(io.BytesIO(bytes(blob)), allow_pickle=False) as columns:
+        return {name: columns[name] for name in columns.files}
+
+
+def _latest(model, underlying, max_age):
+    """Newest snapshot row for underlying no older than max_age seconds (None for any age), or None"""
+    snapshots = model.objects.filter(underlying=underlying.upper())
+    if max_age is not None:
+        snapshots = snapshots.filter(fetched_at__gte=timezone.now() - timedelta(seconds=max_age))
+    return snapshots.order_by('-fetched_at').first()
+
+
+def retention_cutoff():
+    """Rows older than this are pruned; None when SNAPSHOT_RETENTION is 0 (keep everything)"""
+    if not settings.SNAPSHOT_RETENTION:
+        return None
+    return timezone.now() - timedelta(seconds=settings.SNAPSHOT_RETENTION)
+
+
+def _prune(model, underlying):
+    # After a save, so the underlying's newest row (the stale fallback) is never pruned
+    cutoff = retention_cutoff()
+    if cutoff is not None:
+        model.objects.filter(underlying=underlying.upper(), fetched_at__lt=cutoff).delete()
+
+
+def save_chain(underlying, chain):
+    """Store a put chain (ChainIndex), pruning the underlying's chains older than SNAPSHOT_RETENTION"""
+    snapshot = ChainSnapshot.objects.create(
+        underlying=underlying.upper(),
+        contract_count=len(chain),
+        data=pack(
+            symbol=chain.symbol,
+            strike_price=chain.strike_price,
+            expiration_date=chain.expiration.astype('datetime64[D]'),
+            close_price=chain.close_price,
+        ),
+    )
+    _prune(ChainSnapshot, underlying)
+    return snapshot
+
+
+def chain_from_snapshot(snapshot):
+    columns = unpack(snapshot.data)
+    return ChainIndex.from_columns(
+        columns['symbol'], columns['strike_price'], columns['expiration_date'], columns['close_price'],
+        fetched_at=snapshot.fetched_at,
+    )
+
+
+def latest_chain(underlying, max_age=None):
+    """The newest stored put chain as a ChainIndex, or None"""
+    snapshot = _latest(ChainSnapshot, underlying, max_age)
+    return chain_from_snapshot(snapshot) if snapshot is not None else None
+
+
+def save_quotes(underlying, quotes):
+    """Store option quotes (OptionQuotes), pruning the underlying's quotes older than SNAPSHOT_RETENTION"""
+    snapshot = QuoteSnapshot.objects.create(
+        underlying=underlying.upper(),
+        contract_count=len(quotes),
+        data=pack(symbol=quotes.symbol, bid_price=quotes.bid_price, ask_price=quotes.ask_price),
+    )
+    _prune(QuoteSnapshot, underlying)
+    return snapshot
+
+
+def quotes_from_snapshot(snapshot):
+    columns = unpack(snapshot.data)
+    return OptionQuotes(columns['symbol'], columns['bid_price'], columns['ask_price'])
+
+
+def latest_quotes(underlying, max_age=None):
+    """The newest stored option quotes as OptionQuotes, or None"""
+    snapshot = _latest(QuoteSnapshot, underlying, max_age)
+    return quotes_from_snapshot(snapshot) if snapshot is not None else None
+
+
+# (latest, underlying) pairs this process has already loaded once
+_warmed = set()
+_warmed_lock = threading.Lock()
+
+
+def _cold(latest, underlying):
+    """True the first time this process loads underlying through latest"""
+    key = (latest, underlying.upper())
+    with _warmed_lock:
+        if key in _warmed:
+            return False
+        _warmed.add(key)
+        return True
+
+
+def warm_or_fetch(underlying, latest, fetch, save, max_age):
+    """
+    fetch() and save the result. Only a cold start (this process's first
+    load of underlying, e.g. right after a restart) is served from
+    latest(underlying, max_age) when the store has it, so the store never
+    stretches how fresh a cache refill is. If the fetch fails (e.g. the
+    provider's circuit is open) the newest stored copy of any age is served
+    instead, when there is one. Store errors (e.g. migrations not applied)
+    are logged and skipped so requests still work without the store.
+    """
+    if _cold(latest, underlying):
+        try:
+            stored = latest(underlying, max_age)
+            if stored is not None:
+                return stored
+        except DatabaseError as e:
+            logger.warning("Snapshot store read failed for %s: %s", underlying, e)
+
+    try:
+        fetched = fetch(underlying)
+    except Exception as e:
+        try:
+            stale = latest(underlying, None)
+        except DatabaseError:
+            stale = None
+        if stale is None:
+            raise
+        logger.warning("Fetching %s failed, serving the last stored snapshot: %s", underlying, e)
+        return stale
+    try:
+        save(underlying, fetched)
+    except DatabaseError as e:
+        logger.warning("Snapshot store write failed for %s: %s", underlying, e)
+    return fetched
+
+
+# Buffered ticks keep only the stored fields, not the whole parsed message
+TradeTick = namedtuple('TradeTick', ['timestamp', 'price', 'size'])
+QuoteTick = namedtuple('QuoteTick', ['timestamp', 'bid_price', 'bid_size', 'ask_price', 'ask_size'])
+
+# Stream message type -> (stored kind, record, message keys of its fields after the timestamp)
+TICK_FIELDS = {
+    't': ('trade', TradeTick, ('p', 's')),
+    'q': ('quote', QuoteTick, ('bp', 'bs', 'ap', 'as')),
+}
+
+
+def _parse_timestamp(timestamp):
+    # RFC 3339 with nanoseconds; numpy wants it without the trailing Z
+    try:
+        return np.datetime64(timestamp.rstrip('Z'), 'ns')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def _to_datetime(timestamp):
+    return datetime.fromtimestamp(int(timestamp.astype(np.int64)) / 1e9, dt_timezone.utc)
+
+
+class TickRecorder:
+    """
+    Buffers streamed trades and quotes and writes them as one TickBatch per
+    symbol and kind on flush(), which also prunes those symbols' batches
+    older than SNAPSHOT_RETENTION. append() is cheap enough to call for every
+    upstream message; flush() does the database work and belongs off the
+    event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers = defaultdict(list)
+
+    def append(self, item):
+        message_type = item.get('T')
+        if message_type in TICK_FIELDS and item.get('S') and item.get('t'):
+            _, record, keys = TICK_FIELDS[message_type]
+            tick = record(item['t'], *(item.get(key, np.nan) for key in keys))
+            with self._lock:
+                self._buffers[(item['S'], message_type)].append(tick)
+
+    def pending(self):
+        with self._lock:
+            return sum(len(items) for items in self._buffers.values())
+
+    def flush(self):
+        """Write everything buffered; returns the number of ticks written"""
+        with self._lock:
+            buffers, self._buffers = self._buffers, defaultdict(list)
+
+        batches = []
+        for (symbol, message_type), ticks in buffers.items():
+            kind, record, _ = TICK_FIELDS[message_type]
+            timestamps = np.array([_parse_timestamp(tick.timestamp) for tick in ticks], dtype='datetime64[ns]')
+            valid = ~np.isnat(timestamps)
+            if not valid.all():
+                logger.warning("Dropping %d %s %s ticks with unparseable timestamps", (~valid).sum(), symbol, kind)
+                ticks = [tick for tick, ok in zip(ticks, valid) if ok]
+                timestamps = timestamps[valid]
+            if not ticks:
+                continue
+            columns = {name: np.array(values, dtype=np.float64)
+                       for name, values in zip(record._fields[1:], list(zip(*ticks))[1:])}
+            batches.append(TickBatch(
+                symbol=symbol, kind=kind, count=len(ticks),
+                first_at=_to_datetime(timestamps.min()), last_at=_to_datetime(timestamps.max()),
+                data=pack(timestamp=timestamps, **columns),
+            ))
+
+        if batches:
+            TickBatch.objects.bulk_create(batches)
+            cutoff = retention_cutoff()
+            if cutoff is not None:
+                for batch in batches:
+                    TickBatch.objects.filter(
+                        symbol=batch.symbol, kind=batch.kind, first_at__lt=cutoff, last_at__lt=cutoff
+                    ).delete()
+        return sum(batch.count for batch in batches)
+
+
+def load_ticks(symbol, kind, start=None, end=None):
+    """Stored ticks for symbol ('trade' or 'quote') as {column: array}, in time order"""
+    batches = TickBatch.objects.filter(symbol=symbol.upper(), kind=kind)
+    if start is not None:
+        batches = batches.filter(last_at__gte=start)
+    if end is not None:
+        batches = batches.filter(first_at__lte=end)
+
+    parts = [unpack(batch.data) for batch in batches.order_by('first_at')]
+    if not parts:
+        return {}
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    order = np.argsort(columns['timestamp'], kind='stable')
+    mask = np.ones(len(order), dtype=bool)
+    if start is not None:
+        mask &= columns['timestamp'][order] >= np.datetime64(start.astimezone(dt_timezone.utc).replace(tzinfo=None), 'ns')
+    if end is not None:
+        mask &= columns['timestamp'][order] <= np.datetime64(end.astimezone(dt_timezone.utc).replace(tzinfo=None), 'ns')
+    return {name: values[order][mask] for name, values in columns.items()}
+
+
+tick_recorder = TickRecorder()
@@ -0,0 +1,264 @@
+# put_calculator/stream_hub.py
+import asyncio
+import logging
+from collections import defaultdict
+import websockets
+from django.conf import settings
+from .serialization import dumps, loads
+from .snapshots import tick_recorder
+
+logger = logging.getLogger(__name__)
+
+# Seconds allowed for opening and authenticating the upstream socket; an
+# upstream going down mid-handshake would otherwise stall reconnects forever
+CONNECT_TIMEOUT = 10
+
+
+class Subscription:
+    """
+    One consumer's view of a symbol's upstream messages.
+
+    Messages wait in a bounded queue. When a client falls behind the oldest
+    message is dropped (and counted) rather than blocking the hub, so one
+    slow browser can't stall everyone else.
+    """
+
+    def __init__(self, symbol, max_queue):
+        self.symbol = symbol
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def get_nowait(self):
+        return self.queue.get_nowait()
+
+
+class StreamHub:
+    """
+    A single authenticated Alpaca market data socket shared by every
+    OptionPriceConsumer in the process.
+
+    Symbols are subscribed upstream when their first consumer arrives and
+    unsubscribed when the last one leaves. Each upstream frame is parsed once
+    and fanned out to the matching subscriptions. The connection is opened
+    lazily, re-established (with every live symbol re-subscribed) if it drops,
+    and closed once nobody is subscribed. While connected, trades and quotes
+    are also appended to the snapshot store (SNAPSHOT_RECORD_TICKS).
+    """
+
+    def __init__(self, url=None, max_queue=None):
+        self._url = url
+        self._max_queue = max_queue
+        self._subscribers = defaultdict(set)
+        self._ws = None
+        self._reader = None
+        self._recorder = None
+        self._loop = None
+        self._lock = None
+
+    @property
+    def url(self):
+        return self._url or settings.ALPACA_STOCK_WS_URL
+
+    @property
+    def max_queue(self):
+        return self._max_queue or settings.STREAM_CLIENT_QUEUE_SIZE
+
+    def _bind_loop(self):
+        # State belongs to one event loop; a new loop (e.g. a new test) starts fresh
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._subscribers = defaultdict(set)
+            self._ws = None
+            self._reader = None
+            self._recorder = None
+
+    async def subscribe(self, symbol):
+        self._bind_loop()
+        subscription = Subscription(symbol, self.max_queue)
+        async with self._lock:
+            await self._ensure_connected()
+            if not self._subscribers[symbol]:
+                await self._send_subscription("subscribe", [symbol])
+            self._subscribers[symbol].add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription):
+        self._bind_loop()
+        async with self._lock:
+            subscribers = self._subscribers.get(subscription.symbol)
+            if not subscribers or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.symbol]
+                await self._send_subscription("unsubscribe", [subscription.symbol])
+            if not self._subscribers:
+                await self._close()
+
+    def stats(self):
+        return {
+            "connected": self._ws is not None,
+            "symbols": {symbol: len(subscribers) for symbol, subscribers in self._subscribers.items()},
+            "dropped": sum(s.dropped for subscribers in self._subscribers.values() for s in subscribers),
+        }
+
+    async def _ensure_connected(self):
+        # Caller holds self._lock. A live reader is either connected or
+        # reconnecting; a reconnect subscribes every symbol it finds.
+        if self._reader is not None:
+            return
+        self._ws = await self._connect()
+        self._reader = asyncio.create_task(self._read_forever())
+        if settings.SNAPSHOT_RECORD_TICKS and self._recorder is None:
+            self._recorder = asyncio.create_task(self._record_forever())
+
+    async def _connect(self):
+        async with asyncio.timeout(CONNECT_TIMEOUT):
+            return await self._open()
+
+    async def _open(self):
+        ws = await websockets.connect(
+            self.url,
+            extra_headers={
+                "APCA-API-KEY-ID": settings.ALPACA_API_KEY,
+                "APCA-API-SECRET-KEY": settings.ALPACA_SECRET_KEY
+            },
+            open_timeout=CONNECT_TIMEOUT,
+            close_timeout=CONNECT_TIMEOUT,
+            ping_interval=20,
+            ping_timeout=30,
+            max_queue=1024
+        )
+        try:
+            await ws.send(dumps({
+                "action": "auth",
+                "key": settings.ALPACA_API_KEY,
+                "secret": settings.ALPACA_SECRET_KEY
+            }))
+            # Alpaca sends "connected" first, then "authenticated" or an error
+            while True:
+                for item in _as_list(loads(await ws.recv())):
+                    if item.get('T') == 'error':
+                        raise ConnectionError(f"Authentication failed: {item.get('msg')}")
+                    if item.get('T') == 'success' and item.get('msg') == 'authenticated':
+                        return ws
+        except BaseException:
+            await ws.close()
+            raise
+
+    async def _send_subscription(self, action, symbols):
+        if self._ws is None:
+            return
+        await self._ws.send(dumps({"action": action, "trades": symbols, "quotes": symbols}))
+
+    async def _close(self):
+        # Caller holds self._lock
+        ws, reader, recorder = self._ws, self._reader, self._recorder
+        self._ws = self._reader = self._recorder = None
+        if reader is not None and reader is not asyncio.current_task():
+            reader.cancel()
+        if recorder is not None:
+            recorder.cancel()
+            await self._flush_ticks()
+        if ws is not None:
+            await ws.close()
+
+    async def _read_forever(self):
+        delay = 1
+        while True:
+            ws = self._ws
+            if ws is None:
+                return
+            try:
+                async for message in ws:
+                    self._dispatch(message)
+                    delay = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Upstream stream error: %s", e)
+
+            async with self._lock:
+                if self._ws is not ws:
+                    return
+                self._ws = None
+            delay = await self._reconnect(delay)
+            if delay is None:
+                return
+
+    async def _reconnect(self, delay):
+        """
+        Reconnect and resubscribe while anyone is listening, backing off
+        from delay seconds. Returns the next backoff delay, or None once
+        nobody is listening. The lock is only held to check and swap
+        state, never while connecting or sleeping, so consumers can still
+        subscribe and unsubscribe (and _close() can cancel this) meanwhile.
+        """
+        while True:
+            async with self._lock:
+                if not self._subscribers:
+                    if self._reader is asyncio.current_task():
+                        self._reader = None
+                    return None
+            ws = None
+            try:
+                ws = await self._connect()
+                async with self._lock:
+                    if self._subscribers:
+                        self._ws = ws
+                        await self._send_subscription("subscribe", list(self._subscribers))
+                        return delay
+                await ws.close()
+                continue
+            except Exception as e:
+                if ws is not None:
+                    # Connected but the resubscribe failed
+                    if self._ws is ws:
+                        self._ws = None
+                    await ws.close()
+                logger.warning("Upstream reconnect failed, retrying in %ss: %s", delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def _record_forever(self):
+        while True:
+            await asyncio.sleep(settings.SNAPSHOT_TICK_FLUSH_INTERVAL)
+            await self._flush_ticks()
+
+    async def _flush_ticks(self):
+        try:
+            await asyncio.to_thread(tick_recorder.flush)
+        except Exception as e:
+            logger.warning("Writing streamed ticks to the snapshot store failed: %s", e)
+
+    def _dispatch(self, message):
+        try:
+            items = _as_list(loads(message))
+        except ValueError:
+            return
+        recording = self._recorder is not None
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if recording:
+                tick_recorder.append(item)
+            for subscription in self._subscribers.get(item.get('S'), ()):
+                subscription.put(item)
+
+
+def _as_list(data):
+    return data if isinstance(data, list) else [data]
+
+
+stream_hub = StreamHub()
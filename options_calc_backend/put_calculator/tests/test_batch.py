@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+
+class PutMetricsBatchTests(SimpleTestCase):
+    def post(self, **data):
+        expiration = (date.today() + timedelta(days=30)).isoformat()
+        body = {'stock_price': 100, 'strike_prices': [95, 90], 'option_premiums': [1.5, 0.8],
+                'expiration_dates': [expiration, expiration], **data}
+        return self.client.post(reverse('calculate_put_metrics_batch'), body, content_type='application/json')
+
+    def test_valid_rows(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_null_elements_are_rejected_by_index(self):
+        for data, message in (
+            ({'strike_prices': [95, None]}, "strike_prices[1] must be a number."),
+            ({'option_premiums': ['abc', 0.8]}, "option_premiums[0] must be a number."),
+            ({'expiration_dates': ['2099-01-01', None]}, "expiration_dates[1] must be a YYYY-MM-DD date."),
+            ({'volatility': [0.2, None]}, "volatility[1] must be a number."),
+            ({'volatility': None, 'grid': True, 'option_premiums': [[1.5, 1.5], [0.8, None]]},
+             "option_premiums[1][1] must be a number."),
+        ):
+            with self.subTest(data=data):
+                response = self.post(**data)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['error'], message)
+
+
+class SingleMatchesBatchTests(SimpleTestCase):
+    CONTRACTS = [(95, 1.5, 30), (102.5, 4.25, 1), (90, 0.37, 200), (97, 2.1, 0)]
+
+    def compare(self, single_url, batch_url, **extra):
+        expirations = [(date.today() + timedelta(days=days)).isoformat() for _, _, days in self.CONTRACTS]
+        batch = self.client.post(reverse(batch_url), {
+            'stock_price': 99.3, 'strike_prices': [strike for strike, _, _ in self.CONTRACTS],
+            'option_premiums': [premium for _, premium, _ in self.CONTRACTS], 'expiration_dates': expirations,
+            'number_of_contracts': 3, 'volatility': 0.28, **extra,
+        }, content_type='application/json')
+        self.assertEqual(batch.status_code, 200)
+        columns = batch.json()['results']
+
+        for row, ((strike, premium, _), expiration) in enumerate(zip(self.CONTRACTS, expirations)):
+            single = self.client.post(reverse(single_url), {
+                'ticker_symbol': 'AAPL', 'stock_price': 99.3, 'strike_price': strike, 'option_premium': premium,
+                'expiration_date_str': expiration, 'number_of_contracts': 3, 'volatility': 0.28, **extra,
+            }, content_type='application/json')
+            self.assertEqual(single.status_code, 200)
+            single = single.json()
+            for name, values in columns.items():
+                with self.subTest(row=row, column=name):
+                    self.assertEqual(single[name], values[row])
+
+    def test_put(self):
+        self.compare('calculate_put_metrics', 'calculate_put_metrics_batch')
+
+    def test_covered_call(self):
+        self.compare('calculate_covered_call_metrics', 'calculate_covered_call_metrics_batch', cost_basis=96.4)
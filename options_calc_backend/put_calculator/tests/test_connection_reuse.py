@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import requests
+from django.test import SimpleTestCase, override_settings
+from ..fakes import FakeProvider
+from ..providers import PooledSession, ProviderRegistry, guards
+
+GUARD = {'rate_limit': 1000, 'burst': 100, 'retries': 0}
+
+
+@override_settings(UPSTREAM_PROVIDERS={'fake': GUARD})
+class ConnectionReuseTests(SimpleTestCase):
+    def setUp(self):
+        guards.reset()
+        self.addCleanup(guards.reset)
+        self.upstream = FakeProvider().start()
+        self.addCleanup(self.upstream.stop)
+
+    def test_registry_close_releases_the_connection(self):
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+        session = registry.session('fake')
+        session.get(self.upstream.url)
+        registry.session('fake').get(self.upstream.url)
+        self.assertEqual(len(self.upstream.clients), 1)
+
+        registry.close()
+        self.assertEqual(len(session.get_adapter(self.upstream.url).poolmanager.pools), 0)
+        # The next call builds a new session on a new connection
+        self.assertIsNot(registry.session('fake'), session)
+        registry.session('fake').get(self.upstream.url)
+        self.assertEqual(len(self.upstream.clients), 2)
+
+    def test_pooled_session_reuses_one_connection(self):
+        session = PooledSession('fake', pool_size=4, connect_timeout=2, read_timeout=2)
+        self.addCleanup(session.close)
+        for _ in range(20):
+            self.assertEqual(session.get(self.upstream.url).status_code, 200)
+        self.assertEqual(self.upstream.requests, 20)
+        self.assertEqual(len(self.upstream.clients), 1)
+
+    def test_concurrent_calls_stay_within_the_pool(self):
+        session = PooledSession('fake', pool_size=2, connect_timeout=2, read_timeout=2)
+        self.addCleanup(session.close)
+        self.upstream.latency = 0.02
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            statuses = list(executor.map(lambda _: session.get(self.upstream.url).status_code, range(20)))
+        self.assertEqual(statuses, [200] * 20)
+        self.assertLessEqual(len(self.upstream.clients), 2)
+
+    def test_registry_shares_one_session_per_provider(self):
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+        self.assertIs(registry.session('fake'), registry.session('fake'))
+        for _ in range(5):
+            registry.session('fake').get(self.upstream.url)
+        self.assertEqual(len(self.upstream.clients), 1)
+
+    def test_finnhub_calls_use_the_configured_timeouts(self):
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+        timeouts = []
+        request = requests.Session.request
+
+        def spy(session, method, url, **kwargs):
+            timeouts.append(kwargs['timeout'])
+            return request(session, method, url, **kwargs)
+
+        with override_settings(UPSTREAM_PROVIDERS={'finnhub': dict(GUARD, connect_timeout=1.5, read_timeout=4)}):
+            client = registry.finnhub()
+        client.API_URL = self.upstream.url
+        with mock.patch.object(requests.Session, 'request', spy):
+            client.quote('AAPL')
+        self.assertEqual(timeouts, [(1.5, 4)])
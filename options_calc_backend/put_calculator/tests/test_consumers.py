@@ -0,0 +1,60 @@
+import asyncio
+from unittest import mock
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, override_settings
+from ..fakes import ReplayServer
+from ..routing import websocket_urlpatterns
+from ..serialization import loads
+from ..stream_hub import StreamHub
+
+FRAMES = [
+    [{"T": "t", "S": "AAPL", "p": 190.1, "s": 100, "t": ""},
+     {"T": "q", "S": "AAPL", "bp": 190.0, "bs": 1, "ap": 190.2, "as": 2, "t": ""}],
+    [{"T": "q", "S": "AAPL", "bp": 190.1, "bs": 3, "ap": 190.3, "as": 1, "t": ""},
+     {"T": "t", "S": "AAPL", "p": 190.3, "s": 5, "t": ""}],
+    [{"T": "q", "S": "AAPL", "bp": 190.2, "bs": 4, "ap": 190.4, "as": 6, "t": ""}],
+]
+
+
+@override_settings(SNAPSHOT_RECORD_TICKS=False)
+class MarketDataBatchingTests(SimpleTestCase):
+    def stream(self, replay_rate=None):
+        """Every batch frame an AAPL client gets while the frames replay, up to the end-of-replay trade"""
+        async def scenario():
+            async with ReplayServer(FRAMES) as server:
+                with mock.patch('put_calculator.consumers.stream_hub', StreamHub(url=server.url, max_queue=100)):
+                    communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/ws/options/AAPL/')
+                    connected, _ = await communicator.connect()
+                    self.assertTrue(connected)
+                    statuses = [loads(await communicator.receive_from(5))['status'] for _ in range(2)]
+                    self.assertEqual(statuses, ['connecting', 'connected'])
+
+                    await server.wait_for_subscribers(['AAPL'])
+                    await server.replay(rate=replay_rate)
+                    batches = []
+                    while not any(trade['price'] == 0 for batch in batches for trade in batch['trades']):
+                        batches.append(loads(await communicator.receive_from(5)))
+                    await communicator.disconnect()
+                    return batches
+        return asyncio.run(asyncio.wait_for(scenario(), 30))
+
+    @override_settings(STREAM_FLUSH_INTERVAL=0.5)
+    def test_trades_kept_and_quotes_conflated_within_a_flush(self):
+        batches = self.stream()
+        self.assertEqual(len(batches), 1)
+        batch = batches[0]
+        self.assertEqual(batch['event'], 'batch')
+        self.assertEqual([trade['price'] for trade in batch['trades']], [190.1, 190.3, 0.0])
+        self.assertEqual([(quote['bid_price'], quote['ask_size']) for quote in batch['quotes']], [(190.2, 6)])
+        self.assertEqual(batch['conflated_quotes'], 2)
+
+    @override_settings(STREAM_FLUSH_INTERVAL=0.05)
+    def test_frames_further_apart_than_the_flush_go_out_separately(self):
+        batches = self.stream(replay_rate=4)
+        self.assertGreaterEqual(len(batches), 3)
+        trades = [trade['price'] for batch in batches for trade in batch['trades']]
+        self.assertEqual(trades, [190.1, 190.3, 0.0])
+        # Nothing is conflated across flushes: every quote arrives
+        self.assertEqual(sum(len(batch['quotes']) + batch['conflated_quotes'] for batch in batches), 3)
+        self.assertEqual(sum(batch['conflated_quotes'] for batch in batches), 0)
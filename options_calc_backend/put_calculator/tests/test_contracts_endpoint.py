@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+from unittest import mock
+from django.test import SimpleTestCase
+from django.urls import reverse
+from ..chain_cache import chain_cache
+from ..chain_index import ChainIndex
+from ..chains import OptionContract
+
+SYMBOL = 'TEST'
+
+
+def put_chain(close_price=1.0):
+    expirations = [(date.today() + timedelta(days=1 + 7 * i)).isoformat() for i in range(10)]
+    return ChainIndex([
+        OptionContract(symbol=f"TEST{expiration}P{strike}", type='put', strike_price=float(strike),
+                       expiration_date=expiration, close_price=close_price)
+        for expiration in expirations for strike in range(50, 151)
+    ])
+
+
+class ContractsEtagTests(SimpleTestCase):
+    def setUp(self):
+        chain_cache.delete(SYMBOL)
+        self.addCleanup(chain_cache.delete, SYMBOL)
+
+    def get(self, price, chain, **params):
+        with mock.patch('put_calculator.async_views.alpaca_price', return_value=price), \
+                mock.patch('put_calculator.async_views.load_put_chain_index', return_value=chain):
+            chain_cache.delete(SYMBOL)
+            response = self.client.get(reverse('get_option_contracts_alpaca'), {'underlying_symbols': SYMBOL, **params})
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_etag_follows_the_window_not_the_price(self):
+        chain = put_chain()
+        self.assertEqual(self.get(100.0, chain), self.get(100.2, chain))
+        self.assertNotEqual(self.get(100.0, chain), self.get(110.0, chain))
+
+    def test_etag_follows_the_iv_inputs(self):
+        chain = put_chain()
+        self.assertNotEqual(self.get(100.0, chain, include_iv='true'), self.get(100.2, chain, include_iv='true'))
+        self.assertNotEqual(self.get(100.0, chain, include_iv='true'), self.get(100.0, put_chain(2.0), include_iv='true'))
@@ -0,0 +1,164 @@
+# put_calculator/tests/test_live_metrics.py
+import asyncio
+from datetime import date, timedelta
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from ..consumers import OptionPriceConsumer
+from ..live_metrics import LiveMetrics
+from ..positions import PositionError
+from ..serialization import dumps, loads
+from ..stream_hub import Subscription
+
+
+class FakeHub:
+    """stream_hub stand-in whose subscribe() waits until released"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.subscribing = asyncio.Event()
+        self.subscribed = []
+        self.unsubscribed = []
+
+    async def subscribe(self, symbol):
+        self.subscribing.set()
+        await self.release.wait()
+        subscription = Subscription(symbol, 100)
+        self.subscribed.append(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription):
+        self.unsubscribed.append(subscription)
+
+
+class UnreachableHub(FakeHub):
+    """stream_hub stand-in whose subscribe() fails until release is set"""
+
+    async def subscribe(self, symbol):
+        if not self.release.is_set():
+            raise ConnectionError("Connection refused")
+        return await super().subscribe(symbol)
+
+
+class Client:
+    def __init__(self):
+        self.frames = []
+
+    async def send_metrics(self, frame):
+        self.frames.append(frame)
+
+
+def _position(position_id, strike_price=95):
+    expiration = (date.today() + timedelta(days=30)).isoformat()
+    return {'id': position_id, 'strike_price': strike_price, 'option_premium': 1.5, 'expiration_date_str': expiration}
+
+
+@override_settings(LIVE_METRICS_INTERVAL=0, LIVE_METRICS_MAX_POSITIONS=2)
+@mock.patch('put_calculator.live_metrics.alpaca_price', return_value=None)
+class LiveMetricsTests(SimpleTestCase):
+    def run_scenario(self, scenario):
+        async def run():
+            hub = FakeHub()
+            with mock.patch('put_calculator.live_metrics.stream_hub', hub):
+                await asyncio.wait_for(scenario(hub, LiveMetrics()), 10)
+        asyncio.run(run())
+
+    def test_unregister_while_first_register_subscribes(self, _):
+        async def scenario(hub, live):
+            registering, leaving = Client(), Client()
+            register = asyncio.create_task(live.register(registering, 'AAPL', [_position('a')]))
+            await hub.subscribing.wait()
+
+            # Another client disconnects while the book is still subscribing
+            self.assertEqual(await live.unregister(leaving, 'AAPL'), [])
+            hub.release.set()
+            self.assertEqual(await register, ['a'])
+            self.assertEqual(live.stats(), {'AAPL': 1})
+
+            await live.unregister(registering, 'AAPL')
+            self.assertEqual(live.stats(), {})
+            self.assertEqual(hub.unsubscribed, hub.subscribed)
+        self.run_scenario(scenario)
+
+    def test_concurrent_registers_share_one_subscription(self, _):
+        async def scenario(hub, live):
+            first, second = Client(), Client()
+            registers = [asyncio.create_task(live.register(first, 'AAPL', [_position('a')])),
+                         asyncio.create_task(live.register(second, 'AAPL', [_position('b')]))]
+            await hub.subscribing.wait()
+            hub.release.set()
+            await asyncio.gather(*registers)
+            self.assertEqual(len(hub.subscribed), 1)
+            self.assertEqual(live.stats(), {'AAPL': 2})
+
+            await live.unregister(first, 'AAPL')
+            self.assertEqual(hub.unsubscribed, [])
+            await live.unregister(second, 'AAPL')
+            self.assertEqual(hub.unsubscribed, hub.subscribed)
+        self.run_scenario(scenario)
+
+    def test_too_many_positions(self, _):
+        async def scenario(hub, live):
+            hub.release.set()
+            client = Client()
+            with self.assertRaises(PositionError):
+                await live.register(client, 'AAPL', [_position(i) for i in 'abc'])
+            self.assertEqual(hub.subscribed, [])
+
+            await live.register(client, 'AAPL', [_position('a'), _position('b')])
+            with self.assertRaises(PositionError):
+                await live.register(client, 'AAPL', [_position('c')])
+            self.assertEqual(live.stats(), {'AAPL': 2})
+            await live.unregister(client, 'AAPL')
+            self.assertEqual(hub.unsubscribed, hub.subscribed)
+        self.run_scenario(scenario)
+
+    def test_ticks_push_changed_metrics(self, _):
+        async def scenario(hub, live):
+            hub.release.set()
+            client = Client()
+            await live.register(client, 'AAPL', [_position('a')])
+            subscription = hub.subscribed[0]
+            subscription.put({'T': 't', 'S': 'AAPL', 'p': 100.0})
+            while not client.frames:
+                await asyncio.sleep(0.01)
+            frame = client.frames[0]
+            self.assertEqual((frame['event'], frame['stock_price']), ('metrics', 100.0))
+            self.assertEqual(frame['positions']['a']['breakeven_price'], 93.5)
+
+            subscription.put({'T': 't', 'S': 'AAPL', 'p': 101.0})
+            while len(client.frames) < 2:
+                await asyncio.sleep(0.01)
+            # Only what the price moved: breakeven and days to expiration stay put
+            self.assertNotIn('breakeven_price', client.frames[1]['positions']['a'])
+            await live.unregister(client, 'AAPL')
+        self.run_scenario(scenario)
+
+
+    def test_consumer_reports_unreachable_upstream(self, _):
+        async def scenario(hub, live):
+            consumer = OptionPriceConsumer()
+            consumer.symbol = 'AAPL'
+            frames = []
+
+            async def send(text_data=None, bytes_data=None):
+                frames.append(loads(text_data))
+            consumer.send = send
+            register = dumps({'action': 'register', 'positions': [_position('a')]})
+
+            with mock.patch('put_calculator.consumers.live_metrics', live):
+                await consumer.receive(text_data=register)
+                self.assertEqual(frames[-1]['status'], 'error')
+                self.assertIn('Connection refused', frames[-1]['message'])
+                self.assertEqual(live.stats(), {})
+
+                # The socket stays usable: registering again works once upstream is back
+                hub.release.set()
+                await consumer.receive(text_data=register)
+                self.assertEqual(frames[-1], {'status': 'registered', 'positions': ['a']})
+                await live.unregister(consumer, 'AAPL')
+
+        async def run():
+            hub = UnreachableHub()
+            with mock.patch('put_calculator.live_metrics.stream_hub', hub):
+                await asyncio.wait_for(scenario(hub, LiveMetrics()), 10)
+        asyncio.run(run())
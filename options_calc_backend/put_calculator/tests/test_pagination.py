@@ -0,0 +1,65 @@
+import json
+import requests
+from django.test import SimpleTestCase, override_settings
+from ..chains import iter_contract_pages, iter_option_contracts, iter_snapshot_pages
+from ..fakes import FakeProvider
+
+
+def contract(i, contract_type='put'):
+    return {'symbol': f"SPY260116P{i:08d}", 'type': contract_type, 'strike_price': str(100 + i),
+            'expiration_date': '2026-01-16', 'close_price': '1.5' if i % 2 else None}
+
+
+class PagedChain:
+    """Answers the Alpaca contracts and snapshots endpoints page by page, recording each query"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.queries = []
+
+    def __call__(self, path, query):
+        self.queries.append((path, query))
+        index = int(query.get('page_token', ['0'])[0])
+        page = {'next_page_token': str(index + 1) if index + 1 < len(self.pages) else None}
+        if path.startswith('/v2/options/contracts'):
+            page['option_contracts'] = self.pages[index]
+        else:
+            page['snapshots'] = {c['symbol']: {'latestQuote': {'bp': 1.0, 'ap': 1.2}} for c in self.pages[index]}
+        return json.dumps(page).encode()
+
+
+class PaginationTests(SimpleTestCase):
+    def serve(self, pages):
+        chain = PagedChain(pages)
+        upstream = FakeProvider(body=chain).start()
+        self.addCleanup(upstream.stop)
+        settings = override_settings(ALPACA_BASE_URL=upstream.url, ALPACA_DATA_URL=upstream.url)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        session = requests.Session()
+        self.addCleanup(session.close)
+        return chain, session
+
+    def test_follows_next_page_token_to_the_end(self):
+        pages = [[contract(0), contract(1)], [contract(2), contract(3, 'call')], [contract(4)]]
+        chain, session = self.serve(pages)
+        self.assertEqual(list(iter_contract_pages('SPY', 'put', session=session, page_limit=2)), pages)
+        self.assertEqual([query.get('page_token') for _, query in chain.queries], [None, ['1'], ['2']])
+        self.assertTrue(all(query['limit'] == ['2'] and query['type'] == ['put'] for _, query in chain.queries))
+
+    def test_streams_typed_contracts_across_pages(self):
+        chain, session = self.serve([[contract(0), contract(1)], [contract(2, 'call'), contract(3)]])
+        contracts = list(iter_option_contracts('SPY', 'put', session=session))
+        self.assertEqual([c.strike_price for c in contracts], [100.0, 101.0, 103.0])
+        self.assertEqual(contracts[1].close_price, 1.5)
+
+    def test_single_page(self):
+        chain, session = self.serve([[contract(0)]])
+        self.assertEqual(len(list(iter_contract_pages('SPY', session=session))), 1)
+        self.assertEqual(len(chain.queries), 1)
+
+    def test_snapshot_pages(self):
+        chain, session = self.serve([[contract(0)], [contract(1)]])
+        pages = list(iter_snapshot_pages('SPY', 'put', session=session))
+        self.assertEqual([list(page) for page in pages], [[contract(0)['symbol']], [contract(1)['symbol']]])
+        self.assertEqual([path for path, _ in chain.queries], ['/v1beta1/options/snapshots/SPY'] * 2)
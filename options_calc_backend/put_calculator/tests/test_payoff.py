@@ -0,0 +1,67 @@
+import json
+from django.test import SimpleTestCase
+from ..payoff import default_price_range, payoff_profile
+from ..positions import PositionError, parse_legs
+
+
+class PayoffProfileTests(SimpleTestCase):
+    def profile(self, legs):
+        legs = parse_legs(legs)
+        price_min, price_max = default_price_range(legs)
+        return payoff_profile(legs, price_min, price_max, 101)
+
+    def test_short_put_max_loss_is_at_zero(self):
+        # The default range starts at 50, but the stock can fall to 0
+        result = self.profile([{'type': 'put', 'side': 'short', 'strike': 100, 'premium': 2}])
+        self.assertEqual(result['max_loss'], -9800)
+        self.assertEqual(result['max_profit'], 200)
+        self.assertEqual(result['breakevens'], [98])
+
+    def test_long_call_is_unbounded_above(self):
+        result = self.profile([{'type': 'call', 'side': 'long', 'strike': 100, 'premium': 3}])
+        self.assertIsNone(result['max_profit'])
+        self.assertEqual(result['max_loss'], -300)
+
+    def test_extremes_outside_the_plotted_range(self):
+        # Put spread plotted between the strikes still reports the full spread
+        legs = parse_legs([
+            {'type': 'put', 'side': 'long', 'strike': 100, 'premium': 5},
+            {'type': 'put', 'side': 'short', 'strike': 90, 'premium': 1},
+        ])
+        result = payoff_profile(legs, 92, 98, 11)
+        self.assertEqual(result['max_profit'], 600)
+        self.assertEqual(result['max_loss'], -400)
+
+    def test_rejects_bad_legs(self):
+        with self.assertRaises(PositionError):
+            parse_legs([{'type': 'put', 'strike': 'abc'}])
+
+
+class PayoffEndpointTests(SimpleTestCase):
+    url = '/api/options/payoff/'
+    position = {'legs': [{'type': 'put', 'side': 'short', 'strike': 100, 'premium': 2}], 'points': 50}
+
+    def post(self, body, **headers):
+        return self.client.post(self.url, json.dumps(body), content_type='application/json', headers=headers)
+
+    def test_repeat_with_etag_is_not_modified(self):
+        response = self.post(self.position)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['max_loss'], -9800)
+        self.assertEqual(self.post(self.position, if_none_match=response['ETag']).status_code, 304)
+        get = self.client.get(self.url, {'position': json.dumps(self.position)}, headers={'if-none-match': response['ETag']})
+        self.assertEqual(get.status_code, 304)
+
+    def test_etag_follows_the_default_point_count(self):
+        position = {'legs': self.position['legs']}
+        with self.settings(PAYOFF_DEFAULT_POINTS=50):
+            response = self.post(position)
+            self.assertEqual(response.json()['points_evaluated'], 50)
+        with self.settings(PAYOFF_DEFAULT_POINTS=80):
+            repeat = self.post(position, if_none_match=response['ETag'])
+            self.assertEqual(repeat.status_code, 200)
+            self.assertEqual(repeat.json()['points_evaluated'], 80)
+
+    def test_invalid_position_is_rejected(self):
+        self.assertEqual(self.post({'legs': []}).status_code, 400)
+        self.assertEqual(self.post(dict(self.position, price_min=200, price_max=100)).status_code, 400)
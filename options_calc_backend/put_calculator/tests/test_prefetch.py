@@ -0,0 +1,82 @@
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from ..prefetch import STATUS_POLL_SECONDS, Prefetcher
+
+ALL_JOBS = [('chain', 'AAPL'), ('quotes', 'AAPL'), ('chain', 'MSFT'), ('quotes', 'MSFT')]
+
+
+def stored_chain(underlying, max_age):
+    # A snapshot a minute old
+    return 'stored chain' if max_age is None or max_age >= 60 else None
+
+
+class PrefetchTests(SimpleTestCase):
+    @mock.patch('put_calculator.snapshots.save_chain')
+    @mock.patch('put_calculator.snapshots.latest_chain', side_effect=stored_chain)
+    @mock.patch('put_calculator.chains.load_put_chain', return_value='fresh chain')
+    def test_chain_refresh_bypasses_the_store(self, load_put_chain, latest_chain, save_chain):
+        with mock.patch('put_calculator.prefetch.chain_cache') as chain_cache:
+            Prefetcher(['PREF'])._refresh(('chain', 'PREF'))
+            symbol, load = chain_cache.refresh.call_args.args
+            self.assertEqual(load(symbol), 'fresh chain')
+        save_chain.assert_called_once_with('PREF', 'fresh chain')
+
+
+@override_settings(PREFETCH_CHAIN_INTERVAL=300, PREFETCH_QUOTE_INTERVAL=60, PREFETCH_CLOSED_INTERVAL=3600,
+                   PREFETCH_CONCURRENCY=2, PREFETCH_MAX_PER_SECOND=0)
+class PrefetchScheduleTests(SimpleTestCase):
+    def setUp(self):
+        self.status = 'open'
+        patcher = mock.patch('put_calculator.prefetch.market_status', side_effect=lambda: self.status)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.prefetcher = Prefetcher(['aapl', ' MSFT', 'AAPL'])
+        self.refreshed = []
+        self.prefetcher._refresh = self.refreshed.append
+
+    def run_at(self, now):
+        self.refreshed.clear()
+        jobs = self.prefetcher.run_once(now)
+        self.assertCountEqual(self.refreshed, jobs)
+        return sorted(jobs)
+
+    def test_open_intervals(self):
+        self.assertEqual(self.run_at(0), sorted(ALL_JOBS))
+        self.assertEqual(self.run_at(59), [])
+        self.assertEqual(self.run_at(60), [('quotes', 'AAPL'), ('quotes', 'MSFT')])
+        self.assertEqual(self.prefetcher.seconds_until_due(now=60), STATUS_POLL_SECONDS)
+        self.assertEqual(self.run_at(300), sorted(ALL_JOBS))
+
+    def test_closed_interval(self):
+        self.status = 'closed'
+        self.assertEqual(self.run_at(0), sorted(ALL_JOBS))
+        # Quotes and chains share the slower closed-market interval
+        self.assertEqual(self.run_at(300), [])
+        self.assertEqual(self.run_at(3599), [])
+        self.assertEqual(self.run_at(3600), sorted(ALL_JOBS))
+
+    def test_refreshes_everything_at_the_open(self):
+        self.status = 'closed'
+        self.run_at(0)
+        self.status = 'pre-market'
+        self.assertEqual(self.run_at(10), [])
+        self.status = 'open'
+        self.assertEqual(self.run_at(20), sorted(ALL_JOBS))
+        self.assertEqual(self.run_at(79), [])
+        self.assertEqual(self.run_at(80), [('quotes', 'AAPL'), ('quotes', 'MSFT')])
+        # Closing doesn't refresh everything: what was due runs, then waits a closed interval
+        self.status = 'closed'
+        self.assertEqual(self.run_at(140), [('quotes', 'AAPL'), ('quotes', 'MSFT')])
+        self.assertEqual(self.run_at(320), [('chain', 'AAPL'), ('chain', 'MSFT')])
+        self.assertEqual(self.run_at(3739), [])
+        self.assertEqual(self.run_at(3740), [('quotes', 'AAPL'), ('quotes', 'MSFT')])
+
+    @override_settings(PREFETCH_CLOSED_INTERVAL=0)
+    def test_paused_while_closed(self):
+        self.status = 'closed'
+        # The first round still warms the caches once
+        self.assertEqual(self.run_at(0), sorted(ALL_JOBS))
+        self.assertEqual(self.run_at(10 ** 6), [])
+        self.assertEqual(self.prefetcher.seconds_until_due(now=10 ** 6), STATUS_POLL_SECONDS)
+        self.status = 'open'
+        self.assertEqual(self.run_at(10 ** 6 + 1), sorted(ALL_JOBS))
@@ -0,0 +1,88 @@
+import math
+import numpy as np
+from django.test import SimpleTestCase
+from ..pricing import black_scholes, implied_volatility
+
+
+def _scalars(result):
+    return {name: float(value) for name, value in result.items()}
+
+
+class BlackScholesTests(SimpleTestCase):
+    def test_zero_vol_put_out_of_the_money_forward(self):
+        # Spot and strike 5 apart, but the forward (100·e^0.05 ≈ 105.13) is above the strike
+        greeks = _scalars(black_scholes('put', 100, 105, 1, 0, 0.05))
+        self.assertEqual(greeks, dict.fromkeys(greeks, 0.0))
+
+    def test_zero_vol_put_in_the_money_forward(self):
+        greeks = _scalars(black_scholes('put', 100, 110, 1, 0, 0.05))
+        discounted_strike = 110 * math.exp(-0.05)
+        self.assertAlmostEqual(greeks['price'], discounted_strike - 100)
+        self.assertEqual((greeks['delta'], greeks['itm_probability']), (-1.0, 1.0))
+        self.assertEqual((greeks['gamma'], greeks['vega']), (0.0, 0.0))
+        self.assertAlmostEqual(greeks['rho'], -discounted_strike / 100)
+        self.assertAlmostEqual(greeks['theta'], 0.05 * discounted_strike / 365)
+
+    def test_zero_vol_matches_the_small_vol_limit(self):
+        strikes = np.array([90.0, 104.0, 106.0, 120.0])
+        for option_type in ('put', 'call'):
+            exact = black_scholes(option_type, 100, strikes, 1, 0, 0.05, 0.01)
+            limit = black_scholes(option_type, 100, strikes, 1, 1e-6, 0.05, 0.01)
+            for name in ('price', 'delta', 'theta', 'rho', 'itm_probability'):
+                np.testing.assert_allclose(exact[name], limit[name], atol=1e-6, err_msg=f"{option_type} {name}")
+
+    def test_expired_options_are_worth_intrinsic(self):
+        greeks = black_scholes(['put', 'put', 'call'], 100, [105, 95, 95], 0, 0.3, 0.05)
+        np.testing.assert_allclose(greeks['price'], [5.0, 0.0, 5.0])
+        np.testing.assert_allclose(greeks['delta'], [-1.0, 0.0, 1.0])
+        np.testing.assert_allclose(greeks['itm_probability'], [1.0, 0.0, 1.0])
+        for name in ('gamma', 'theta', 'vega', 'rho'):
+            np.testing.assert_allclose(greeks[name], 0.0)
+
+    def test_put_call_parity(self):
+        strikes = np.linspace(80, 120, 9)
+        put = black_scholes('put', 100, strikes, 0.5, 0.25, 0.04, 0.01)
+        call = black_scholes('call', 100, strikes, 0.5, 0.25, 0.04, 0.01)
+        forward = 100 * math.exp(-0.01 * 0.5) - strikes * math.exp(-0.04 * 0.5)
+        np.testing.assert_allclose(call['price'] - put['price'], forward, atol=1e-9)
+
+
+class ImpliedVolatilityTests(SimpleTestCase):
+    def test_recovers_the_pricing_volatility(self):
+        strikes = np.array([[70.0], [95.0], [100.0], [110.0], [140.0]])
+        years = np.array([7, 30, 365]) / 365
+        for option_type in ('put', 'call'):
+            quoted = black_scholes(option_type, 100, strikes, years, 0.35, 0.045, 0.01)
+            solved = implied_volatility(option_type, quoted['price'], 100, strikes, years, 0.045, 0.01)
+            self.assertEqual(solved.shape, (5, 3))
+            # Where the price barely depends on vol, any vol within the price tolerance is a valid answer
+            identifiable = quoted['vega'] > 1e-3
+            self.assertGreaterEqual(np.count_nonzero(identifiable), 10)
+            np.testing.assert_allclose(solved[identifiable], 0.35, atol=1e-5)
+            solved = np.nan_to_num(solved, nan=0.35)
+            repriced = black_scholes(option_type, 100, strikes, years, solved, 0.045, 0.01)['price']
+            np.testing.assert_allclose(repriced, quoted['price'], atol=1e-6)
+
+    def test_prices_outside_no_arbitrage_bounds(self):
+        # Put intrinsic against the discounted strike is 110·e^-0.05 - 100 ≈ 4.64; it can't exceed 110·e^-0.05
+        prices = [4.0, 4.6, 105.0, 120.0]
+        self.assertTrue(np.isnan(implied_volatility('put', prices, 100, 110, 1, 0.05)).all())
+        self.assertTrue(np.isnan(implied_volatility('call', 101.0, 100, 90, 1, 0.05)))
+
+    def test_expired_options(self):
+        self.assertTrue(np.isnan(implied_volatility('put', [5.0, 1.0], 100, 105, 0, 0.05)).all())
+
+    def test_mixed_batch(self):
+        years = 30 / 365
+        quoted = float(black_scholes('put', 100, 95, years, 0.4, 0.045)['price'])
+        prices = np.array([quoted, 0.0, quoted, 200.0, quoted])
+        solved = implied_volatility('put', prices, 100, [95, 95, 95, 95, 95], [years, years, 0, years, years], 0.045)
+        np.testing.assert_allclose(solved[[0, 4]], 0.4, atol=1e-5)
+        self.assertTrue(np.isnan(solved[[1, 2, 3]]).all())
+
+    def test_needs_a_volatility_outside_the_bracket(self):
+        quoted = black_scholes('put', 100, 100, 0.25, 3.0, 0.045)['price']
+        self.assertTrue(np.isnan(implied_volatility('put', quoted, 100, 100, 0.25, 0.045, max_vol=2.0)))
+        self.assertAlmostEqual(float(implied_volatility('put', quoted, 100, 100, 0.25, 0.045)), 3.0, places=4)
+        # Too few iterations to get there: not converged, so NaN rather than a rough guess
+        self.assertTrue(np.isnan(implied_volatility('put', quoted, 100, 100, 0.25, 0.045, max_iter=1)))
@@ -0,0 +1,39 @@
+import asyncio
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from ..quotes import alpaca_price
+from ..resilience import ProviderUnavailable
+
+CIRCUIT_OPEN = ProviderUnavailable("alpaca: circuit open after repeated failures", retry_after=12.3)
+
+
+class AlpacaPriceFallbackTests(SimpleTestCase):
+    def setUp(self):
+        cache.delete('last_price:FALL')
+
+    @override_settings(FINNHUB_API_KEY='', POLYGON_API_KEY='')
+    def test_last_price_stands_in_while_alpaca_is_unavailable(self):
+        with mock.patch('put_calculator.quotes.alpaca_trade_price', return_value=101.5):
+            self.assertEqual(asyncio.run(alpaca_price('FALL')), 101.5)
+        with mock.patch('put_calculator.quotes.alpaca_trade_price', side_effect=CIRCUIT_OPEN):
+            self.assertEqual(asyncio.run(alpaca_price('FALL')), 101.5)
+            cache.delete('last_price:FALL')
+            with self.assertRaises(ProviderUnavailable):
+                asyncio.run(alpaca_price('FALL'))
+
+    @override_settings(FINNHUB_API_KEY='key', POLYGON_API_KEY='key')
+    def test_other_providers_stand_in_without_a_last_price(self):
+        with mock.patch('put_calculator.quotes.alpaca_trade_price', side_effect=CIRCUIT_OPEN), \
+                mock.patch.dict('put_calculator.quotes.QUOTE_PROVIDERS',
+                                {'finnhub': lambda symbol: 100.0, 'polygon': lambda symbol: 102.0}):
+            self.assertEqual(asyncio.run(alpaca_price('FALL')), 101.0)
+
+
+class ProviderUnavailableResponseTests(SimpleTestCase):
+    def test_refused_upstream_call_is_a_503_with_retry_after(self):
+        with mock.patch('put_calculator.async_views.alpaca_price', side_effect=CIRCUIT_OPEN):
+            response = self.client.get(reverse('get_option_contracts_alpaca'), {'underlying_symbols': 'FALL'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '13')
@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase, override_settings
+from ..fakes import FakeProvider
+from ..providers import PooledSession, guards
+from ..resilience import ProviderUnavailable
+
+GUARD = {'rate_limit': 50, 'burst': 10, 'queue_timeout': 5, 'retries': 2, 'backoff': 0.01, 'max_backoff': 2,
+         'failure_threshold': 2, 'reset_timeout': 60}
+
+
+class ProviderGuardTests(SimpleTestCase):
+    def session(self, **config):
+        guards.reset()
+        self.addCleanup(guards.reset)
+        settings = override_settings(UPSTREAM_PROVIDERS={'fake': dict(GUARD, **config)})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        session = PooledSession('fake', pool_size=2, connect_timeout=2, read_timeout=2)
+        self.addCleanup(session.close)
+        return session
+
+    def test_429_is_retried_after_retry_after_and_slows_the_limiter(self):
+        session = self.session()
+        with FakeProvider(rate_limit=1, retry_after=1) as upstream:
+            statuses = [session.get(upstream.url).status_code for _ in range(3)]
+        guard = guards.get('fake')
+        self.assertEqual(statuses, [200, 200, 200])
+        self.assertGreaterEqual(upstream.throttled, 1)
+        self.assertGreaterEqual(guard.counts['throttled'], 1)
+        self.assertLess(guard.bucket.rate, guard.bucket.max_rate)
+        self.assertEqual(guard.breaker.state, 'closed')
+
+    def test_persistent_429s_dont_open_the_circuit(self):
+        session = self.session(retries=0)
+        with FakeProvider(rate_limit=0) as upstream:
+            statuses = [session.get(upstream.url).status_code for _ in range(4)]
+        self.assertEqual(statuses, [429] * 4)
+        self.assertEqual(guards.get('fake').breaker.state, 'closed')
+
+    def test_failures_open_the_circuit_and_calls_fail_fast(self):
+        session = self.session(retries=0)
+        with FakeProvider() as upstream:
+            upstream.fail_status = 503
+            statuses = [session.get(upstream.url).status_code for _ in range(2)]
+            with self.assertRaises(ProviderUnavailable) as refused:
+                session.get(upstream.url)
+        self.assertEqual(statuses, [503, 503])
+        self.assertEqual(upstream.requests, 2)
+        self.assertEqual(refused.exception.retry_after_header(), '60')
@@ -0,0 +1,29 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from unittest import mock
+from django.test import SimpleTestCase
+from ..simulation import pool_context, simulate_short_put
+
+ARGS = (100.0, 95.0, 1.5, 30 / 365, 0.3, 0.045)
+
+
+class SimulationTests(SimpleTestCase):
+    def test_pool_matches_inline(self):
+        inline = simulate_short_put(*ARGS, paths=250_000, seed=7)
+        with ProcessPoolExecutor(max_workers=2, mp_context=pool_context()) as executor:
+            pooled = simulate_short_put(*ARGS, paths=250_000, seed=7, executor=executor)
+        for key in ('paths', 'probability_of_profit', 'probability_of_assignment', 'expected_pnl'):
+            self.assertEqual(pooled[key], inline[key])
+
+    def test_spent_budget_waits_for_a_chunk_without_spinning(self):
+        calls = []
+
+        def counting_wait(*args, **kwargs):
+            calls.append(kwargs.get('timeout'))
+            return wait(*args, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=1) as executor, \
+                mock.patch('put_calculator.simulation.wait', side_effect=counting_wait):
+            result = simulate_short_put(*ARGS, paths=1_000_000, time_budget=1e-6, executor=executor)
+        self.assertTrue(result['budget_exhausted'])
+        self.assertGreater(result['paths'], 0)
+        self.assertEqual(calls, [None])
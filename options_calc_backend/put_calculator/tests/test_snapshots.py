@@ -0,0 +1,81 @@
+from datetime import timedelta
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from ..chain_index import ChainIndex, OptionQuotes
+from ..chains import OptionContract
+from ..models import ChainSnapshot, QuoteSnapshot, TickBatch
+from ..snapshots import TickRecorder, latest_chain, load_ticks, save_chain, save_quotes, warm_or_fetch
+
+
+class FakeStore:
+    def __init__(self, stored=None):
+        self.stored = stored
+        self.reads = []
+        self.saved = []
+
+    def latest(self, underlying, max_age):
+        self.reads.append(max_age)
+        return self.stored
+
+    def save(self, underlying, value):
+        self.saved.append(value)
+
+
+class WarmOrFetchTests(SimpleTestCase):
+    def test_store_only_serves_the_cold_start(self):
+        store = FakeStore(stored='stored')
+        fetches = iter(['fresh 1', 'fresh 2'])
+        load = lambda: warm_or_fetch('COLD', store.latest, lambda symbol: next(fetches), store.save, 3600)
+        self.assertEqual(load(), 'stored')
+        self.assertEqual(load(), 'fresh 1')
+        self.assertEqual(load(), 'fresh 2')
+        self.assertEqual(store.reads, [3600])
+        self.assertEqual(store.saved, ['fresh 1', 'fresh 2'])
+
+    def test_failed_fetch_falls_back_to_any_stored_copy(self):
+        store = FakeStore(stored='stale')
+
+        def fail(symbol):
+            raise ConnectionError("provider down")
+
+        warm_or_fetch('DOWN', store.latest, lambda symbol: 'fresh', store.save, 0)
+        self.assertEqual(warm_or_fetch('DOWN', store.latest, fail, store.save, 3600), 'stale')
+        self.assertEqual(store.reads[-1], None)
+
+        store.stored = None
+        with self.assertRaises(ConnectionError):
+            warm_or_fetch('DOWN', store.latest, fail, store.save, 3600)
+
+
+@override_settings(SNAPSHOT_RETENTION=3600)
+class RetentionTests(TestCase):
+    def test_saving_prunes_old_snapshots(self):
+        chain = ChainIndex([OptionContract(symbol='SPY260116P00500000', type='put', strike_price=500.0,
+                                           expiration_date='2026-01-16', close_price=1.0)])
+        save_chain('spy', chain)
+        ChainSnapshot.objects.update(fetched_at=timezone.now() - timedelta(hours=2))
+        save_chain('qqq', chain)
+        self.assertEqual(ChainSnapshot.objects.count(), 2)
+
+        save_chain('spy', chain)
+        self.assertEqual(sorted(ChainSnapshot.objects.values_list('underlying', flat=True)), ['QQQ', 'SPY'])
+        self.assertEqual(len(latest_chain('SPY')), 1)
+
+    def test_flushing_ticks_prunes_old_batches(self):
+        recorder = TickRecorder()
+        old = (timezone.now() - timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%S.000000000Z')
+        now = timezone.now().strftime('%Y-%m-%dT%H:%M:%S.000000000Z')
+        recorder.append({'T': 't', 'S': 'SPY', 't': old, 'p': 500.0, 's': 10})
+        recorder.flush()
+        recorder.append({'T': 't', 'S': 'SPY', 't': now, 'p': 501.0, 's': 5})
+        recorder.flush()
+        self.assertEqual(TickBatch.objects.count(), 1)
+        self.assertEqual(load_ticks('SPY', 'trade')['price'].tolist(), [501.0])
+
+    @override_settings(SNAPSHOT_RETENTION=0)
+    def test_zero_retention_keeps_everything(self):
+        quotes = OptionQuotes(['SPY260116P00500000'], [1.0], [1.1])
+        save_quotes('SPY', quotes)
+        QuoteSnapshot.objects.update(fetched_at=timezone.now() - timedelta(days=365))
+        save_quotes('SPY', quotes)
+        self.assertEqual(QuoteSnapshot.objects.count(), 2)
@@ -0,0 +1,97 @@
+# put_calculator/tests/test_stream_hub.py
+import asyncio
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from ..fakes import ReplayServer
+from ..stream_hub import StreamHub, Subscription
+
+FRAMES = [
+    [{"T": "t", "S": "AAPL", "p": 190.1, "s": 100, "t": ""}, {"T": "t", "S": "MSFT", "p": 410.5, "s": 5, "t": ""}],
+    [{"T": "q", "S": "AAPL", "bp": 190.0, "bs": 1, "ap": 190.2, "as": 2, "t": ""}],
+]
+
+
+async def _drain(subscription, until_sentinel=True, timeout=5):
+    items = []
+    while True:
+        item = await asyncio.wait_for(subscription.get(), timeout)
+        if item.get('p') == 0 and until_sentinel:
+            return items
+        items.append(item)
+
+
+@override_settings(SNAPSHOT_RECORD_TICKS=False)
+class StreamHubTests(SimpleTestCase):
+    def run_async(self, coroutine):
+        return asyncio.run(asyncio.wait_for(coroutine, 30))
+
+    def test_fans_out_one_upstream_connection(self):
+        async def scenario():
+            async with ReplayServer(FRAMES) as server:
+                hub = StreamHub(url=server.url, max_queue=100)
+                first, second = await hub.subscribe('AAPL'), await hub.subscribe('AAPL')
+                msft = await hub.subscribe('MSFT')
+                await server.wait_for_subscribers(['AAPL', 'MSFT'])
+                self.assertEqual(server.connection_count, 1)
+
+                await server.replay()
+                for subscription in (first, second):
+                    self.assertEqual([item['T'] for item in await _drain(subscription)], ['t', 'q'])
+                self.assertEqual([item['p'] for item in await _drain(msft)], [410.5])
+                self.assertEqual(hub.stats()['symbols'], {'AAPL': 2, 'MSFT': 1})
+
+                await hub.unsubscribe(first)
+                self.assertEqual(hub.stats()['symbols'], {'AAPL': 1, 'MSFT': 1})
+                await hub.unsubscribe(second)
+                await hub.unsubscribe(msft)
+                self.assertFalse(hub.stats()['connected'])
+        self.run_async(scenario())
+
+    def test_slow_subscriber_drops_oldest(self):
+        async def scenario():
+            subscription = Subscription('AAPL', max_queue=2)
+            for i in range(5):
+                subscription.put({'i': i})
+            self.assertEqual(subscription.dropped, 3)
+            self.assertEqual([subscription.get_nowait()['i'] for _ in range(2)], [3, 4])
+        self.run_async(scenario())
+
+    def test_reconnects_and_resubscribes(self):
+        async def scenario():
+            async with ReplayServer(FRAMES) as server:
+                hub = StreamHub(url=server.url, max_queue=100)
+                subscription = await hub.subscribe('AAPL')
+                await server.wait_for_subscribers(['AAPL'])
+
+                await server.drop_connections()
+                await server.wait_for_subscribers(['AAPL'])
+                await server.replay()
+                self.assertEqual(len(await _drain(subscription)), 2)
+                await hub.unsubscribe(subscription)
+        self.run_async(scenario())
+
+    @mock.patch('put_calculator.stream_hub.CONNECT_TIMEOUT', 1)
+    def test_subscribe_and_unsubscribe_while_upstream_is_down(self):
+        async def scenario():
+            server = await ReplayServer(FRAMES).start()
+            port = server.port
+            hub = StreamHub(url=server.url, max_queue=100)
+            aapl = await hub.subscribe('AAPL')
+            await server.wait_for_subscribers(['AAPL'])
+            await server.drop_connections()
+            await server.stop()
+            await asyncio.sleep(0.2)  # the reader is now backing off between reconnects
+
+            # Neither waits for the reconnect loop
+            msft = await asyncio.wait_for(hub.subscribe('MSFT'), 0.5)
+            await asyncio.wait_for(hub.unsubscribe(aapl), 0.5)
+            self.assertEqual(hub.stats()['symbols'], {'MSFT': 1})
+
+            # Upstream back: the reconnect subscribes what is live now
+            async with ReplayServer(FRAMES, port=port) as server:
+                await server.wait_for_subscribers(['MSFT'])
+                await server.replay()
+                self.assertEqual([item['S'] for item in await _drain(msft)], ['MSFT'])
+                await hub.unsubscribe(msft)
+                self.assertFalse(hub.stats()['connected'])
+        self.run_async(scenario())
@@ -1,14 +1,28 @@
 # put_calculator/urls.py
 from django.urls import path
-from . import views
+from . import async_views, instrumentation, views
 
 urlpatterns = [
     path('options/puts/', views.get_put_options_data, name='get_put_options_data'),
     path('options/puts/calculate/', views.calculate_put_metrics, name='calculate_put_metrics'),
-    path('options/contracts/alpaca/', views.get_option_contracts_alpaca, name='get_option_contracts_alpaca'),
+    path('options/puts/calculate/batch/', views.calculate_put_metrics_batch, name='calculate_put_metrics_batch'),
+    path('options/calls/covered/calculate/', views.calculate_covered_call_metrics, name='calculate_covered_call_metrics'),
+    path('options/calls/covered/calculate/batch/', views.calculate_covered_call_metrics_batch, name='calculate_covered_call_metrics_batch'),
+    path('options/puts/simulate/', views.simulate_put_outcomes, name='simulate_put_outcomes'),
+    path('options/puts/grid/', views.get_put_scenario_grid, name='get_put_scenario_grid'),
+    path('options/payoff/', views.get_payoff_profile, name='get_payoff_profile'),
+    path('options/greeks/', views.calculate_option_greeks, name='calculate_option_greeks'),
+    path('options/iv-surface/', views.get_iv_surface, name='get_iv_surface'),
+    path('options/contracts/alpaca/', async_views.get_option_contracts_alpaca, name='get_option_contracts_alpaca'),
+    path('options/contracts/bulk/', async_views.get_bulk_option_contracts, name='get_bulk_option_contracts'),
+    path('options/contracts/cache/', views.get_chain_cache_stats, name='get_chain_cache_stats'),
     path('options/contracts/polygon/', views.get_option_contracts_polygon, name='get_option_contracts_polygon'),
     path('test/polygon/options/', views.test_polygon_options, name='test_polygon_options'),
     path('simple/test/', views.simple_test, name='simple_test'),
-    path('quote/polygon/', views.get_last_quote_polygon, name='get_last_quote_polygon'),
-    path('quote/finnhub/', views.get_finnhub_quote, name='get_finnhub_quote'),
+    path('quote/', async_views.get_quote, name='get_quote'),
+    path('quotes/bulk/', async_views.get_bulk_quotes, name='get_bulk_quotes'),
+    path('quote/polygon/', async_views.get_last_quote_polygon, name='get_last_quote_polygon'),
+    path('quote/finnhub/', async_views.get_finnhub_quote, name='get_finnhub_quote'),
+    path('upstream/', views.get_upstream_status, name='get_upstream_status'),
+    path('metrics/', instrumentation.metrics_view, name='metrics'),
 ]
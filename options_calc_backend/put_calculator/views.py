@@ -1,58 +1,35 @@
 # put_calculator/views.py
 from django.shortcuts import render
+import logging
 import requests
 import json
+from asgiref.sync import async_to_sync
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.conf import settings
 from datetime import datetime, timedelta
-from alpaca.data.historical.stock import StockHistoricalDataClient
-from alpaca.data.requests import StockLatestTradeRequest
-from polygon import RESTClient
-import finnhub
-
-@api_view(['GET'])
-def get_finnhub_quote(request):
-    symbol = request.query_params.get('symbol', 'AAPL')  # Get 'symbol' from query params, default to AAPL
-    finnhub_api_key = settings.FINNHUB_API_KEY
-
-    if not finnhub_api_key:
-        return Response({"error": "FINNHUB_API_KEY is not set in settings."}, status=500)
-
-    try:
-        finnhub_client = finnhub.Client(api_key=finnhub_api_key)
-        quote_data = finnhub_client.quote(symbol)
-        return Response({"quote": quote_data})
-    except Exception as e:
-        return Response({"error": f"Error fetching quote from Finnhub: {str(e)}"}, status=500)
-
-
-@api_view(['GET'])
-def get_last_quote_polygon(request):
-    ticker_symbol = request.query_params.get('underlying_symbols', 'SPY') # Default to SPY
-
-    if not ticker_symbol:
-        return Response({"error": "underlying_symbols parameter is required."}, status=400)
-
-    api_key = settings.POLYGON_API_KEY
-    if not api_key:
-        return Response({"error": "POLYGON_API_KEY is not set in settings."}, status=500)
-
-    client = RESTClient(api_key, connect_timeout=5, read_timeout=10)
-
-    try:
-        print(f"Fetching last quote for {ticker_symbol}...")
-        last_quote = client.get_last_quote(ticker_symbol)
-        print(f"Last quote response: {last_quote}")
-        if last_quote and hasattr(last_quote, 'results'):
-            return Response({"last_quote": last_quote.results})
-        else:
-            return Response({"error": f"Could not retrieve last quote for {ticker_symbol}."}, status=404)
-
-    except Exception as e:
-        error_message = f"Error fetching last quote: {str(e)}"
-        print(f"Exception caught: {error_message}")
-        return Response({"error": error_message}, status=500)
+import numpy as np
+from .chain_cache import chain_cache, quote_cache
+from .chains import load_put_chain_index, load_put_quotes
+from .conditional import conditional_json, content_etag, parse_fields
+from . import payoff
+from .positions import PositionError, parse_legs
+from .metrics import STRATEGIES, days_to_expiration, put_metrics, select_rows
+from .prefetch import prefetcher
+from .providers import guards, providers
+from .pricing import DAYS_PER_YEAR, black_scholes, implied_volatility
+from .resilience import ProviderUnavailable
+from .quotes import alpaca_price
+from .serialization import dumps_bytes
+from .simulation import simulate_short_put, simulation_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _provider_unavailable(error):
+    """503 for an upstream call refused locally (circuit open, rate limit queue full), with Retry-After"""
+    return Response({"error": f"Upstream provider unavailable: {error}"}, status=503,
+                    headers={'Retry-After': error.retry_after_header()})
 
 #### Tests
 
@@ -60,10 +37,12 @@ def get_last_quote_polygon(request):
 def test_polygon_options(request):
     ticker_symbol = request.query_params.get('underlying_symbols', 'SPY')
     api_key = settings.POLYGON_API_KEY
-    client = RESTClient(api_key, connect_timeout=5, read_timeout=10)
+    client = providers.polygon()
     try:
         contracts = client.list_options_contracts(ticker_symbol, limit=1)
         return Response({"message": f"Successfully called list_options_contracts for {ticker_symbol}"})
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
     except Exception as e:
         return Response({"error": f"Error calling list_options_contracts: {e}"}, status=500)
 
@@ -73,11 +52,11 @@ def simple_test(request):
 
 #####
 
+from asgiref.sync import async_to_sync
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.conf import settings
 from datetime import datetime, timedelta
-from polygon import RESTClient
 import requests
 
 @api_view(['GET'])
@@ -88,178 +67,163 @@ def get_option_contracts_polygon(request):
         return Response({"error": "underlying_symbols parameter is required."}, status=400)
 
     api_key = settings.POLYGON_API_KEY
-    print(f"API Key: {api_key}") # Check API Key
 
     if not api_key:
         return Response({"error": "POLYGON_API_KEY is not set in settings."}, status=500)
 
-    client = RESTClient(api_key, connect_timeout=5, read_timeout=10)
-    print(f"Client object: {client}") # Check Client Object
+    client = providers.polygon()
 
     try:
         # Get the current stock price
-        print("Fetching current stock price...")
+        logger.debug("Fetching current stock price for %s from Polygon", ticker_symbol)
         today = datetime.now().date()
         yesterday = today - timedelta(days=1)
         aggs = client.get_aggs(ticker_symbol, 1, "day", yesterday.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
-        print(f"Stock price aggregation response: {aggs}")
+        logger.debug("Stock price aggregation response: %s", aggs)
         if aggs and isinstance(aggs, list) and aggs[0] and hasattr(aggs[0], 'close'):
             current_stock_price = aggs[0].close
-            print(f"Current stock price: {current_stock_price}")
+            logger.debug("Current stock price for %s: %s", ticker_symbol, current_stock_price)
             return Response({"current_stock_price": current_stock_price}) # Test point 1
         else:
             error_message = f"Could not retrieve current stock price for {ticker_symbol} from Polygon.io."
-            print(f"Error: {error_message}")
+            logger.warning(error_message)
             return Response({"error": error_message}, status=404)
 
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
     except Exception as e:
         error_message = f"Error fetching stock price: {str(e)}"
-        print(f"Exception caught: {error_message}")
+        logger.exception(error_message)
         return Response({"error": error_message}, status=500)
     
 
+def iv_surface(put_chain, stock_price, strikes, expirations):
+    """Put implied volatilities (expirations x strikes) from contract close prices, None where unsolvable"""
+    prices = put_chain.price_grid(expirations, strikes)
+    years = days_to_expiration(expirations)[:, None] / DAYS_PER_YEAR
+    iv = implied_volatility('put', prices, stock_price, np.asarray(strikes)[None, :], years, settings.RISK_FREE_RATE)
+    return np.where(np.isnan(iv), None, np.round(iv, 4)).tolist()
+
+
+# ?fields= choices for get_option_contracts_alpaca and get_put_options_data
+CONTRACT_WINDOW_FIELDS = (
+    "at_the_money_strike_price", "closest_strike_prices", "next_expiration_dates", "implied_volatility",
+)
+CONTRACT_FIELDS = ("symbol", "strike_price", "expiration_date", "close_price")
+
+
 @api_view(['GET'])
-def get_option_contracts_alpaca(request):
-    
+def get_iv_surface(request):
+    """
+    Put implied-volatility surface for the strikes/expirations that
+    get_option_contracts_alpaca selects (strikes and expirations params
+    override how many), solved for the whole grid in one vectorized call.
+    """
     ticker_symbol = request.query_params.get('underlying_symbols', None)
 
     if not ticker_symbol:
         return Response({"error": "underlying_symbols parameter is required."}, status=400)
 
     try:
-        data_client = StockHistoricalDataClient(settings.ALPACA_API_KEY, settings.ALPACA_SECRET_KEY)
-        latest_trade_request = StockLatestTradeRequest(symbol_or_symbols=[ticker_symbol])
-        latest_trade_data = data_client.get_stock_latest_trade(request_params=latest_trade_request)
+        strike_count = int(request.query_params.get('strikes', 21))
+        expiration_count = int(request.query_params.get('expirations', 8))
+    except ValueError:
+        return Response({"error": "strikes and expirations must be integers."}, status=400)
 
-        latest_trade = latest_trade_data.get(ticker_symbol)
-        if latest_trade and hasattr(latest_trade, 'price'):
-            current_stock_price = latest_trade.price
-        else:
+    try:
+        current_stock_price = async_to_sync(alpaca_price)(ticker_symbol)
+        if current_stock_price is None:
             return Response({"error": f"Could not retrieve latest stock trade price for {ticker_symbol}."}, status=404)
 
-        base_url = settings.ALPACA_BASE_URL
-        options_endpoint = "/v2/options/contracts"
-        headers = {
-            "accept": "application/json",
-            "APCA-API-KEY-ID": settings.ALPACA_API_KEY,
-            "APCA-API-SECRET-KEY": settings.ALPACA_SECRET_KEY
-        }
-        options_params = {
-            "underlying_symbols": ticker_symbol,
-            "limit": 1000
-        }
-        options_response = requests.get(f"{base_url}{options_endpoint}", params=options_params, headers=headers)
-        options_response.raise_for_status()
-        options_data = options_response.json()
-
-        all_contracts = options_data.get("option_contracts", [])
-        all_contracts = options_data.get("option_contracts", [])
-        put_contracts = [c for c in all_contracts if c.get("type") == "put"]
+        put_chain = chain_cache.get_or_fetch(ticker_symbol, load_put_chain_index)
 
-        if not put_contracts:
+        if not len(put_chain):
             return Response({"error": f"No put options found for {ticker_symbol}."}, status=404)
 
-        atm_strike = min(
-            put_contracts,
-            key=lambda x: abs(float(x.get("strike_price", 0)) - current_stock_price)
-        ).get("strike_price", 0)
-
-        if atm_strike is not None:
-            atm_strike = float(atm_strike)
-        lower_bound = atm_strike - (10 * abs(atm_strike * 0.05))
-        upper_bound = atm_strike + (10 * abs(atm_strike * 0.05))
-
-        closest_strikes = sorted([
-            c for c in put_contracts
-            if lower_bound <= float(c.get("strike_price", 0)) and float(c.get("strike_price", 0)) <= upper_bound
-        ], key=lambda x: abs(float(x.get("strike_price", 0)) - current_stock_price))[:21]
-
-        unique_expiration_dates = sorted(list(set([c.get("expiration_date") for c in put_contracts])))
-        today = datetime.now().date()
-        next_expiration_dates = [
-            date for date in unique_expiration_dates
-            if datetime.strptime(date, '%Y-%m-%d').date() >= today
-        ][:8]
-
-        print("Reached the final Response in try block")  # Debugging line
+        _, strikes, expirations = put_chain.window(current_stock_price, strike_count, expiration_count)
         return Response({
-            "at_the_money_strike_price": atm_strike,
-            "closest_strike_prices": sorted(list(set([c['strike_price'] for c in closest_strikes]))),
-            "next_expiration_dates": next_expiration_dates,
+            "underlying_symbol": ticker_symbol,
+            "stock_price": current_stock_price,
+            "risk_free_rate": settings.RISK_FREE_RATE,
+            "strike_prices": strikes,
+            "expiration_dates": expirations,
+            "implied_volatility": iv_surface(put_chain, current_stock_price, strikes, expirations),
         })
 
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
     except requests.exceptions.RequestException as e:
-        print(f"Request Exception: {e}")  # Debugging line
         return Response({"error": f"Error fetching data from Alpaca: {str(e)}"}, status=500)
     except Exception as e:
-        print(f"General Exception: {e}")  # Debugging line
         return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
-    
+
+
+@api_view(['GET'])
+def get_chain_cache_stats(request):
+    return Response(dict(chain_cache.stats(), quotes=quote_cache.stats(), prefetch=prefetcher.stats()))
+
+
+@api_view(['GET'])
+def get_upstream_status(request):
+    """Rate limiter and circuit breaker state per upstream provider"""
+    return Response(guards.stats())
 
 
 ###### These API calls were not used ######
 @api_view(['GET'])
 def get_put_options_data(request):
+    """
+    Every put contract for a ticker from the chain cache, sorted by
+    expiration then strike; fields picks among CONTRACT_FIELDS (default
+    symbol, strike_price, expiration_date). The ETag and Last-Modified
+    follow the cached chain, so polling clients get a 304 until it changes.
+    """
     ticker_symbol = request.query_params.get('ticker', None)
     if not ticker_symbol:
         return Response({"error": "Ticker symbol is required."}, status=400)
 
-    base_url = "https://paper-api.alpaca.markets"
-    endpoint = "/v2/options/contracts"
-    params = {
-        "underlying_symbols": ticker_symbol,
-        "type": "put",
-        "limit": 1000  # Adjust limit as needed
-    }
-    headers = {
-        "accept": "application/json",
-        "APCA-API-KEY-ID": settings.ALPACA_API_KEY,
-        "APCA-API-SECRET-KEY": settings.ALPACA_SECRET_KEY
-    }
-
     try:
-        response = requests.get(f"{base_url}{endpoint}", params=params, headers=headers)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        data = response.json()
-
-        # Print the raw JSON response to the console
-        print("\n--- Alpaca API Response (Raw JSON) ---")
-        print(json.dumps(data, indent=4))
-        print("---------------------------------------\n")
-
-        option_contracts = data.get("option_contracts", [])
-        results = []
-        for contract in option_contracts:
-            results.append({
-                'symbol': contract.get('symbol'),
-                'strike_price': float(contract.get('strike_price', 0)),
-                'expiration_date': contract.get('expiration_date'),
-                # Add other relevant fields as needed
-            })
-        return Response(results)
+        fields = parse_fields(request, CONTRACT_FIELDS, CONTRACT_FIELDS[:3])
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
 
+    try:
+        put_chain = chain_cache.get_or_fetch(ticker_symbol, load_put_chain_index)
+
+        def render():
+            columns = {
+                'symbol': np.char.decode(put_chain.symbol, 'ascii'),
+                'strike_price': put_chain.strike_price,
+                'expiration_date': np.datetime_as_string(put_chain.expiration.astype('datetime64[D]')),
+                'close_price': np.where(np.isnan(put_chain.close_price), None, put_chain.close_price),
+            }
+            values = zip(*(columns[name].tolist() for name in fields))
+            return dumps_bytes([dict(zip(fields, row)) for row in values])
+
+        etag = content_etag('puts', ticker_symbol, put_chain.version, *fields)
+        return conditional_json(request, etag, render, last_modified=put_chain.fetched_at)
+
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
     except requests.exceptions.RequestException as e:
         error_message = f"Error fetching data from Alpaca: {str(e)}"
-        print(f"\n--- Error: {error_message} ---\n")
+        logger.warning(error_message)
         return Response({"error": error_message}, status=500)
     except Exception as e:
         unexpected_error = f"An unexpected error occurred: {str(e)}"
-        print(f"\n--- Error: {unexpected_error} ---\n")
+        logger.exception(unexpected_error)
         return Response({"error": unexpected_error}, status=500)
 
 
-@api_view(['POST'])
-def calculate_put_metrics(request):
-    print("\n--- Received request.data ---")
-    print(request.data)
-    print("-----------------------------\n")
-
+def _strategy_single(request, strategy):
+    """Shared body of the single-contract strategy endpoints; the metrics come from metrics.STRATEGIES like the batch ones"""
     required_params = ['ticker_symbol', 'stock_price', 'strike_price', 'option_premium', 'expiration_date_str']
     missing = [param for param in required_params if param not in request.data]
 
     if missing:
         return Response({"error": f"Missing required parameters: {', '.join(missing)}"}, status=400)
 
+    option_type, strategy_metrics = STRATEGIES[strategy]
     try:
         stock_price = float(request.data.get('stock_price'))
         strike_price = float(request.data.get('strike_price'))
@@ -267,9 +231,8 @@ def calculate_put_metrics(request):
         number_of_contracts = int(request.data.get('number_of_contracts', 1))
         expiration_date = datetime.strptime(request.data.get('expiration_date_str'), '%Y-%m-%d').date()
 
-        today = datetime.now().date()
-        days_to_expiration = (expiration_date - today).days
-        if days_to_expiration < 0:
+        days = (expiration_date - datetime.now().date()).days
+        if days < 0:
             return Response({"error": "Expiration date cannot be in the past."}, status=400)
 
         results = {
@@ -277,18 +240,548 @@ def calculate_put_metrics(request):
             'stock_price': stock_price,
             'strike_price': strike_price,
             'option_premium': option_premium,
-            'expiration_date': request.data.get('expiration_date_str'),
-            'drop_percentage': round(((stock_price - strike_price) / stock_price) * 100, 2) if stock_price else 0,
-            'breakeven_price': round(strike_price - option_premium, 2),
-            'premium_collected': round(option_premium * number_of_contracts * 100, 2),
-            'days_to_expiration': days_to_expiration,
-            'return_at_expiration': round((option_premium / strike_price) * 100, 2) if strike_price else 0,
-            'premium_annualized': round((((option_premium / strike_price) * 100) * 365) / days_to_expiration, 2) if days_to_expiration > 0 and strike_price else 0,
         }
+        options = {}
+        if strategy == 'covered_call':
+            options['cost_basis'] = results['cost_basis'] = float(request.data.get('cost_basis', stock_price))
+        results.update({
+            'expiration_date': request.data.get('expiration_date_str'),
+            'days_to_expiration': days,
+        })
+
+        metrics = strategy_metrics(stock_price, strike_price, option_premium, days, number_of_contracts, **options)
+        results.update({name: float(value) for name, value in metrics.items()})
+
+        # Optional Black-Scholes Greeks when the caller supplies a volatility
+        if request.data.get('volatility') is not None:
+            greeks = _greek_columns(
+                option_type, stock_price, strike_price, days,
+                float(request.data.get('volatility')),
+                float(request.data.get('risk_free_rate', settings.RISK_FREE_RATE)),
+            )
+            results.update({name: float(value) for name, value in greeks.items()})
         return Response(results)
 
     except ValueError as e:
-        print(f"\n--- ValueError occurred: {e} ---\n")
+        logger.info("Invalid %s metrics input: %s", strategy, e)
         return Response({"error": "Invalid input format for numeric or date fields."}, status=400)
     except Exception as e:
-        return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
\ No newline at end of file
+        return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+
+@api_view(['POST'])
+def calculate_put_metrics(request):
+    """
+    Cash-secured put metrics for one put. Passing volatility adds
+    Black-Scholes Greeks for the put.
+    """
+    logger.debug("calculate_put_metrics request data: %s", request.data)
+    return _strategy_single(request, 'put')
+
+
+class BatchInputError(ValueError):
+    """Batch request arrays that don't line up"""
+
+
+def _element_error(name, values, valid, expected):
+    """BatchInputError naming the first element of values (a scalar, list or nested list) that isn't valid"""
+    def locate(values):
+        if not isinstance(values, (list, tuple)):
+            return '' if not valid(values) else None
+        for i, value in enumerate(values):
+            where = locate(value)
+            if where is not None:
+                return f"[{i}]{where}"
+        return None
+
+    where = locate(values)
+    if where is None:
+        return BatchInputError(f"{name} must be a flat array or matrix of {expected}s.")
+    return BatchInputError(f"{name}{where} must be a {expected}.")
+
+
+def _is_number(value):
+    try:
+        return not isinstance(value, bool) and np.isfinite(float(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_date(value):
+    try:
+        return isinstance(value, str) and not np.isnat(np.datetime64(value, 'D'))
+    except ValueError:
+        return False
+
+
+def _numbers(name, values):
+    """values as a float64 array; null, non-numeric and non-finite elements are a BatchInputError, not NaN"""
+    try:
+        array = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise _element_error(name, values, _is_number, 'number')
+    if not np.isfinite(array).all():
+        raise _element_error(name, values, _is_number, 'number')
+    return array
+
+
+def _dates(name, values):
+    """values (YYYY-MM-DD strings) as a datetime64[D] array; null and invalid dates are a BatchInputError, not NaT"""
+    try:
+        array = np.asarray(values, dtype='datetime64[D]')
+    except (TypeError, ValueError):
+        raise _element_error(name, values, _is_date, 'YYYY-MM-DD date')
+    if np.isnat(array).any():
+        raise _element_error(name, values, _is_date, 'YYYY-MM-DD date')
+    return array
+
+
+def _batch_rows(data):
+    """
+    Strike/expiration rows for the batch endpoints: parallel strike_prices and
+    expiration_dates arrays, or every strike x expiration pair (strike-major)
+    when "grid" is set.
+    """
+    strike_prices = _numbers('strike_prices', data.get('strike_prices'))
+    expiration_dates = _dates('expiration_dates', data.get('expiration_dates'))
+
+    if strike_prices.ndim != 1 or expiration_dates.ndim != 1:
+        raise BatchInputError("strike_prices and expiration_dates must be flat arrays.")
+
+    if data.get('grid'):
+        return np.repeat(strike_prices, len(expiration_dates)), np.tile(expiration_dates, len(strike_prices))
+    if len(strike_prices) != len(expiration_dates):
+        raise BatchInputError("strike_prices and expiration_dates must have the same length.")
+    return strike_prices, expiration_dates
+
+
+def _per_row(name, values, row_count):
+    """A scalar, or one value per batch row (a strikes x expirations matrix in grid mode)"""
+    values = _numbers(name, values)
+    if values.ndim == 0:
+        return values
+    if values.size != row_count:
+        raise BatchInputError(f"{name} must have one value per strike/expiration pair.")
+    return values.reshape(-1)
+
+
+def _greek_columns(option_type, stock_price, strike_prices, days, volatility, risk_free_rate, dividend_yield=0.0):
+    greeks = black_scholes(
+        option_type, stock_price, strike_prices, np.asarray(days) / DAYS_PER_YEAR,
+        volatility, risk_free_rate, dividend_yield
+    )
+    greeks['model_price'] = greeks.pop('price')
+    return {name: np.round(values, 4) for name, values in greeks.items()}
+
+
+# Numeric scenario grid columns that can be filtered (min_<name>/max_<name>) and sorted on
+GRID_NUMERIC_COLUMNS = (
+    'strike_price', 'days_to_expiration', 'bid_price', 'ask_price', 'mid_price', 'premium',
+    'drop_percentage', 'breakeven_price', 'premium_collected', 'return_at_expiration', 'premium_annualized',
+)
+PREMIUM_SOURCES = ('bid', 'ask', 'mid')
+
+
+def _grid_query(query_params, default_sort):
+    """Filter bounds, sort column, direction and limit from min_*/max_*, sort and limit params"""
+    bounds = {}
+    for name in GRID_NUMERIC_COLUMNS:
+        low, high = query_params.get(f'min_{name}'), query_params.get(f'max_{name}')
+        if low is not None or high is not None:
+            bounds[name] = (float(low) if low is not None else None, float(high) if high is not None else None)
+
+    sort = query_params.get('sort', default_sort)
+    descending = sort.startswith('-')
+    sort_by = sort.lstrip('-')
+    if sort_by not in GRID_NUMERIC_COLUMNS:
+        raise BatchInputError(f"sort must be one of {', '.join(GRID_NUMERIC_COLUMNS)} (prefix - for descending).")
+
+    limit = query_params.get('limit')
+    limit = int(limit) if limit is not None else None
+    if limit is not None and limit < 0:
+        raise BatchInputError("limit must not be negative.")
+    return bounds, sort_by, descending, limit
+
+
+def _quote_grids(put_chain, quotes, expirations, strikes):
+    """Contract symbols, bids and asks as expirations x strikes grids (None/NaN where missing)"""
+    rows = put_chain.rows(expirations, strikes)
+    listed = rows >= 0
+    symbols = np.full(rows.shape, None, dtype=object)
+    bids = np.full(rows.shape, np.nan)
+    asks = np.full(rows.shape, np.nan)
+    listed_symbols = put_chain.symbol[rows[listed]]
+    symbols[listed] = np.char.decode(listed_symbols, 'ascii')
+    bids[listed], asks[listed] = quotes.lookup(listed_symbols)
+    return symbols, bids, asks
+
+
+def _rows(columns, indices):
+    """Row dicts for the selected indices, NaN as None"""
+    values = {
+        name: np.where(np.isnan(column[indices]), None, column[indices]).tolist()
+        if column.dtype.kind == 'f' else column[indices].tolist()
+        for name, column in columns.items()
+    }
+    return [dict(zip(values, row)) for row in zip(*values.values())]
+
+
+@api_view(['GET'])
+def get_put_scenario_grid(request):
+    """
+    Cash-secured put metrics for every strike x expiration in the window
+    get_option_contracts_alpaca selects, priced from cached bid/ask quotes
+    (premium=bid|mid|ask, default mid) in one vectorized pass.
+
+    Rows can be filtered with min_<column>/max_<column> (e.g.
+    min_premium_annualized=20&min_drop_percentage=10), ordered with
+    sort=<column> or sort=-<column> (default -premium_annualized) and cut to
+    the top limit rows.
+    """
+    ticker_symbol = request.query_params.get('underlying_symbols', None)
+
+    if not ticker_symbol:
+        return Response({"error": "underlying_symbols parameter is required."}, status=400)
+
+    premium_source = request.query_params.get('premium', 'mid')
+    if premium_source not in PREMIUM_SOURCES:
+        return Response({"error": f"premium must be one of {', '.join(PREMIUM_SOURCES)}."}, status=400)
+
+    try:
+        strike_count = int(request.query_params.get('strikes', 21))
+        expiration_count = int(request.query_params.get('expirations', 8))
+        number_of_contracts = int(request.query_params.get('number_of_contracts', 1))
+        bounds, sort_by, descending, limit = _grid_query(request.query_params, '-premium_annualized')
+    except BatchInputError as e:
+        return Response({"error": str(e)}, status=400)
+    except ValueError:
+        return Response({"error": "Invalid numeric query parameter."}, status=400)
+
+    try:
+        current_stock_price = async_to_sync(alpaca_price)(ticker_symbol)
+        if current_stock_price is None:
+            return Response({"error": f"Could not retrieve latest stock trade price for {ticker_symbol}."}, status=404)
+
+        put_chain = chain_cache.get_or_fetch(ticker_symbol, load_put_chain_index)
+        if not len(put_chain):
+            return Response({"error": f"No put options found for {ticker_symbol}."}, status=404)
+        quotes = quote_cache.get_or_fetch(ticker_symbol, load_put_quotes)
+
+        _, strikes, expirations = put_chain.window(current_stock_price, strike_count, expiration_count)
+        symbols, bids, asks = _quote_grids(put_chain, quotes, expirations, strikes)
+        mids = (bids + asks) / 2
+        premiums = {'bid': bids, 'ask': asks, 'mid': mids}[premium_source]
+
+        # expirations x strikes grids flattened to one row per pair, expiration-major
+        strike_grid = np.broadcast_to(np.asarray(strikes, dtype=np.float64), symbols.shape)
+        days = np.broadcast_to(days_to_expiration(expirations)[:, None], symbols.shape)
+        metrics = put_metrics(current_stock_price, strike_grid, premiums, days, number_of_contracts)
+
+        columns = {
+            'symbol': symbols.ravel(),
+            'expiration_date': np.broadcast_to(np.asarray(expirations, dtype=object)[:, None], symbols.shape).ravel(),
+            'strike_price': strike_grid.ravel(),
+            'days_to_expiration': days.ravel(),
+            'bid_price': bids.ravel(),
+            'ask_price': asks.ravel(),
+            'mid_price': np.round(mids, 4).ravel(),
+            'premium': premiums.ravel(),
+            **{name: values.ravel() for name, values in metrics.items()},
+        }
+        indices, matched = select_rows(
+            columns, bounds, sort_by, descending, limit, valid=np.isfinite(columns['premium']) & (columns['premium'] > 0)
+        )
+        return Response({
+            "underlying_symbol": ticker_symbol,
+            "stock_price": current_stock_price,
+            "premium": premium_source,
+            "number_of_contracts": number_of_contracts,
+            "grid_size": int(symbols.size),
+            "matched": matched,
+            "rows": _rows(columns, indices),
+        })
+
+    except ProviderUnavailable as e:
+        return _provider_unavailable(e)
+    except requests.exceptions.RequestException as e:
+        logger.warning("Alpaca request failed for %s: %s", ticker_symbol, e)
+        return Response({"error": f"Error fetching data from Alpaca: {str(e)}"}, status=500)
+    except Exception as e:
+        logger.exception("Unexpected error building put scenario grid for %s", ticker_symbol)
+        return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+
+def _strategy_batch(request, strategy):
+    """Shared body of the columnar strategy endpoints (see calculate_put_metrics_batch)"""
+    required_params = ['stock_price', 'strike_prices', 'option_premiums', 'expiration_dates']
+    missing = [param for param in required_params if param not in request.data]
+
+    if missing:
+        return Response({"error": f"Missing required parameters: {', '.join(missing)}"}, status=400)
+
+    option_type, strategy_metrics = STRATEGIES[strategy]
+    try:
+        stock_price = float(request.data.get('stock_price'))
+        number_of_contracts = int(request.data.get('number_of_contracts', 1))
+        strike_prices, expiration_dates = _batch_rows(request.data)
+        option_premiums = _per_row('option_premiums', request.data.get('option_premiums'), len(strike_prices))
+        option_premiums = np.broadcast_to(option_premiums, strike_prices.shape)
+
+        days = days_to_expiration(expiration_dates)
+        if (days < 0).any():
+            return Response({"error": "Expiration date cannot be in the past."}, status=400)
+
+        options = {}
+        if request.data.get('cost_basis') is not None and strategy == 'covered_call':
+            options['cost_basis'] = _per_row('cost_basis', request.data.get('cost_basis'), len(strike_prices))
+
+        metrics = strategy_metrics(stock_price, strike_prices, option_premiums, days, number_of_contracts, **options)
+        if request.data.get('volatility') is not None:
+            metrics.update(_greek_columns(
+                option_type, stock_price, strike_prices, days,
+                _per_row('volatility', request.data.get('volatility'), len(strike_prices)),
+                float(request.data.get('risk_free_rate', settings.RISK_FREE_RATE)),
+            ))
+
+        results = {
+            'strike_price': strike_prices.tolist(),
+            'option_premium': option_premiums.tolist(),
+            'expiration_date': expiration_dates.astype(str).tolist(),
+            'days_to_expiration': days.tolist(),
+        }
+        results.update({name: values.tolist() for name, values in metrics.items()})
+
+        return Response({
+            'ticker_symbol': request.data.get('ticker_symbol'),
+            'strategy': strategy,
+            'stock_price': stock_price,
+            'count': len(strike_prices),
+            'results': results,
+        })
+
+    except BatchInputError as e:
+        return Response({"error": str(e)}, status=400)
+    except (ValueError, TypeError):
+        return Response({"error": "Invalid input format for numeric or date fields."}, status=400)
+    except Exception as e:
+        return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+
+@api_view(['POST'])
+def calculate_put_metrics_batch(request):
+    """
+    Columnar version of calculate_put_metrics.
+
+    Takes parallel arrays of strike_prices, option_premiums and
+    expiration_dates, or with "grid": true a strike x expiration grid where
+    option_premiums is a len(strike_prices) x len(expiration_dates) matrix
+    (rows are returned strike-major). Passing volatility adds Black-Scholes
+    Greek columns.
+    """
+    return _strategy_batch(request, 'put')
+
+
+@api_view(['POST'])
+def calculate_covered_call_metrics(request):
+    """
+    Covered call metrics for one call written against shares bought at
+    cost_basis (default: stock_price). Passing volatility adds Black-Scholes
+    Greeks for the call.
+    """
+    return _strategy_single(request, 'covered_call')
+
+
+@api_view(['POST'])
+def calculate_covered_call_metrics_batch(request):
+    """
+    Columnar version of calculate_covered_call_metrics, taking the same
+    arrays (or grid) as calculate_put_metrics_batch plus an optional
+    cost_basis (scalar or per row).
+    """
+    return _strategy_batch(request, 'covered_call')
+
+
+@api_view(['POST'])
+def calculate_option_greeks(request):
+    """
+    Black-Scholes prices and Greeks for a batch of strikes/expirations.
+
+    Rows are given as in calculate_put_metrics_batch. volatility (decimal,
+    e.g. 0.3) is a scalar or one value per row; option_type is "put"
+    (default) or "call", or one per row.
+    """
+    required_params = ['stock_price', 'strike_prices', 'expiration_dates', 'volatility']
+    missing = [param for param in required_params if param not in request.data]
+
+    if missing:
+        return Response({"error": f"Missing required parameters: {', '.join(missing)}"}, status=400)
+
+    try:
+        stock_price = float(request.data.get('stock_price'))
+        strike_prices, expiration_dates = _batch_rows(request.data)
+        volatility = _per_row('volatility', request.data.get('volatility'), len(strike_prices))
+        risk_free_rate = float(request.data.get('risk_free_rate', settings.RISK_FREE_RATE))
+        dividend_yield = float(request.data.get('dividend_yield', 0))
+
+        option_type = np.asarray(request.data.get('option_type', 'put'), dtype=str)
+        if not np.isin(np.char.lower(option_type), ['put', 'call']).all():
+            return Response({"error": "option_type must be 'put' or 'call'."}, status=400)
+        if option_type.ndim and option_type.size != len(strike_prices):
+            return Response({"error": "option_type must have one value per strike/expiration pair."}, status=400)
+
+        days = days_to_expiration(expiration_dates)
+        if (days < 0).any():
+            return Response({"error": "Expiration date cannot be in the past."}, status=400)
+
+        greeks = _greek_columns(
+            option_type.reshape(-1) if option_type.ndim else option_type,
+            stock_price, strike_prices, days, volatility, risk_free_rate, dividend_yield
+        )
+        results = {
+            'strike_price': strike_prices.tolist(),
+            'expiration_date': expiration_dates.astype(str).tolist(),
+            'days_to_expiration': days.tolist(),
+        }
+        results.update({name: values.tolist() for name, values in greeks.items()})
+
+        return Response({
+            'ticker_symbol': request.data.get('ticker_symbol'),
+            'stock_price': stock_price,
+            'risk_free_rate': risk_free_rate,
+            'count': len(strike_prices),
+            'results': results,
+        })
+
+    except BatchInputError as e:
+        return Response({"error": str(e)}, status=400)
+    except (ValueError, TypeError):
+        return Response({"error": "Invalid input format for numeric or date fields."}, status=400)
+    except Exception as e:
+        return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+
+def _payoff_definition(request):
+    """The position and range a payoff request asks for: a JSON body, or a JSON 'position' query param on GET"""
+    if request.method == 'POST':
+        return request.data
+    try:
+        return json.loads(request.query_params.get('position', ''))
+    except ValueError:
+        raise PositionError("position query parameter must be a JSON object.")
+
+
+@api_view(['GET', 'POST'])
+def get_payoff_profile(request):
+    """
+    P&L at expiration across a price range for a position of call, put and
+    stock legs (see positions.parse_legs), with breakevens and max profit/loss.
+
+    The range defaults to 50% below/above the strikes (price_min, price_max)
+    and is evaluated at points prices (default PAYOFF_DEFAULT_POINTS);
+    max_points downsamples the returned curve for charts. The ETag is a hash
+    of the definition and the resolved range and point counts: a matching
+    If-None-Match gets a 304 without evaluating the payoff, and other
+    repeats are served from the cache for PAYOFF_CACHE_TTL.
+    """
+    try:
+        definition = _payoff_definition(request)
+        if not isinstance(definition, dict):
+            raise PositionError("The position must be a JSON object with a legs list.")
+        legs = parse_legs(definition.get('legs'))
+        price_min, price_max = payoff.default_price_range(legs)
+        price_min = float(definition.get('price_min', price_min))
+        price_max = float(definition.get('price_max', price_max))
+        points = int(definition.get('points', settings.PAYOFF_DEFAULT_POINTS))
+        max_points = definition.get('max_points')
+        max_points = int(max_points) if max_points is not None else None
+    except PositionError as e:
+        return Response({"error": str(e)}, status=400)
+    except (TypeError, ValueError):
+        return Response({"error": "price_min, price_max, points and max_points must be numbers."}, status=400)
+
+    if not 0 <= price_min < price_max:
+        return Response({"error": "price_min must be non-negative and below price_max."}, status=400)
+    if not 2 <= points <= settings.PAYOFF_MAX_POINTS or (max_points is not None and max_points < 2):
+        return Response({"error": f"points must be between 2 and {settings.PAYOFF_MAX_POINTS}; max_points at least 2."}, status=400)
+
+    def render():
+        result = payoff.payoff_profile(legs, price_min, price_max, points, max_points)
+        result.update({"price_min": price_min, "price_max": price_max, "points_evaluated": points})
+        return dumps_bytes(result)
+
+    # Canonical JSON, so key order doesn't change the ETag, plus the values
+    # resolved from settings and defaults that the body also depends on
+    canonical = json.dumps(definition, sort_keys=True, separators=(',', ':'))
+    etag = content_etag('payoff', canonical, price_min, price_max, points, max_points)
+    return conditional_json(request, etag, render, timeout=settings.PAYOFF_CACHE_TTL, read_only=True)
+
+
+@api_view(['POST'])
+def simulate_put_outcomes(request):
+    """
+    Monte Carlo probability of profit, probability of assignment and
+    expected P&L for selling the put described by calculate_put_metrics'
+    inputs, plus its volatility.
+
+    paths (default SIMULATION_DEFAULT_PATHS) and time_budget seconds bound
+    the run; drift defaults to the risk-free rate, seed (default 0) makes
+    runs reproducible and steps > 1 simulates whole paths to add the
+    probability of touching the strike. Large runs use the process pool.
+    """
+    required_params = ['stock_price', 'strike_price', 'option_premium', 'expiration_date_str', 'volatility']
+    missing = [param for param in required_params if param not in request.data]
+
+    if missing:
+        return Response({"error": f"Missing required parameters: {', '.join(missing)}"}, status=400)
+
+    try:
+        stock_price = float(request.data.get('stock_price'))
+        strike_price = float(request.data.get('strike_price'))
+        option_premium = float(request.data.get('option_premium'))
+        volatility = float(request.data.get('volatility'))
+        drift = float(request.data.get('drift', settings.RISK_FREE_RATE))
+        number_of_contracts = int(request.data.get('number_of_contracts', 1))
+        paths = int(request.data.get('paths', settings.SIMULATION_DEFAULT_PATHS))
+        steps = int(request.data.get('steps', 1))
+        seed = int(request.data.get('seed', 0))
+        time_budget = min(float(request.data.get('time_budget', settings.SIMULATION_MAX_SECONDS)), settings.SIMULATION_MAX_SECONDS)
+        expiration_date = datetime.strptime(request.data.get('expiration_date_str'), '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return Response({"error": "Invalid input format for numeric or date fields."}, status=400)
+
+    days = (expiration_date - datetime.now().date()).days
+    if days <= 0:
+        return Response({"error": "Expiration date must be in the future."}, status=400)
+    if stock_price <= 0 or strike_price <= 0 or volatility <= 0 or seed < 0:
+        return Response({"error": "stock_price, strike_price and volatility must be positive; seed non-negative."}, status=400)
+    if not 1 <= paths <= settings.SIMULATION_MAX_PATHS:
+        return Response({"error": f"paths must be between 1 and {settings.SIMULATION_MAX_PATHS}."}, status=400)
+    if not 1 <= steps <= settings.SIMULATION_MAX_STEPS:
+        return Response({"error": f"steps must be between 1 and {settings.SIMULATION_MAX_STEPS}."}, status=400)
+    if time_budget <= 0:
+        return Response({"error": "time_budget must be positive."}, status=400)
+
+    try:
+        executor = simulation_pool() if paths * steps >= settings.SIMULATION_PARALLEL_THRESHOLD else None
+        result = simulate_short_put(
+            stock_price, strike_price, option_premium, days / DAYS_PER_YEAR, volatility, drift,
+            paths=paths, seed=seed, steps=steps, number_of_contracts=number_of_contracts,
+            time_budget=time_budget, executor=executor,
+        )
+    except Exception as e:
+        logger.exception("Simulation failed")
+        return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+    result.update({
+        'ticker_symbol': request.data.get('ticker_symbol'),
+        'stock_price': stock_price,
+        'strike_price': strike_price,
+        'option_premium': option_premium,
+        'days_to_expiration': days,
+        'volatility': volatility,
+        'drift': drift,
+        'seed': seed,
+        'steps': steps,
+        'parallel': executor is not None,
+    })
+    return Response(result)